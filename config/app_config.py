@@ -20,14 +20,40 @@ PRIMARY_COLOR = "#3498db"
 SECONDARY_COLOR = "#2c3e50"
 ACCENT_COLOR = "#27ae60"
 UI_FONT = "sans-serif"
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Memory limit of rendered charts kept for reuse (BRAINVENTURE_CHART_CACHE_MAX_BYTES overrides)
+IMAGE_DISPLAY_WIDTHS = (120, 150, 200)  # Widths (px) at which static images are shown
+IMAGE_PIXEL_DENSITY = 2  # Variants are generated for high-density screens
 
 # Feature flags
 ENABLE_LOGIN = False  # Set to True when login system is implemented
 ENABLE_GAMIFICATION = False  # Set to True when gamification system is implemented
-ANALYTICS_ENABLED = False  # Set to True when analytics system is implemented
+ANALYTICS_ENABLED = True  # Record activity events (see core/analytics/events.py)
 DEBUG = True
+PROFILING_ENABLED = DEBUG  # Time page reruns and shared helpers (BRAINVENTURE_PROFILING=1/0 overrides)
+PROFILING_FLUSH_INTERVAL = 10.0  # Minimum seconds between two merges of timings into the metrics file
+
+# Storage settings
+STORAGE_BACKEND = "json"  # json (one directory per user) or sqlite (BRAINVENTURE_STORAGE_BACKEND overrides)
+TEST_HISTORY_COMPACT_EVERY = 500  # Compact a user's test history log every N saved results
+TEST_HISTORY_MAX_ENTRIES = None  # Number of newest results kept by compaction (None keeps all)
+WRITE_BEHIND_ENABLED = True  # Queue progress and test writes and save them in the background (BRAINVENTURE_WRITE_BEHIND=1/0 overrides)
+WRITE_BEHIND_FLUSH_INTERVAL = 0.5  # Seconds between two background flushes
+WRITE_BEHIND_MAX_PENDING = 10000  # Maximum number of queued writes before saving waits for the disk
+NORMS_BINS = 100  # Number of histogram bins per type used for percentile ranks of test scores
+SCORE_MEDIUM_THRESHOLD = 0.4  # Share of the maximum type score from which a score is interpreted as medium
+SCORE_HIGH_THRESHOLD = 0.7  # Share of the maximum type score from which a score is interpreted as high
+
+# Logging settings
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Size after which the log file of the day is rotated
+LOG_BACKUP_COUNT = 5  # Number of rotated log files kept per day
+LOG_RETENTION_DAYS = 30  # Number of days whose log files are kept
+
+# Activity event settings
+EVENTS_SEGMENT_MAX_BYTES = 4 * 1024 * 1024  # Size after which a new event segment file is started
+EVENTS_COMPRESS = True  # Gzip-compress finished event segments
 
 # User settings
+DEFAULT_USER_ID = "user"  # Used until the login system is implemented
 DEFAULT_USER_PREFERENCES = {
     "email_notifications": True,
     "new_lesson_notifications": True,
@@ -39,4 +65,12 @@ DEFAULT_USER_PREFERENCES = {
 DATA_DIR = "data"
 CONTENT_DIR = "data/content"
 USER_FILES_DIR = "data/user_files"
+USERS_DIR = "data/users"
+SQLITE_DB_FILE = "data/brainventure.db"
+LEGACY_USER_DATA_FILE = "data/content/user_data.json"
+NORMS_FILE = "data/norms.json"
+METRICS_FILE = "data/metrics.json"
+LOGS_DIR = "data/logs"
+EVENTS_DIR = "data/events"
 STATIC_DIR = "static"
+IMAGES_DIR = "static/images"
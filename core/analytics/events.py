@@ -0,0 +1,309 @@
+"""
+Activity event stream for BrainVenture application.
+
+Flows of the app (navigation, tests, lessons) emit typed events: an event
+type, the user id, a timestamp and a payload whose fields are declared in a
+schema registry. Payloads are validated when the event is emitted, so every
+stored event of a type has the same fields.
+
+Events are buffered in memory and appended in the background (through the
+write-behind queue) as compact JSON lines to segment files under
+data/events. Every server process writes its own segments
+(events-YYYYMMDD-<pid>-<seq>.jsonl), started anew each day and when a
+segment reaches EVENTS_SEGMENT_MAX_BYTES. With EVENTS_COMPRESS, finished
+segments are gzip-compressed. The registered schemas are saved next to the
+segments (schemas.json), and read_events() scans plain and compressed
+segments, so analytics never parse text logs.
+
+Events are recorded when ANALYTICS_ENABLED is set; emit() logs and drops
+events that do not match their schema.
+"""
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from config.app_config import ANALYTICS_ENABLED, EVENTS_COMPRESS, EVENTS_DIR, EVENTS_SEGMENT_MAX_BYTES
+from core.data.atomic_io import atomic_write_json
+
+logger = logging.getLogger("brainventure")
+
+SCHEMAS_FILE = "schemas.json"
+SEGMENT_PATTERN = re.compile(r"events-(\d{8})-(\d+)-(\d+)\.jsonl(\.gz)?$")
+
+FieldType = Union[type, Tuple[type, ...]]
+
+
+class EventSchema(NamedTuple):
+    """Version and payload fields (name -> type or tuple of types) of an event type."""
+    version: int
+    fields: Dict[str, FieldType]
+
+
+_schemas: Dict[str, EventSchema] = {}
+
+
+def register_event(event_type: str, fields: Dict[str, FieldType], version: int = 1) -> None:
+    """
+    Registers the payload schema of an event type.
+
+    Args:
+        event_type: Name of the event type
+        fields: Payload fields and their types (a tuple allows several types, e.g. (str, type(None)))
+        version: Schema version, increased when the fields of the type change
+
+    Raises:
+        ValueError: If the type is already registered with a different schema
+    """
+    schema = EventSchema(version, dict(fields))
+    registered = _schemas.get(event_type)
+    if registered is not None and registered != schema:
+        raise ValueError(f"Event type {event_type} is already registered with another schema")
+    _schemas[event_type] = schema
+
+
+def get_schemas() -> Dict[str, EventSchema]:
+    """Returns the registered event schemas."""
+    return dict(_schemas)
+
+
+def _type_names(field_type: FieldType) -> List[str]:
+    types = field_type if isinstance(field_type, tuple) else (field_type,)
+    return ["null" if t is type(None) else t.__name__ for t in types]
+
+
+def validate_event(event_type: str, payload: Dict[str, Any]) -> EventSchema:
+    """
+    Checks a payload against the schema of its event type.
+
+    Raises:
+        ValueError: If the type is not registered or the payload does not match the schema
+    """
+    schema = _schemas.get(event_type)
+    if schema is None:
+        raise ValueError(f"Unknown event type: {event_type}")
+    missing = schema.fields.keys() - payload.keys()
+    unknown = payload.keys() - schema.fields.keys()
+    if missing or unknown:
+        raise ValueError(f"Event {event_type}: missing fields {sorted(missing)}, unknown fields {sorted(unknown)}")
+    for name, field_type in schema.fields.items():
+        value = payload[name]
+        types = field_type if isinstance(field_type, tuple) else (field_type,)
+        # bool is an int subclass, but a flag is not a count
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"Event {event_type}: field {name} must be {' or '.join(_type_names(field_type))}")
+    return schema
+
+
+# Event types emitted by the app
+register_event("page_view", {"page": str})
+register_event("typology_test_completed", {
+    "dominant_type": str, "secondary_type": (str, type(None)), "scores": dict,
+})
+register_event("skills_test_completed", {"answers": dict})
+register_event("quiz_submitted", {"lesson_id": str, "score": int, "max_score": int})
+register_event("lesson_completed", {"lesson_id": str})
+# Activity logged with log_user_activity() whose action is not a registered type
+register_event("activity", {"action": str, "details": dict})
+
+
+class EventStream:
+    """Buffered writer of the event segments of this process."""
+
+    def __init__(self, events_dir: str = EVENTS_DIR, segment_max_bytes: int = EVENTS_SEGMENT_MAX_BYTES,
+                 compress: bool = EVENTS_COMPRESS):
+        """
+        Args:
+            events_dir: Directory of the segment files
+            segment_max_bytes: Size after which a new segment is started
+            compress: Whether finished segments are gzip-compressed
+        """
+        self.events_dir = events_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        # Segment writes of this process are serialized
+        self._flush_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._segment: Optional[str] = None
+        self._day: Optional[date] = None
+        self._sequence = 0
+        self._saved_schemas: Optional[Dict[str, Any]] = None
+
+    def emit(self, event_type: str, user_id: str, **payload: Any) -> None:
+        """
+        Validates an event and queues it for writing.
+
+        Raises:
+            ValueError: If the payload does not match the schema of the event type
+        """
+        schema = validate_event(event_type, payload)
+        event = {"type": event_type, "v": schema.version, "ts": round(time.time(), 3), "user": user_id,
+                 "data": payload}
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._pending.append(line)
+        from core.data.write_behind import get_write_queue
+        get_write_queue().submit("events", self.flush, "events")
+
+    # Segments
+
+    @staticmethod
+    def _today() -> date:
+        return date.today()
+
+    def _segment_path(self, day: date, sequence: int) -> str:
+        return os.path.join(self.events_dir, f"events-{day:%Y%m%d}-{os.getpid()}-{sequence:04d}.jsonl")
+
+    def _open_segment(self, day: date) -> None:
+        """Starts the next segment of the day (skipping segments already finished)."""
+        if self._day != day:
+            self._day, self._sequence = day, 0
+            self._compress_past_days(day)
+        self._sequence += 1
+        while os.path.exists(self._segment_path(day, self._sequence) + ".gz"):
+            self._sequence += 1
+        self._segment = self._segment_path(day, self._sequence)
+
+    def _finish_segment(self) -> None:
+        if self._segment and self.compress and os.path.exists(self._segment):
+            _compress(self._segment)
+        self._segment = None
+
+    def _compress_past_days(self, today: date) -> None:
+        """Compresses plain segments of earlier days (no process writes them any more)."""
+        if not self.compress:
+            return
+        for path in glob.glob(os.path.join(self.events_dir, "events-*.jsonl")):
+            match = SEGMENT_PATTERN.search(os.path.basename(path))
+            if match and match.group(1) < f"{today:%Y%m%d}":
+                try:
+                    _compress(path)
+                except OSError:
+                    # Compressed by another process at the same time
+                    pass
+
+    def _save_schemas(self) -> None:
+        schemas = {
+            event_type: {"version": schema.version,
+                         "fields": {name: _type_names(t) for name, t in schema.fields.items()}}
+            for event_type, schema in sorted(_schemas.items())
+        }
+        if schemas != self._saved_schemas:
+            atomic_write_json(os.path.join(self.events_dir, SCHEMAS_FILE), schemas)
+            self._saved_schemas = schemas
+
+    def flush(self) -> None:
+        """Appends the queued events to the current segment."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        with self._flush_lock:
+            try:
+                os.makedirs(self.events_dir, exist_ok=True)
+                self._save_schemas()
+                today = self._today()
+                if self._segment is None or self._day != today:
+                    self._finish_segment()
+                    self._open_segment(today)
+                with open(self._segment, "a", encoding="utf-8") as f:
+                    f.write("\n".join(pending) + "\n")
+                    size = f.tell()
+            except Exception:
+                # Kept for the next attempt of the write-behind queue
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+            if size >= self.segment_max_bytes:
+                self._finish_segment()
+
+    def close(self) -> None:
+        """Writes the queued events and finishes the current segment."""
+        self.flush()
+        with self._flush_lock:
+            self._finish_segment()
+
+
+def _compress(path: str) -> None:
+    """Replaces a segment with its gzip-compressed copy."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(path, "rb") as source, gzip.open(tmp_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.replace(tmp_path, path + ".gz")
+    os.remove(path)
+
+
+def read_events(events_dir: str = EVENTS_DIR, event_type: Optional[str] = None,
+                since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields stored events (plain and compressed segments, oldest segment first).
+
+    Args:
+        events_dir: Directory of the segment files
+        event_type: Only events of this type
+        since: Only events with a timestamp (seconds since the epoch) not earlier than this
+    """
+    paths = set(glob.glob(os.path.join(events_dir, "events-*.jsonl*")))
+    segments = []
+    for path in paths:
+        match = SEGMENT_PATTERN.search(os.path.basename(path))
+        # A plain segment next to its compressed copy is being removed
+        if match and path + ".gz" not in paths:
+            segments.append(((match.group(1), int(match.group(2)), int(match.group(3))), path))
+    for _, path in sorted(segments):
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Line cut off by a crash while it was written
+                        continue
+                    if event_type is not None and event["type"] != event_type:
+                        continue
+                    if since is not None and event["ts"] < since:
+                        continue
+                    yield event
+        except FileNotFoundError:
+            # Compressed by its writer while the directory was scanned
+            continue
+
+
+_event_stream = None
+_event_stream_lock = threading.Lock()
+
+
+def get_event_stream() -> EventStream:
+    """Returns the event stream shared by all sessions of the process."""
+    global _event_stream
+    if _event_stream is None:
+        with _event_stream_lock:
+            if _event_stream is None:
+                _event_stream = EventStream()
+                # Events queued since the last write are saved when the server stops
+                atexit.register(_event_stream.close)
+    return _event_stream
+
+
+def emit(event_type: str, user_id: str, **payload: Any) -> None:
+    """
+    Records an activity event (no-op when ANALYTICS_ENABLED is off). Events
+    that do not match their schema are logged and dropped, so recording an
+    event never interrupts the page that emits it.
+    """
+    if not ANALYTICS_ENABLED:
+        return
+    try:
+        get_event_stream().emit(event_type, user_id, **payload)
+    except (TypeError, ValueError):
+        logger.warning("Dropping invalid %s event", event_type, exc_info=True)
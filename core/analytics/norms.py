@@ -0,0 +1,259 @@
+"""
+Score norms for BrainVenture application.
+
+Keeps the distribution of neuroleader test scores of the whole population and
+of every cohort as fixed-bin histograms (one per type), so the percentile rank
+of a score is read from prefix sums instead of reloading all stored results.
+
+Scores of saved results are counted in memory and merged into a single JSON
+file in the background (through the write-behind queue), under a file lock
+shared by all server processes. Counts not merged yet are included in the
+lookups of the process. rebuild_norms() recomputes the histograms from all
+stored test results, e.g. to include results saved before norms were kept:
+
+    python -m core.analytics.norms
+"""
+import atexit
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.app_config import NORMS_BINS, NORMS_FILE
+from core.data.atomic_io import FileLock, atomic_write_json
+
+# Cohort containing every saved result
+POPULATION = "all"
+# Highest possible score of a type (answers are on a 1-5 scale)
+MAX_SCORE = 5.0
+
+
+class ScoreNorms:
+    """Streaming per-type score histograms with percentile ranks."""
+
+    def __init__(self, norms_file: str = NORMS_FILE, bins: int = NORMS_BINS, max_score: float = MAX_SCORE,
+                 write_queue=None):
+        """
+        Args:
+            norms_file: Path of the JSON file holding the histograms
+            bins: Number of equal-width bins covering scores 0..max_score
+            max_score: Highest possible score
+            write_queue: WriteBehindQueue merging the counts into the file
+                (default: shared application queue)
+        """
+        self.norms_file = norms_file
+        self.bins = bins
+        self.max_score = max_score
+        self.write_queue = write_queue
+        self._lock = threading.Lock()
+        # FileLock does not synchronize threads; merges of this process are serialized first
+        self._flush_lock = threading.Lock()
+        self._file_lock = FileLock(norms_file + ".lock")
+        # Counts added since the last merge: cohort -> type id -> bin counts
+        self._pending: Dict[str, Dict[str, List[int]]] = {}
+        # (file signature, histograms, prefix sums) of the last loaded file
+        self._cache: Optional[Tuple[Tuple[int, int], Dict[str, Any], Dict[Tuple[str, str], List[int]]]] = None
+
+    def _empty(self) -> Dict[str, Any]:
+        return {"bins": self.bins, "max_score": self.max_score, "cohorts": {}}
+
+    def _load(self) -> Tuple[Dict[str, Any], Dict[Tuple[str, str], List[int]]]:
+        """Returns the histograms and their prefix sums, re-reading the file only after it changed."""
+        try:
+            stat = os.stat(self.norms_file)
+        except FileNotFoundError:
+            return self._empty(), {}
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._cache
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+
+        with open(self.norms_file, "r", encoding="utf-8") as f:
+            norms = json.load(f)
+        if norms.get("bins") != self.bins or norms.get("max_score") != self.max_score:
+            # Histograms with a different binning cannot be compared
+            norms = self._empty()
+
+        prefix_sums = {}
+        for cohort, histograms in norms["cohorts"].items():
+            for type_id, counts in histograms.items():
+                running, sums = 0, [0]
+                for count in counts:
+                    running += count
+                    sums.append(running)
+                prefix_sums[(cohort, type_id)] = sums
+        self._cache = (signature, norms, prefix_sums)
+        return norms, prefix_sums
+
+    def _bin(self, score: float) -> int:
+        return min(max(int(score / self.max_score * self.bins), 0), self.bins - 1)
+
+    @staticmethod
+    def _merge(target: Dict[str, Dict[str, List[int]]], counts: Dict[str, Dict[str, List[int]]]) -> None:
+        for cohort, histograms in counts.items():
+            target_histograms = target.setdefault(cohort, {})
+            for type_id, bins in histograms.items():
+                stored = target_histograms.get(type_id)
+                if stored is None or len(stored) != len(bins):
+                    target_histograms[type_id] = list(bins)
+                else:
+                    target_histograms[type_id] = [a + b for a, b in zip(stored, bins)]
+
+    def _count_results(self, results: Iterable[Tuple[Dict[str, float], Optional[str]]]) -> Dict[str, Dict[str, List[int]]]:
+        counts: Dict[str, Dict[str, List[int]]] = {}
+        for scores, cohort in results:
+            cohorts = [POPULATION] if not cohort or cohort == POPULATION else [POPULATION, cohort]
+            for name in cohorts:
+                histograms = counts.setdefault(name, {})
+                for type_id, score in scores.items():
+                    bins = histograms.setdefault(type_id, [0] * self.bins)
+                    bins[self._bin(float(score))] += 1
+        return counts
+
+    def add_results(self, score_sets: Iterable[Dict[str, float]], cohort: Optional[str] = None) -> None:
+        """
+        Adds the type scores of several results to the population histograms
+        and, if given, to the cohort histograms. The counts are merged into
+        the norms file in the background.
+
+        Args:
+            score_sets: Dicts mapping type id to score (the "scores" of a result)
+            cohort: Name of the cohort the results belong to
+        """
+        counts = self._count_results((scores, cohort) for scores in score_sets)
+        if not counts:
+            return
+        with self._lock:
+            self._merge(self._pending, counts)
+        queue = self.write_queue
+        if queue is None:
+            from core.data.write_behind import get_write_queue
+            queue = get_write_queue()
+        # Merges into one file are queued in order; every instance keeps its own merge
+        queue.submit(f"norms:{self.norms_file}", self.flush, id(self))
+
+    def add_result(self, scores: Dict[str, float], cohort: Optional[str] = None) -> None:
+        """Adds the type scores of a single result (see add_results)."""
+        self.add_results([scores], cohort)
+
+    def flush(self) -> None:
+        """Merges the counts added since the last merge into the norms file."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with self._flush_lock, self._file_lock:
+                norms, _ = self._load()
+                norms = json.loads(json.dumps(norms))
+                self._merge(norms["cohorts"], pending)
+                atomic_write_json(self.norms_file, norms, indent=None)
+        except Exception:
+            # Kept for the next attempt of the write-behind queue
+            with self._lock:
+                self._merge(pending, self._pending)
+                self._pending = pending
+            raise
+
+    def rebuild(self, results: Iterable[Tuple[Dict[str, float], Optional[str]]]) -> None:
+        """
+        Replaces all histograms with the counts of the given results, dropping
+        counts not merged yet.
+
+        Args:
+            results: (scores, cohort) pairs of all stored results
+        """
+        norms = self._empty()
+        norms["cohorts"] = self._count_results(results)
+        with self._lock:
+            self._pending = {}
+        with self._flush_lock, self._file_lock:
+            atomic_write_json(self.norms_file, norms, indent=None)
+
+    def _sums(self, type_id: str, cohort: Optional[str]) -> Optional[List[int]]:
+        """Returns prefix sums of the stored counts of a type plus the counts not merged yet."""
+        cohort = cohort or POPULATION
+        _, prefix_sums = self._load()
+        sums = prefix_sums.get((cohort, type_id))
+        with self._lock:
+            pending = self._pending.get(cohort, {}).get(type_id)
+            pending = list(pending) if pending else None
+        if pending is None:
+            return sums
+        if sums and len(sums) == len(pending) + 1:
+            pending = [count + sums[i + 1] - sums[i] for i, count in enumerate(pending)]
+        running, sums = 0, [0]
+        for count in pending:
+            running += count
+            sums.append(running)
+        return sums
+
+    def count(self, type_id: str, cohort: Optional[str] = None) -> int:
+        """Returns the number of scores of a type recorded for the cohort (default: population)."""
+        sums = self._sums(type_id, cohort)
+        return sums[-1] if sums else 0
+
+    def percentile(self, type_id: str, score: float, cohort: Optional[str] = None,
+                   include_score: bool = False) -> Optional[float]:
+        """
+        Returns the percentile rank (0-100) of a score among the recorded
+        scores of a type: the share of lower scores plus half of the scores
+        in the same bin. Returns None if no scores were recorded.
+
+        Args:
+            include_score: Rank the score as if it was recorded too (for a
+                result whose scores are added after it is saved)
+        """
+        sums = self._sums(type_id, cohort)
+        extra = 1 if include_score else 0
+        total = (sums[-1] if sums else 0) + extra
+        if total == 0:
+            return None
+        index = self._bin(float(score))
+        below, in_bin = (sums[index], sums[index + 1] - sums[index]) if sums else (0, 0)
+        return 100.0 * (below + 0.5 * (in_bin + extra)) / total
+
+    def percentiles(self, scores: Dict[str, float], cohort: Optional[str] = None,
+                    include_score: bool = False) -> Dict[str, Optional[float]]:
+        """Returns percentile ranks of all type scores of a result (see percentile)."""
+        return {type_id: self.percentile(type_id, score, cohort, include_score) for type_id, score in scores.items()}
+
+
+_norms = None
+_norms_lock = threading.Lock()
+
+
+def get_norms() -> ScoreNorms:
+    """Returns the score norms shared by all sessions of the process."""
+    global _norms
+    if _norms is None:
+        with _norms_lock:
+            if _norms is None:
+                _norms = ScoreNorms()
+                # Counts added since the last merge are saved when the server stops
+                atexit.register(_norms.flush)
+    return _norms
+
+
+def rebuild_norms(user_store=None, norms: Optional[ScoreNorms] = None) -> int:
+    """
+    Recomputes the norms from the stored test results of all users, with the
+    cohort saved in each result. Returns the number of results counted.
+    """
+    if user_store is None:
+        from core.data.user_store import get_user_store
+        user_store = get_user_store()
+    norms = norms if norms is not None else get_norms()
+    flush = getattr(user_store, "flush", None)
+    if flush is not None:
+        # Results still queued by the write-behind store are counted too
+        flush()
+
+    results = user_store.get_all_test_scores()
+    norms.rebuild(results)
+    return len(results)
+
+
+if __name__ == "__main__":
+    print(f"Norms rebuilt from {rebuild_norms()} stored test results")
@@ -0,0 +1,275 @@
+"""
+Render-time profiling for BrainVenture application.
+
+Page reruns and shared helpers are timed with spans. Durations are aggregated
+per (page, span) into fixed logarithmic histograms, from which p50/p95/p99 are
+read. Histograms of the process are merged into a JSON metrics file in the
+background (through the write-behind queue), so the admin page can show the
+metrics of all server processes.
+
+Profiling is enabled with PROFILING_ENABLED (DEBUG by default) and can be
+overridden with the BRAINVENTURE_PROFILING environment variable ("1" or "0").
+When it is disabled, profiled() returns the functions unchanged and spans do
+nothing.
+"""
+import atexit
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from config.app_config import METRICS_FILE, PROFILING_ENABLED, PROFILING_FLUSH_INTERVAL
+from core.data.atomic_io import FileLock, atomic_write_json
+
+# Histogram buckets: BUCKETS_PER_DECADE per power of ten from MIN_MS up to MAX_MS
+BUCKETS_PER_DECADE = 20
+MIN_MS = 0.01
+MAX_MS = 100_000.0
+BUCKET_COUNT = int(BUCKETS_PER_DECADE * math.log10(MAX_MS / MIN_MS))
+# Span covering the whole page script
+PAGE_SPAN = "page"
+# Page of spans recorded outside a page run (e.g. fragment reruns)
+NO_PAGE = "-"
+PERCENTILES = (50, 95, 99)
+
+
+def is_enabled() -> bool:
+    """Returns True if profiling is enabled (config or BRAINVENTURE_PROFILING)."""
+    value = os.environ.get("BRAINVENTURE_PROFILING")
+    if value is None:
+        return PROFILING_ENABLED
+    return value.strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def _in_script_run() -> bool:
+    """Spans are recorded only while Streamlit runs a page (not in scripts or tests)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def _bucket(ms: float) -> int:
+    if ms <= MIN_MS:
+        return 0
+    return min(int(BUCKETS_PER_DECADE * math.log10(ms / MIN_MS)), BUCKET_COUNT - 1)
+
+
+def _bucket_upper_ms(index: int) -> float:
+    return MIN_MS * 10 ** ((index + 1) / BUCKETS_PER_DECADE)
+
+
+def _read_metrics(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * BUCKET_COUNT}
+
+
+def summarize(stats: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Returns count, mean, p50/p95/p99 and max (milliseconds) of a span histogram.
+    A percentile is the upper edge of the bucket containing it (at most the maximum).
+    """
+    count = stats["count"]
+    summary = {"count": count, "mean_ms": stats["total_ms"] / count if count else 0.0, "max_ms": stats["max_ms"]}
+    for p in PERCENTILES:
+        target, running, value = math.ceil(count * p / 100), 0, 0.0
+        for index, bucket_count in enumerate(stats["buckets"]):
+            running += bucket_count
+            if count and running >= target:
+                value = min(_bucket_upper_ms(index), stats["max_ms"])
+                break
+        summary[f"p{p}_ms"] = value
+    return summary
+
+
+class Profiler:
+    """Per-page span histograms of the process, merged into the metrics file."""
+
+    def __init__(self, metrics_file: str = METRICS_FILE, flush_interval: float = PROFILING_FLUSH_INTERVAL):
+        """
+        Args:
+            metrics_file: JSON file holding the histograms of all processes
+            flush_interval: Minimum number of seconds between two merges into the file
+        """
+        self.metrics_file = metrics_file
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # FileLock does not synchronize threads; merges of this process are serialized first
+        self._flush_lock = threading.Lock()
+        self._file_lock = FileLock(metrics_file + ".lock")
+        # Histograms recorded since the last merge, keyed by (page, span)
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._last_flush = time.monotonic()
+        self._local = threading.local()
+
+    # Recording
+
+    def record(self, page: str, span: str, seconds: float) -> None:
+        """Adds a span duration to the histogram of the page."""
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._pending.get((page, span))
+            if stats is None:
+                stats = self._pending[(page, span)] = _empty_stats()
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["buckets"][_bucket(ms)] += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if due:
+                self._last_flush = time.monotonic()
+        if due:
+            from core.data.write_behind import get_write_queue
+            get_write_queue().submit("metrics", self.flush, "metrics")
+
+    @property
+    def current_page(self) -> str:
+        """Page whose script is running in this thread."""
+        return getattr(self._local, "page", None) or NO_PAGE
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Times a block of code as a span of the current page."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(self.current_page, name, time.perf_counter() - start)
+
+    def start_page(self, page: str) -> None:
+        """Starts timing a page script; spans recorded by this thread belong to the page."""
+        self._local.page = page
+        self._local.page_start = time.perf_counter()
+
+    def end_page(self) -> None:
+        """Records the duration of the page script started in this thread."""
+        start = getattr(self._local, "page_start", None)
+        if start is not None:
+            self.record(self._local.page, PAGE_SPAN, time.perf_counter() - start)
+        self._local.page = self._local.page_start = None
+
+    @contextmanager
+    def page(self, page: str) -> Iterator[None]:
+        """
+        Times a page script. The run is recorded also when it ends with
+        st.rerun(), st.stop(), st.switch_page() or an exception.
+        """
+        self.start_page(page)
+        try:
+            yield
+        finally:
+            self.end_page()
+
+    # Metrics file
+
+    def flush(self) -> None:
+        """Merges the histograms recorded since the last merge into the metrics file."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._flush_lock, self._file_lock:
+            metrics = _read_metrics(self.metrics_file)
+            for (page, span), stats in pending.items():
+                stored = metrics.setdefault(page, {}).get(span)
+                if stored is None or len(stored.get("buckets", [])) != BUCKET_COUNT:
+                    stored = metrics[page][span] = _empty_stats()
+                stored["count"] += stats["count"]
+                stored["total_ms"] += stats["total_ms"]
+                stored["max_ms"] = max(stored["max_ms"], stats["max_ms"])
+                stored["buckets"] = [a + b for a, b in zip(stored["buckets"], stats["buckets"])]
+            atomic_write_json(self.metrics_file, metrics, indent=None)
+
+    def load(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Returns summaries of all stored histograms: {page: {span: summary}}."""
+        self.flush()
+        metrics = _read_metrics(self.metrics_file)
+        return {page: {span: summarize(stats) for span, stats in spans.items()} for page, spans in metrics.items()}
+
+    def reset(self) -> None:
+        """Removes all recorded metrics."""
+        with self._lock:
+            self._pending = {}
+        with self._flush_lock, self._file_lock:
+            atomic_write_json(self.metrics_file, {}, indent=None)
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """Returns the profiler shared by all sessions of the process."""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler()
+                # Timings recorded since the last merge are saved when the server stops
+                atexit.register(_profiler.flush)
+    return _profiler
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Times a block of code as a span of the current page (no-op when profiling is disabled)."""
+    if not is_enabled() or not _in_script_run():
+        yield
+        return
+    with get_profiler().span(name):
+        yield
+
+
+def profiled(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a function as a span (named after the
+    function by default). Returns the function unchanged when profiling is
+    disabled.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if not is_enabled():
+            return fn
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _in_script_run():
+                return fn(*args, **kwargs)
+            with get_profiler().span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timed_page(page: str) -> Iterator[None]:
+    """
+    Times the page script run inside the block, including runs ended by
+    st.rerun(), st.stop(), st.switch_page() or an exception.
+    """
+    if not is_enabled() or not _in_script_run():
+        yield
+        return
+    with get_profiler().page(page):
+        yield
+
+
+def start_page(page: str) -> None:
+    """Starts timing a page script (prefer timed_page, which also records interrupted runs)."""
+    if is_enabled() and _in_script_run():
+        get_profiler().start_page(page)
+
+
+def end_page() -> None:
+    """Records the duration of the page script (call at the end of the page)."""
+    if is_enabled():
+        get_profiler().end_page()
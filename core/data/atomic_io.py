@@ -0,0 +1,136 @@
+"""
+Crash-safe file writes and cross-process locks for BrainVenture application.
+
+Several Streamlit sessions (and server processes) can save data at the same
+time. Files are therefore never rewritten in place: new content goes to a
+temporary file in the same directory, is flushed to disk and then renamed
+over the old file, so readers always see either the old or the new document.
+FileLock serializes read-modify-write cycles between processes.
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    def _unlock_fd(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    Exclusive lock held on a lock file, shared by all processes on the machine.
+
+    The lock is not reentrant and does not synchronize threads of a single
+    process; callers combine it with a threading lock.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0, poll_interval: float = 0.01):
+        """
+        Args:
+            path: Path of the lock file (created if it does not exist)
+            timeout: Maximum number of seconds to wait for the lock
+            poll_interval: Number of seconds between two locking attempts
+        """
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        """Waits until the lock is acquired; raises TimeoutError after the timeout."""
+        lock_dir = os.path.dirname(self.path)
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                _lock_fd(fd)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Could not lock {self.path} within {self.timeout} s")
+                time.sleep(self.poll_interval)
+        self._fd = fd
+
+    def release(self) -> None:
+        """Releases the lock."""
+        if self._fd is None:
+            return
+        try:
+            _unlock_fd(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+
+def _fsync_directory(directory: str) -> None:
+    """Makes a rename durable; directories cannot be opened for fsync on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace(src: str, dst: str, attempts: int = 5) -> None:
+    # On Windows the rename fails while another process has the target open
+    for attempt in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Replaces the content of a file atomically (temp file + fsync + rename)."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Saves data as a JSON file atomically."""
+    text = json.dumps(data, ensure_ascii=False, indent=indent)
+    atomic_write_bytes(path, text.encode("utf-8"))
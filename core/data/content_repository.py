@@ -0,0 +1,134 @@
+"""
+Content repository for BrainVenture application.
+
+Loads the JSON and Markdown files from data/content once per process and
+shares the parsed objects between all Streamlit sessions. A file is parsed
+again only when its modification time or size changes on disk.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.app_config import CONTENT_DIR
+
+COURSE_STRUCTURE_FILE = "course_structure.json"
+NEUROLEADER_TYPES_FILE = "neuroleader_types.json"
+NEUROLEADER_TYPE_TEST_FILE = "neuroleader_type_test.json"
+TEST_QUESTIONS_FILE = "test_questions.json"
+
+
+class _CacheEntry:
+    """Parsed file content together with the file signature it was read from."""
+
+    __slots__ = ("signature", "value", "checked_at")
+
+    def __init__(self, signature: Tuple[int, int], value: Any, checked_at: float):
+        self.signature = signature
+        self.value = value
+        self.checked_at = checked_at
+
+
+class ContentRepository:
+    """
+    Process-wide cache of course content files.
+
+    Returned objects are shared between sessions and must be treated as
+    read-only; callers that need to modify them should make a copy first.
+    """
+
+    def __init__(self, content_dir: str = CONTENT_DIR, check_interval: float = 1.0):
+        """
+        Args:
+            content_dir: Directory containing the content files
+            check_interval: Minimum number of seconds between two stat() calls
+                for the same file; 0 checks the file on every access
+        """
+        self.content_dir = content_dir
+        self.check_interval = check_interval
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.content_dir, name)
+
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _get(self, name: str, parser: Callable[[str], Any]) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(name)
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry.value
+
+        path = self._path(name)
+        signature = self._signature(path)
+        if entry is not None and entry.signature == signature:
+            entry.checked_at = now
+            return entry.value
+
+        with self._lock:
+            # Another session may have reloaded the file while we were waiting
+            entry = self._entries.get(name)
+            if entry is not None and entry.signature == signature:
+                entry.checked_at = now
+                return entry.value
+
+            with open(path, "r", encoding="utf-8") as f:
+                value = parser(f.read())
+            self._entries[name] = _CacheEntry(signature, value, now)
+            return value
+
+    def get_json(self, name: str) -> Any:
+        """
+        Returns the parsed content of a JSON file from the content directory.
+
+        Raises:
+            OSError: If the file cannot be read
+            json.JSONDecodeError: If the file is not valid JSON
+        """
+        return self._get(name, json.loads)
+
+    def get_text(self, name: str) -> str:
+        """Returns the content of a text (e.g. Markdown) file from the content directory."""
+        return self._get(name, lambda text: text)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drops a cached file (or all files) so that the next access reads it from disk."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+# Shared repository used by all pages
+content_repository = ContentRepository()
+
+
+def get_course_structure() -> Any:
+    """Returns the course structure (blocks, modules and lessons)."""
+    return content_repository.get_json(COURSE_STRUCTURE_FILE)
+
+
+def get_neuroleader_types() -> Any:
+    """Returns the list of neuroleader types."""
+    return content_repository.get_json(NEUROLEADER_TYPES_FILE)
+
+
+def get_neuroleader_type_test() -> Any:
+    """Returns the neuroleader typology test definition."""
+    return content_repository.get_json(NEUROLEADER_TYPE_TEST_FILE)
+
+
+def get_test_questions() -> Any:
+    """Returns the questions of the neuroleadership skills test."""
+    return content_repository.get_json(TEST_QUESTIONS_FILE)
+
+
+def get_neuroleader_type_description(type_id: str) -> str:
+    """Returns the Markdown description of a neuroleader type."""
+    return content_repository.get_text(os.path.join("neuroleader_types", f"{type_id}.md"))
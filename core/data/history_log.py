@@ -0,0 +1,210 @@
+"""
+Append-only history log for BrainVenture application.
+
+Entries are stored as JSON lines in a .jsonl file, oldest first. A small
+.idx file holds the byte offset of every entry (8 bytes per entry), so the
+newest entry and the number of entries are read without scanning the log.
+Adding an entry writes only that entry, regardless of the history length.
+
+Writers (extend, compact, repair) must be serialized by the caller. Appends
+alone can be read without a lock: the log line is written before its index
+entry, so a reader only ever sees fully written entries. compact() replaces
+both files, which cannot happen atomically, so readers of a log that may be
+compacted hold the writers' lock.
+"""
+import json
+import os
+import struct
+from typing import Any, Dict, Iterable, List, Optional
+
+_OFFSET = struct.Struct("<Q")
+
+
+class HistoryLog:
+    """Append-only log of JSON entries with an offset index."""
+
+    def __init__(self, base_path: str):
+        """
+        Args:
+            base_path: Path of the log without extension; the log is stored in
+                base_path + ".jsonl" and the index in base_path + ".idx"
+        """
+        self.log_path = base_path + ".jsonl"
+        self.index_path = base_path + ".idx"
+
+    def exists(self) -> bool:
+        """Checks whether the log file exists."""
+        return os.path.exists(self.log_path)
+
+    @staticmethod
+    def _encode(entry: Dict[str, Any]) -> bytes:
+        return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _read_offsets(self) -> List[int]:
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % _OFFSET.size
+        return [offset for (offset,) in _OFFSET.iter_unpack(data[:usable])]
+
+    def _last_offset(self) -> Optional[int]:
+        index_size = self._size(self.index_path)
+        count = index_size // _OFFSET.size
+        if count == 0:
+            return None
+        with open(self.index_path, "rb") as f:
+            f.seek((count - 1) * _OFFSET.size)
+            return _OFFSET.unpack(f.read(_OFFSET.size))[0]
+
+    def _read_line_at(self, offset: int) -> bytes:
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            return f.readline()
+
+    def _is_consistent(self) -> bool:
+        """Checks that the index ends exactly at the end of the last complete log line."""
+        log_size = self._size(self.log_path)
+        if self._size(self.index_path) % _OFFSET.size:
+            return False
+        last_offset = self._last_offset()
+        if last_offset is None:
+            return log_size == 0
+        if last_offset >= log_size:
+            return False
+        line = self._read_line_at(last_offset)
+        return line.endswith(b"\n") and last_offset + len(line) == log_size
+
+    def repair(self) -> None:
+        """
+        Restores the index after an interrupted write: entries written to the
+        log but missing from the index are indexed, a partially written last
+        line is cut off.
+        """
+        if self._is_consistent():
+            return
+
+        offsets = self._read_offsets()
+        log_size = self._size(self.log_path)
+        # Re-scan from the last indexed entry that is still inside the log
+        while offsets and offsets[-1] >= log_size:
+            offsets.pop()
+        start = offsets.pop() if offsets else 0
+
+        valid_end = start
+        if log_size:
+            with open(self.log_path, "rb") as f:
+                if start:
+                    # An index that does not point at a line boundary is rebuilt from scratch
+                    f.seek(start - 1)
+                    if f.read(1) != b"\n":
+                        offsets, start = [], 0
+                f.seek(start)
+                position = start
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        break
+                    offsets.append(position)
+                    position += len(line)
+                valid_end = position
+
+        if valid_end < log_size:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(valid_end)
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Appends an entry as the newest entry of the log."""
+        self.extend([entry])
+
+    def extend(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Appends several entries (oldest first) with a single write to each file."""
+        lines = [self._encode(entry) for entry in entries]
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        self.repair()
+
+        offset = self._size(self.log_path)
+        offsets = []
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line)
+        with open(self.log_path, "ab") as f:
+            f.write(b"".join(lines))
+        with open(self.index_path, "ab") as f:
+            f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+
+    def count(self) -> int:
+        """Returns the number of entries in the log."""
+        return self._size(self.index_path) // _OFFSET.size
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Returns the newest entry or None if the log is empty."""
+        last_offset = self._last_offset()
+        if last_offset is None:
+            return None
+        return json.loads(self._read_line_at(last_offset))
+
+    def read_newest(self, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns entries newest first.
+
+        Args:
+            limit: Maximum number of entries to return (None returns all)
+            skip: Number of newest entries to skip
+        """
+        offsets = self._read_offsets()
+        end = len(offsets) - skip
+        start = 0 if limit is None else max(end - limit, 0)
+        if end <= start:
+            return []
+
+        with open(self.log_path, "rb") as f:
+            f.seek(offsets[start])
+            lines = [f.readline() for _ in range(end - start)]
+        return [json.loads(line) for line in reversed(lines)]
+
+    def compact(self, max_entries: Optional[int] = None) -> None:
+        """
+        Rewrites the log with only valid entries and rebuilds the index. The
+        files are replaced one after the other, so readers must hold the
+        writers' lock.
+
+        Args:
+            max_entries: If set, only this many newest entries are kept
+        """
+        if not self.exists():
+            return
+        self.repair()
+        entries = self.read_newest(max_entries)
+        entries.reverse()
+
+        tmp_log = self.log_path + ".tmp"
+        tmp_index = self.index_path + ".tmp"
+        offsets = []
+        with open(tmp_log, "wb") as f:
+            for entry in entries:
+                offsets.append(f.tell())
+                f.write(self._encode(entry))
+        with open(tmp_index, "wb") as f:
+            f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        # Without an index the log is re-indexed on next access, so a crash
+        # between the two replacements cannot leave a stale index behind
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        os.replace(tmp_log, self.log_path)
+        os.replace(tmp_index, self.index_path)
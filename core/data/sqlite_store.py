@@ -0,0 +1,326 @@
+"""
+SQLite storage backend for BrainVenture application.
+
+Keeps user profiles, neuroleader test runs with per-type scores, lesson
+completion and badges in a local SQLite database. The database runs in WAL
+mode, so pages reading results are never blocked by a session saving them.
+The public methods mirror UserStore, so both backends are interchangeable.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.app_config import DEFAULT_USER_ID, LEGACY_USER_DATA_FILE, SQLITE_DB_FILE
+from core.data.user_store import VERSION_FIELD, ConcurrentUpdateError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS test_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    dominant_type TEXT,
+    secondary_type TEXT,
+    tertiary_type TEXT,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_test_runs_user_date ON test_runs (user_id, date DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS test_scores (
+    run_id INTEGER NOT NULL REFERENCES test_runs (id) ON DELETE CASCADE,
+    type_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (run_id, type_id)
+);
+
+CREATE TABLE IF NOT EXISTS lesson_completions (
+    user_id TEXT NOT NULL,
+    lesson_id TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, lesson_id)
+);
+CREATE INDEX IF NOT EXISTS idx_lesson_completions_user_date ON lesson_completions (user_id, completed_at);
+
+CREATE TABLE IF NOT EXISTS badges (
+    user_id TEXT NOT NULL,
+    badge_id TEXT NOT NULL,
+    awarded_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, badge_id)
+);
+CREATE INDEX IF NOT EXISTS idx_badges_user_date ON badges (user_id, awarded_at);
+"""
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _now() -> str:
+    return datetime.now().strftime(DATE_FORMAT)
+
+
+class SQLiteUserStore:
+    """Storage of user profiles, test results, progress and badges in SQLite."""
+
+    def __init__(self, db_file: str = SQLITE_DB_FILE, legacy_file: Optional[str] = LEGACY_USER_DATA_FILE):
+        """
+        Args:
+            db_file: Path of the SQLite database file
+            legacy_file: Shared user_data.json imported for the default user
+                on first access (None disables the import)
+        """
+        self.db_file = db_file
+        self.legacy_file = legacy_file
+        self._local = threading.local()
+        self._migrated = set()
+
+        db_dir = os.path.dirname(db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Closes the connection of the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _ensure_migrated(self, user_id: str) -> None:
+        """Imports the legacy shared user_data.json for the default user."""
+        if user_id in self._migrated:
+            return
+        if user_id != DEFAULT_USER_ID or not self.legacy_file or not os.path.exists(self.legacy_file):
+            self._migrated.add(user_id)
+            return
+
+        with open(self.legacy_file, "r", encoding="utf-8") as f:
+            legacy_data = json.load(f)
+        test_history = legacy_data.pop("neuroleader_tests", [])
+
+        conn = self._connection()
+        with conn:
+            # The write lock makes sure only one process imports the legacy data
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,)).fetchone():
+                self._migrated.add(user_id)
+                return
+            conn.execute(
+                "INSERT OR IGNORE INTO users (user_id, profile, updated_at) VALUES (?, ?, ?)",
+                (user_id, json.dumps(legacy_data, ensure_ascii=False), _now()),
+            )
+            # History is stored newest first, insert oldest first to keep ids in date order
+            for result in reversed(test_history):
+                self._insert_test_run(conn, user_id, result)
+        self._migrated.add(user_id)
+
+    # Users
+
+    def list_users(self) -> List[str]:
+        """Returns ids of the users with stored data."""
+        rows = self._connection().execute(
+            "SELECT user_id FROM users UNION SELECT user_id FROM test_runs"
+        ).fetchall()
+        users = {row["user_id"] for row in rows}
+        if self.legacy_file and os.path.exists(self.legacy_file):
+            users.add(DEFAULT_USER_ID)
+        return sorted(users)
+
+    # Profile
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        """Returns the profile record of a user (empty dict for unknown users)."""
+        self._ensure_migrated(user_id)
+        row = self._connection().execute(
+            "SELECT profile FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row["profile"]) if row else {}
+
+    def _write_profile(self, user_id: str, changes: Dict[str, Any], replace: bool,
+                       expected_version: Optional[int]) -> Dict[str, Any]:
+        self._ensure_migrated(user_id)
+        conn = self._connection()
+        with conn:
+            # BEGIN IMMEDIATE takes the write lock before reading the current record
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT profile FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            current = json.loads(row["profile"]) if row else {}
+            current_version = current.get(VERSION_FIELD, 0)
+            if expected_version is not None and expected_version != current_version:
+                raise ConcurrentUpdateError(
+                    f"Profile of user {user_id} changed (version {current_version}, expected {expected_version})"
+                )
+            record = dict(changes) if replace else {**current, **changes}
+            record[VERSION_FIELD] = current_version + 1
+            conn.execute(
+                "INSERT INTO users (user_id, profile, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET profile = excluded.profile, updated_at = excluded.updated_at",
+                (user_id, json.dumps(record, ensure_ascii=False), _now()),
+            )
+        return record
+
+    def save_user(self, user_id: str, record: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Replaces the profile record of a user and returns the saved record.
+
+        Raises:
+            ConcurrentUpdateError: If expected_version is given and the stored
+                record has a different version
+        """
+        return self._write_profile(user_id, record, True, expected_version)
+
+    def update_user(self, user_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Updates selected fields of a user profile and returns the new record.
+
+        Raises:
+            ConcurrentUpdateError: If expected_version is given and the stored
+                record has a different version
+        """
+        return self._write_profile(user_id, changes, False, expected_version)
+
+    # Neuroleader test history
+
+    @staticmethod
+    def _insert_test_run(conn: sqlite3.Connection, user_id: str, result: Dict[str, Any]) -> None:
+        cursor = conn.execute(
+            "INSERT INTO test_runs (user_id, date, dominant_type, secondary_type, tertiary_type, result) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user_id,
+                result.get("date") or _now(),
+                result.get("dominant_type"),
+                result.get("secondary_type"),
+                result.get("tertiary_type"),
+                json.dumps(result, ensure_ascii=False),
+            ),
+        )
+        scores = result.get("scores") or {}
+        conn.executemany(
+            "INSERT INTO test_scores (run_id, type_id, score) VALUES (?, ?, ?)",
+            [(cursor.lastrowid, type_id, float(score)) for type_id, score in scores.items()],
+        )
+
+    def add_test_result(self, user_id: str, result: Dict[str, Any]) -> None:
+        """Adds a test result as the newest entry of the user's test history."""
+        self._ensure_migrated(user_id)
+        conn = self._connection()
+        with conn:
+            self._insert_test_run(conn, user_id, result)
+
+    def add_test_results(self, user_id: str, results: List[Dict[str, Any]]) -> None:
+        """Adds several test results (oldest first) in a single transaction."""
+        self._ensure_migrated(user_id)
+        conn = self._connection()
+        with conn:
+            for result in results:
+                self._insert_test_run(conn, user_id, result)
+
+    def get_test_history(self, user_id: str, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns the user's test results, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of results to return (None returns all)
+            skip: Number of newest results to skip
+        """
+        self._ensure_migrated(user_id)
+        rows = self._connection().execute(
+            "SELECT result FROM test_runs WHERE user_id = ? ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (user_id, -1 if limit is None else limit, skip),
+        ).fetchall()
+        return [json.loads(row["result"]) for row in rows]
+
+    def get_latest_test_result(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the newest test result of the user or None."""
+        self._ensure_migrated(user_id)
+        row = self._connection().execute(
+            "SELECT result FROM test_runs WHERE user_id = ? ORDER BY date DESC, id DESC LIMIT 1", (user_id,)
+        ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def count_test_results(self, user_id: str) -> int:
+        """Returns the number of stored test results of the user."""
+        self._ensure_migrated(user_id)
+        row = self._connection().execute(
+            "SELECT COUNT(*) AS n FROM test_runs WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row["n"]
+
+    def get_all_test_scores(self) -> List[Tuple[Dict[str, float], Optional[str]]]:
+        """Returns (scores, cohort) of every stored test result of all users, read from test_scores."""
+        self._ensure_migrated(DEFAULT_USER_ID)
+        rows = self._connection().execute(
+            "SELECT r.id, json_extract(r.result, '$.cohort') AS cohort, s.type_id, s.score "
+            "FROM test_runs r LEFT JOIN test_scores s ON s.run_id = r.id ORDER BY r.id"
+        ).fetchall()
+        runs: Dict[int, Tuple[Dict[str, float], Optional[str]]] = {}
+        for row in rows:
+            scores, _ = runs.setdefault(row["id"], ({}, row["cohort"]))
+            if row["type_id"] is not None:
+                scores[row["type_id"]] = row["score"]
+        return list(runs.values())
+
+    # Lesson completion
+
+    def mark_lesson_completed(self, user_id: str, lesson_id: str) -> bool:
+        """Marks a lesson as completed. Returns False if it was already completed."""
+        self._ensure_migrated(user_id)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO lesson_completions (user_id, lesson_id, completed_at) VALUES (?, ?, ?)",
+                (user_id, lesson_id, _now()),
+            )
+        return cursor.rowcount > 0
+
+    def get_completed_lessons(self, user_id: str) -> List[str]:
+        """Returns ids of the lessons completed by the user, in completion order."""
+        self._ensure_migrated(user_id)
+        rows = self._connection().execute(
+            "SELECT lesson_id FROM lesson_completions WHERE user_id = ? ORDER BY completed_at, rowid",
+            (user_id,),
+        ).fetchall()
+        return [row["lesson_id"] for row in rows]
+
+    # Badges
+
+    def award_badge(self, user_id: str, badge_id: str) -> bool:
+        """Awards a badge to the user. Returns False if the user already has it."""
+        self._ensure_migrated(user_id)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO badges (user_id, badge_id, awarded_at) VALUES (?, ?, ?)",
+                (user_id, badge_id, _now()),
+            )
+        return cursor.rowcount > 0
+
+    def get_badges(self, user_id: str) -> List[Dict[str, str]]:
+        """Returns the badges awarded to the user as dicts with badge_id and awarded_at."""
+        self._ensure_migrated(user_id)
+        rows = self._connection().execute(
+            "SELECT badge_id, awarded_at FROM badges WHERE user_id = ? ORDER BY awarded_at, rowid",
+            (user_id,),
+        ).fetchall()
+        return [{"badge_id": row["badge_id"], "awarded_at": row["awarded_at"]} for row in rows]
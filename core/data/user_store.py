@@ -0,0 +1,362 @@
+"""
+Per-user storage for BrainVenture application.
+
+Every user has a separate directory under data/users holding the profile
+record and the neuroleader test history, so saving data for one user never
+rewrites the data of other users. Profile records are cached in memory and
+looked up by user id; the test history is an append-only log (see
+core.data.history_log), so saving a result costs the same for every retake.
+
+Files are replaced atomically and every read-modify-write runs under a
+per-user lock shared by all server processes. Profile records carry a
+version number for optimistic concurrency checks.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.app_config import (
+    DEFAULT_USER_ID,
+    LEGACY_USER_DATA_FILE,
+    STORAGE_BACKEND,
+    TEST_HISTORY_COMPACT_EVERY,
+    TEST_HISTORY_MAX_ENTRIES,
+    USERS_DIR,
+    WRITE_BEHIND_ENABLED,
+)
+from core.data.atomic_io import FileLock, atomic_write_json
+from core.data.history_log import HistoryLog
+
+PROFILE_FILE = "profile.json"
+LOCK_FILE = ".lock"
+VERSION_FIELD = "_version"
+TEST_HISTORY_LOG = "neuroleader_tests"
+# Test history format used before the append-only log (list, newest first)
+LEGACY_TEST_HISTORY_FILE = "neuroleader_tests.json"
+
+_SAFE_USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ConcurrentUpdateError(Exception):
+    """Raised when a record was changed by another session since it was read."""
+
+
+class _UserLock:
+    """
+    Reentrant lock of a single user's data: a threading lock for sessions of
+    this process combined with a file lock for other server processes.
+    """
+
+    def __init__(self, lock_path: str):
+        self._thread_lock = threading.RLock()
+        self._file_lock = FileLock(lock_path)
+        self._depth = 0
+
+    def __enter__(self) -> "_UserLock":
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0:
+                self._file_lock.acquire()
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                self._file_lock.release()
+        finally:
+            self._thread_lock.release()
+
+
+class UserStore:
+    """Storage of user profiles and test results keyed by user id."""
+
+    def __init__(self, users_dir: str = USERS_DIR, legacy_file: Optional[str] = LEGACY_USER_DATA_FILE):
+        """
+        Args:
+            users_dir: Directory containing one subdirectory per user
+            legacy_file: Shared user_data.json imported for the default user
+                on first access (None disables the import)
+        """
+        self.users_dir = users_dir
+        self.legacy_file = legacy_file
+        self._cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
+        self._locks: Dict[str, _UserLock] = {}
+        self._locks_guard = threading.Lock()
+        self._checked_users = set()
+
+    # Paths and locks
+
+    def _user_dir(self, user_id: str) -> str:
+        if _SAFE_USER_ID.match(user_id):
+            dirname = user_id
+        else:
+            dirname = "u_" + hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.users_dir, dirname)
+
+    def _path(self, user_id: str, name: str) -> str:
+        return os.path.join(self._user_dir(user_id), name)
+
+    def _lock(self, user_id: str) -> _UserLock:
+        """Returns the lock guarding read-modify-write cycles on the user's data."""
+        lock = self._locks.get(user_id)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(user_id, _UserLock(self._path(user_id, LOCK_FILE)))
+        return lock
+
+    # Low-level file access
+
+    def _read(self, user_id: str, name: str, default: Any) -> Any:
+        path = self._path(user_id, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._cache.pop((user_id, name), None)
+            return default
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._cache.get((user_id, name))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(path, "r", encoding="utf-8") as f:
+            value = json.load(f)
+        self._cache[(user_id, name)] = (signature, value)
+        return value
+
+    def _write(self, user_id: str, name: str, value: Any) -> None:
+        path = self._path(user_id, name)
+        atomic_write_json(path, value)
+        stat = os.stat(path)
+        self._cache[(user_id, name)] = ((stat.st_mtime_ns, stat.st_size), value)
+
+    def _ensure_ready(self, user_id: str) -> None:
+        """
+        Prepares the user's data on first access in this process: imports the
+        legacy shared user_data.json for the default user, converts the older
+        test history format and repairs the history log after a crash.
+        """
+        if user_id in self._checked_users:
+            return
+        with self._lock(user_id):
+            if user_id in self._checked_users:
+                return
+
+            log = self._history_log(user_id)
+            if (user_id == DEFAULT_USER_ID and self.legacy_file and os.path.exists(self.legacy_file)
+                    and not os.path.exists(self._path(user_id, PROFILE_FILE))):
+                with open(self.legacy_file, "r", encoding="utf-8") as f:
+                    legacy_data = json.load(f)
+                test_history = legacy_data.pop("neuroleader_tests", [])
+                legacy_data[VERSION_FIELD] = 1
+                self._write(user_id, PROFILE_FILE, legacy_data)
+                log.extend(reversed(test_history))
+
+            legacy_history_path = self._path(user_id, LEGACY_TEST_HISTORY_FILE)
+            if not log.exists() and os.path.exists(legacy_history_path):
+                with open(legacy_history_path, "r", encoding="utf-8") as f:
+                    test_history = json.load(f)
+                log.extend(reversed(test_history))
+                os.remove(legacy_history_path)
+
+            log.repair()
+            self._checked_users.add(user_id)
+
+    # Users
+
+    def list_users(self) -> List[str]:
+        """
+        Returns ids of the users with stored data. Users whose id is not safe
+        as a directory name are listed by their directory name, which the
+        methods of the store accept as the same user.
+        """
+        try:
+            names = os.listdir(self.users_dir)
+        except FileNotFoundError:
+            names = []
+        users = {name for name in names if os.path.isdir(os.path.join(self.users_dir, name))}
+        if self.legacy_file and os.path.exists(self.legacy_file):
+            users.add(DEFAULT_USER_ID)
+        return sorted(users)
+
+    # Profile
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        """
+        Returns the profile record of a user (empty dict for unknown users).
+
+        The record contains a "_version" field that can be passed as
+        expected_version to save_user() or update_user(). The returned dict is
+        shared with the cache and must not be modified.
+        """
+        self._ensure_ready(user_id)
+        return self._read(user_id, PROFILE_FILE, {})
+
+    def _save_profile(self, user_id: str, record: Dict[str, Any], expected_version: Optional[int]) -> Dict[str, Any]:
+        # Must be called with the user's lock held
+        current_version = self._read(user_id, PROFILE_FILE, {}).get(VERSION_FIELD, 0)
+        if expected_version is not None and expected_version != current_version:
+            raise ConcurrentUpdateError(
+                f"Profile of user {user_id} changed (version {current_version}, expected {expected_version})"
+            )
+        record = dict(record)
+        record[VERSION_FIELD] = current_version + 1
+        self._write(user_id, PROFILE_FILE, record)
+        return record
+
+    def save_user(self, user_id: str, record: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Replaces the profile record of a user and returns the saved record.
+
+        Raises:
+            ConcurrentUpdateError: If expected_version is given and the stored
+                record has a different version
+        """
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            return self._save_profile(user_id, record, expected_version)
+
+    def update_user(self, user_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Updates selected fields of a user profile and returns the new record.
+
+        Raises:
+            ConcurrentUpdateError: If expected_version is given and the stored
+                record has a different version
+        """
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            record = dict(self._read(user_id, PROFILE_FILE, {}))
+            record.update(changes)
+            return self._save_profile(user_id, record, expected_version)
+
+    # Neuroleader test history
+
+    def _history_log(self, user_id: str) -> HistoryLog:
+        return HistoryLog(self._path(user_id, TEST_HISTORY_LOG))
+
+    def add_test_result(self, user_id: str, result: Dict[str, Any]) -> None:
+        """Adds a test result as the newest entry of the user's test history."""
+        self.add_test_results(user_id, [result])
+
+    def add_test_results(self, user_id: str, results: List[Dict[str, Any]]) -> None:
+        """Adds several test results (oldest first) with a single write."""
+        if not results:
+            return
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            log = self._history_log(user_id)
+            count_before = log.count()
+            log.extend(results)
+            if TEST_HISTORY_COMPACT_EVERY and (
+                    log.count() // TEST_HISTORY_COMPACT_EVERY > count_before // TEST_HISTORY_COMPACT_EVERY):
+                log.compact(TEST_HISTORY_MAX_ENTRIES)
+
+    def get_test_history(self, user_id: str, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns the user's test results, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of results to return (None returns all)
+            skip: Number of newest results to skip
+        """
+        self._ensure_ready(user_id)
+        # Under the user's lock, as compaction replaces the log and its index
+        with self._lock(user_id):
+            return self._history_log(user_id).read_newest(limit, skip)
+
+    def get_latest_test_result(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the newest test result of the user or None."""
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            return self._history_log(user_id).latest()
+
+    def count_test_results(self, user_id: str) -> int:
+        """Returns the number of stored test results of the user."""
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            return self._history_log(user_id).count()
+
+    def get_all_test_scores(self) -> List[Tuple[Dict[str, float], Optional[str]]]:
+        """Returns (scores, cohort) of every stored test result of all users."""
+        return [
+            (result.get("scores") or {}, result.get("cohort"))
+            for user_id in self.list_users()
+            for result in self.get_test_history(user_id)
+        ]
+
+    # Lesson completion
+
+    def mark_lesson_completed(self, user_id: str, lesson_id: str) -> bool:
+        """Marks a lesson as completed. Returns False if it was already completed."""
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            record = self._read(user_id, PROFILE_FILE, {})
+            completed_lessons = record.get("completed_lessons", [])
+            if lesson_id in completed_lessons:
+                return False
+            self.update_user(user_id, {"completed_lessons": completed_lessons + [lesson_id]})
+            return True
+
+    def get_completed_lessons(self, user_id: str) -> List[str]:
+        """Returns ids of the lessons completed by the user, in completion order."""
+        return list(self.get_user(user_id).get("completed_lessons", []))
+
+    # Badges
+
+    def award_badge(self, user_id: str, badge_id: str) -> bool:
+        """Awards a badge to the user. Returns False if the user already has it."""
+        self._ensure_ready(user_id)
+        with self._lock(user_id):
+            awarded_badges = self._read(user_id, PROFILE_FILE, {}).get("awarded_badges", [])
+            if any(badge["badge_id"] == badge_id for badge in awarded_badges):
+                return False
+            badge = {"badge_id": badge_id, "awarded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            self.update_user(user_id, {"awarded_badges": awarded_badges + [badge]})
+            return True
+
+    def get_badges(self, user_id: str) -> List[Dict[str, str]]:
+        """Returns the badges awarded to the user as dicts with badge_id and awarded_at."""
+        return list(self.get_user(user_id).get("awarded_badges", []))
+
+
+_user_store = None
+_user_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """
+    Returns the user store shared by all sessions of the process.
+
+    The backend is selected with STORAGE_BACKEND in config/app_config.py and
+    can be overridden with the BRAINVENTURE_STORAGE_BACKEND environment variable.
+    With WRITE_BEHIND_ENABLED (overridden with BRAINVENTURE_WRITE_BEHIND="1"
+    or "0") the store saves writes in the background (see core.data.write_behind).
+    """
+    global _user_store
+    if _user_store is None:
+        with _user_store_lock:
+            if _user_store is None:
+                backend = os.environ.get("BRAINVENTURE_STORAGE_BACKEND", STORAGE_BACKEND)
+                if backend == "sqlite":
+                    from core.data.sqlite_store import SQLiteUserStore
+                    store = SQLiteUserStore()
+                elif backend == "json":
+                    store = UserStore()
+                else:
+                    raise ValueError(f"Unknown storage backend: {backend}")
+                if os.environ.get("BRAINVENTURE_WRITE_BEHIND", "1" if WRITE_BEHIND_ENABLED else "0") == "1":
+                    from core.data.write_behind import WriteBehindStore
+                    store = WriteBehindStore(store)
+                _user_store = store
+    return _user_store
@@ -0,0 +1,384 @@
+"""
+Write-behind queue for BrainVenture application.
+
+Streamlit pages save progress and test results on the script
+thread. Instead of waiting for the disk, writes are queued and applied by a
+background thread every few hundred milliseconds. Writes for the same key
+(usually a user id) that arrive within one flush window are coalesced and
+applied together. The queue is flushed when the process exits.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from config.app_config import WRITE_BEHIND_FLUSH_INTERVAL, WRITE_BEHIND_MAX_PENDING
+from core.data.user_store import VERSION_FIELD
+
+logger = logging.getLogger("brainventure")
+
+# Number of attempts before a failing write is dropped
+MAX_ATTEMPTS = 3
+
+class _PendingOperation:
+    __slots__ = ("fn", "attempts")
+
+    def __init__(self, fn: Callable[[], None]):
+        self.fn = fn
+        self.attempts = 0
+
+
+class WriteBehindQueue:
+    """Queue of write operations applied in batches by a background thread."""
+
+    def __init__(self, flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL, max_pending: int = WRITE_BEHIND_MAX_PENDING):
+        """
+        Args:
+            flush_interval: Number of seconds between two background flushes
+            max_pending: Maximum number of queued operations; submit() waits
+                for a flush when the limit is reached
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # key -> (coalesce id -> operation); operations of a key run in submission order
+        self._pending: "OrderedDict[str, OrderedDict[Any, _PendingOperation]]" = OrderedDict()
+        self._pending_count = 0
+        self._condition = threading.Condition()
+        # One lock per key: operations of a key never run concurrently, but a
+        # flush of one key does not wait for the writes of other keys
+        self._key_locks: Dict[str, threading.RLock] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._sequence = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, key: str, fn: Callable[[], None], coalesce_id: Any = None) -> None:
+        """
+        Queues a write operation.
+
+        Args:
+            key: Group of the operation (e.g. user id); operations of a group
+                are applied in order and flushed together
+            fn: Function performing the write
+            coalesce_id: If given, a queued operation of the same group with the
+                same id is replaced by this one instead of queuing both
+        """
+        if self._closed:
+            fn()
+            return
+
+        with self._condition:
+            while self._pending_count >= self.max_pending:
+                # Bounded memory: wake the writer and wait for it to catch up
+                self._condition.notify_all()
+                self._condition.wait(self.flush_interval)
+
+            operations = self._pending.setdefault(key, OrderedDict())
+            if coalesce_id is None:
+                self._sequence += 1
+                coalesce_id = ("seq", self._sequence)
+            if coalesce_id in operations:
+                operations[coalesce_id].fn = fn
+            else:
+                operations[coalesce_id] = _PendingOperation(fn)
+                self._pending_count += 1
+            self._ensure_thread()
+
+    def pending_count(self) -> int:
+        """Returns the number of queued operations."""
+        return self._pending_count
+
+    def key_lock(self, key: str) -> threading.RLock:
+        """
+        Returns the lock held while operations of a group are applied. Holding
+        it keeps the group's queued operations from being applied meanwhile.
+        """
+        with self._condition:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.RLock()
+            return lock
+
+    def _take(self, key: str) -> "OrderedDict[Any, _PendingOperation]":
+        with self._condition:
+            operations = self._pending.pop(key, None) or OrderedDict()
+            self._pending_count -= len(operations)
+            self._condition.notify_all()
+            return operations
+
+    def _apply(self, key: str, operations: "OrderedDict[Any, _PendingOperation]") -> None:
+        failed: List[tuple] = []
+        for coalesce_id, operation in operations.items():
+            try:
+                operation.fn()
+            except Exception:
+                operation.attempts += 1
+                if operation.attempts < MAX_ATTEMPTS:
+                    failed.append((coalesce_id, operation))
+                else:
+                    logger.exception("Dropping queued write for %s after %d attempts", key, operation.attempts)
+
+        if failed:
+            with self._condition:
+                pending = self._pending.setdefault(key, OrderedDict())
+                for coalesce_id, operation in reversed(failed):
+                    if coalesce_id not in pending:
+                        pending[coalesce_id] = operation
+                        pending.move_to_end(coalesce_id, last=False)
+                        self._pending_count += 1
+
+    def _flush_key(self, key: str) -> None:
+        # Taken under the key's lock, so a flush of the key returns only
+        # after operations of the key taken by another thread were applied
+        with self.key_lock(key):
+            operations = self._take(key)
+            if operations:
+                self._apply(key, operations)
+
+    def flush(self, key: Optional[str] = None) -> None:
+        """Applies queued operations synchronously (of one group or all of them)."""
+        if key is not None:
+            self._flush_key(key)
+            return
+        with self._condition:
+            keys = list(self._pending)
+        for pending_key in keys:
+            self._flush_key(pending_key)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                # Also woken when a flush frees space, so keep waiting until the interval ends
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and self._pending_count < self.max_pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self) -> None:
+        """Flushes all queued operations and stops the background thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
+class WriteBehindStore:
+    """
+    User store wrapper that queues writes in a WriteBehindQueue.
+
+    Profile changes of one user are merged and test results are written in
+    one batch. Reads return the stored data with the user's queued writes
+    applied on top, so a session sees its own changes without waiting for
+    them to be written.
+    """
+
+    def __init__(self, store, queue: Optional["WriteBehindQueue"] = None):
+        """
+        Args:
+            store: Store applying the writes (UserStore or SQLiteUserStore)
+            queue: Queue of pending writes (default: shared application queue)
+        """
+        self.store = store
+        self.queue = queue if queue is not None else get_write_queue()
+        self._lock = threading.Lock()
+        self._profile_changes: Dict[str, Dict[str, Any]] = {}
+        self._test_results: Dict[str, List[Dict[str, Any]]] = {}
+        self._lessons: Dict[str, List[str]] = {}
+
+    def _key(self, user_id: str) -> str:
+        return f"user:{user_id}"
+
+    def _flush_user(self, user_id: str) -> None:
+        self.queue.flush(self._key(user_id))
+
+    # Writes (a payload taken for a failed write is put back in front of
+    # newer entries, so the queue's next attempt writes it)
+
+    def _write_profile_changes(self, user_id: str) -> None:
+        with self._lock:
+            changes = self._profile_changes.pop(user_id, None)
+        if not changes:
+            return
+        try:
+            self.store.update_user(user_id, changes)
+        except Exception:
+            with self._lock:
+                changes.update(self._profile_changes.get(user_id, {}))
+                self._profile_changes[user_id] = changes
+            raise
+
+    def _write_test_results(self, user_id: str) -> None:
+        with self._lock:
+            results = self._test_results.pop(user_id, None)
+        if not results:
+            return
+        try:
+            self.store.add_test_results(user_id, results)
+        except Exception:
+            with self._lock:
+                self._test_results[user_id] = results + self._test_results.get(user_id, [])
+            raise
+
+    def _write_lessons(self, user_id: str) -> None:
+        with self._lock:
+            lesson_ids = self._lessons.pop(user_id, None)
+        for position, lesson_id in enumerate(lesson_ids or []):
+            try:
+                self.store.mark_lesson_completed(user_id, lesson_id)
+            except Exception:
+                with self._lock:
+                    self._lessons[user_id] = lesson_ids[position:] + self._lessons.get(user_id, [])
+                raise
+
+    def update_user(self, user_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Queues a profile update and returns the updated record. Updates with
+        expected_version are applied immediately, because the version check
+        must report conflicts. For queued updates "_version" is the version
+        the record gets when the queued changes are written.
+        """
+        if expected_version is not None:
+            self._flush_user(user_id)
+            return self.store.update_user(user_id, changes, expected_version=expected_version)
+
+        with self._lock:
+            pending = self._profile_changes.setdefault(user_id, {})
+            pending.update(changes)
+            pending = dict(pending)
+        record = self._with_changes(self.store.get_user(user_id), pending)
+        self.queue.submit(self._key(user_id), lambda: self._write_profile_changes(user_id), "profile")
+        return record
+
+    def save_user(self, user_id: str, record: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """Replaces the profile record immediately (after the user's queued writes)."""
+        self._flush_user(user_id)
+        return self.store.save_user(user_id, record, expected_version=expected_version)
+
+    def add_test_result(self, user_id: str, result: Dict[str, Any]) -> None:
+        """Queues a test result; results queued within one flush window are written together."""
+        with self._lock:
+            self._test_results.setdefault(user_id, []).append(result)
+        self.queue.submit(self._key(user_id), lambda: self._write_test_results(user_id), "test_results")
+
+    def add_test_results(self, user_id: str, results: List[Dict[str, Any]]) -> None:
+        """Queues several test results (oldest first)."""
+        for result in results:
+            self.add_test_result(user_id, result)
+
+    def mark_lesson_completed(self, user_id: str, lesson_id: str) -> bool:
+        """Queues a lesson completion. Returns False if the lesson was already completed."""
+        # The store is read outside the store-wide lock, so other users' writes are not blocked
+        with self.queue.key_lock(self._key(user_id)):
+            completed = self.store.get_completed_lessons(user_id)
+            with self._lock:
+                pending = self._lessons.setdefault(user_id, [])
+                if lesson_id in pending or lesson_id in completed:
+                    return False
+                pending.append(lesson_id)
+        self.queue.submit(self._key(user_id), lambda: self._write_lessons(user_id), "lessons")
+        return True
+
+    def award_badge(self, user_id: str, badge_id: str) -> bool:
+        """Awards a badge immediately (after the user's queued writes)."""
+        self._flush_user(user_id)
+        return self.store.award_badge(user_id, badge_id)
+
+    def flush(self) -> None:
+        """Saves all queued writes of this store."""
+        self.queue.flush()
+
+    def close(self) -> None:
+        """Saves queued writes and closes the underlying store if it supports it."""
+        self.queue.flush()
+        close = getattr(self.store, "close", None)
+        if close is not None:
+            close()
+
+    # Reads (stored data with the user's queued writes applied on top; the
+    # user's key lock keeps a background write from running in between)
+
+    @staticmethod
+    def _with_changes(record: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        # Queued changes are written together as one update, which increments the version once
+        if not changes:
+            return record
+        return {**record, **changes, VERSION_FIELD: record.get(VERSION_FIELD, 0) + 1}
+
+    def _pending_results(self, user_id: str) -> List[Dict[str, Any]]:
+        """Returns the user's queued test results, newest first."""
+        with self._lock:
+            return list(reversed(self._test_results.get(user_id, [])))
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        """Returns the profile record with the queued changes applied (see update_user for "_version")."""
+        with self.queue.key_lock(self._key(user_id)):
+            record = self.store.get_user(user_id)
+            with self._lock:
+                changes = dict(self._profile_changes.get(user_id, {}))
+        return self._with_changes(record, changes)
+
+    def get_test_history(self, user_id: str, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
+        """Returns the user's test results including queued ones, newest first (see UserStore)."""
+        with self.queue.key_lock(self._key(user_id)):
+            pending = self._pending_results(user_id)
+            history = pending[skip:]
+            if limit is not None:
+                history = history[:limit]
+            stored_limit = None if limit is None else limit - len(history)
+            if stored_limit is None or stored_limit > 0:
+                history += self.store.get_test_history(user_id, stored_limit, max(skip - len(pending), 0))
+        return history
+
+    def get_latest_test_result(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the newest test result of the user (queued or stored) or None."""
+        with self.queue.key_lock(self._key(user_id)):
+            pending = self._pending_results(user_id)
+            return pending[0] if pending else self.store.get_latest_test_result(user_id)
+
+    def count_test_results(self, user_id: str) -> int:
+        """Returns the number of stored and queued test results of the user."""
+        with self.queue.key_lock(self._key(user_id)):
+            return self.store.count_test_results(user_id) + len(self._pending_results(user_id))
+
+    def get_completed_lessons(self, user_id: str) -> List[str]:
+        """Returns ids of the completed lessons, queued completions last."""
+        with self.queue.key_lock(self._key(user_id)):
+            completed = self.store.get_completed_lessons(user_id)
+            with self._lock:
+                pending = list(self._lessons.get(user_id, []))
+        return completed + [lesson_id for lesson_id in pending if lesson_id not in completed]
+
+    def __getattr__(self, name: str):
+        # Other reads (e.g. get_badges, badges are written immediately) go to the store
+        return getattr(self.store, name)
+
+
+_write_queue: Optional[WriteBehindQueue] = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """Returns the write-behind queue shared by the whole process."""
+    global _write_queue
+    if _write_queue is None:
+        with _write_queue_lock:
+            if _write_queue is None:
+                _write_queue = WriteBehindQueue()
+    return _write_queue
@@ -0,0 +1,179 @@
+"""
+Compiled course model for BrainVenture application.
+
+The course structure (blocks -> modules -> lessons) is compiled once into
+objects with stable ids, parent pointers and ordinal positions, indexed by
+id, slug and title. Every page identifies lessons by the same id, so lookups
+are dictionary hits instead of walks over the nested structure.
+
+Lessons define their ids in course_structure.json ("id"), so inserting or
+reordering lessons does not change the ids stored with user progress. A
+structure without any ids (e.g. sample data) gets "<block>.<module>.<lesson>"
+positions counted from 1 (e.g. "1.2.3"); mixing both is rejected, as an
+explicit id could match the position of another lesson.
+Lesson prerequisites are compiled into a PrerequisiteGraph with the model.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.data.content_repository import get_course_structure
+from modules.learning.prerequisites import PrerequisiteGraph
+from utils.helpers import slugify
+
+
+class Block:
+    """Course block (top level of the structure)."""
+
+    __slots__ = ("id", "index", "title", "emoji", "description", "modules", "lesson_count", "data")
+
+    def __init__(self, index: int, data: Dict[str, Any]):
+        self.id = str(index + 1)
+        self.index = index
+        self.title = data.get("title", "Blok")
+        self.emoji = data.get("emoji", "📒")
+        self.description = data.get("description", "")
+        self.modules: Tuple["Module", ...] = ()
+        self.lesson_count = 0
+        self.data = data
+
+    @property
+    def lessons(self) -> List["Lesson"]:
+        return [lesson for module in self.modules for lesson in module.lessons]
+
+
+class Module:
+    """Course module (group of lessons inside a block)."""
+
+    __slots__ = ("id", "index", "ordinal", "title", "description", "block", "lessons", "data")
+
+    def __init__(self, block: Block, index: int, ordinal: int, data: Dict[str, Any]):
+        self.id = f"{block.id}.{index + 1}"
+        self.index = index
+        self.ordinal = ordinal
+        self.title = data.get("title", "Moduł")
+        self.description = data.get("description", "")
+        self.block = block
+        self.lessons: Tuple["Lesson", ...] = ()
+        self.data = data
+
+
+class Lesson:
+    """Course lesson with pointers to its module and block."""
+
+    __slots__ = ("id", "slug", "index", "ordinal", "title", "description", "completed", "module", "block", "data")
+
+    def __init__(self, module: Module, index: int, ordinal: int, slug: str, data: Dict[str, Any]):
+        self.id = str(data.get("id") or f"{module.id}.{index + 1}")
+        self.slug = slug
+        self.index = index
+        self.ordinal = ordinal
+        self.title = data.get("title", "Lekcja")
+        self.description = data.get("description", "")
+        # Completion flag stored in the course content itself (sample data)
+        self.completed = bool(data.get("completed", False))
+        self.module = module
+        self.block = module.block
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"Lesson({self.id!r}, {self.title!r})"
+
+
+class CourseModel:
+    """Course structure compiled into indexed blocks, modules and lessons."""
+
+    def __init__(self, structure: List[Dict[str, Any]]):
+        """
+        Args:
+            structure: Course structure as stored in course_structure.json
+
+        Raises:
+            ValueError: If two lessons have the same id, only some lessons
+                define an id, a prerequisite is unknown or the prerequisites
+                contain a cycle
+        """
+        blocks, modules, lessons = [], [], []
+        self.by_id: Dict[str, Lesson] = {}
+        self.by_slug: Dict[str, Lesson] = {}
+        self.by_title: Dict[str, Lesson] = {}
+        self.blocks_by_id: Dict[str, Block] = {}
+        self.modules_by_id: Dict[str, Module] = {}
+
+        for block_index, block_data in enumerate(structure):
+            block = Block(block_index, block_data)
+            block_modules = []
+            for module_index, module_data in enumerate(block_data.get("modules", [])):
+                module = Module(block, module_index, len(modules), module_data)
+                module_lessons = []
+                for lesson_index, lesson_data in enumerate(module_data.get("lessons", [])):
+                    # Lessons with the same title get numbered slugs
+                    slug = base = slugify(lesson_data.get("title", "")) or "lekcja"
+                    suffix = 2
+                    while slug in self.by_slug:
+                        slug, suffix = f"{base}-{suffix}", suffix + 1
+
+                    lesson = Lesson(module, lesson_index, len(lessons), slug, lesson_data)
+                    if lesson.id in self.by_id:
+                        raise ValueError(f"Duplicate lesson id: {lesson.id}")
+                    self.by_id[lesson.id] = lesson
+                    self.by_slug[slug] = lesson
+                    self.by_title.setdefault(lesson.title, lesson)
+                    module_lessons.append(lesson)
+                    lessons.append(lesson)
+                module.lessons = tuple(module_lessons)
+                self.modules_by_id[module.id] = module
+                block_modules.append(module)
+                modules.append(module)
+            block.modules = tuple(block_modules)
+            block.lesson_count = sum(len(module.lessons) for module in block_modules)
+            self.blocks_by_id[block.id] = block
+            blocks.append(block)
+
+        self.blocks: Tuple[Block, ...] = tuple(blocks)
+        self.modules: Tuple[Module, ...] = tuple(modules)
+        self.lessons: Tuple[Lesson, ...] = tuple(lessons)
+        explicit_ids = sum(1 for lesson in lessons if lesson.data.get("id"))
+        if 0 < explicit_ids < len(lessons):
+            missing = next(lesson for lesson in lessons if not lesson.data.get("id"))
+            raise ValueError(f"Lesson {missing.title!r} has no id; define ids for all lessons or for none")
+        self.prerequisites = PrerequisiteGraph(self.lessons, self.by_id)
+
+    def __len__(self) -> int:
+        return len(self.lessons)
+
+    def __contains__(self, lesson_id: str) -> bool:
+        return lesson_id in self.by_id
+
+    def get(self, lesson_id: Optional[str]) -> Optional[Lesson]:
+        """Returns the lesson with the given id or None."""
+        return self.by_id.get(lesson_id) if lesson_id is not None else None
+
+    def next_lesson(self, lesson: Lesson) -> Optional[Lesson]:
+        """Returns the lesson following the given one in course order."""
+        ordinal = lesson.ordinal + 1
+        return self.lessons[ordinal] if ordinal < len(self.lessons) else None
+
+    def previous_lesson(self, lesson: Lesson) -> Optional[Lesson]:
+        """Returns the lesson preceding the given one in course order."""
+        return self.lessons[lesson.ordinal - 1] if lesson.ordinal > 0 else None
+
+
+_model: Optional[Tuple[Any, CourseModel]] = None
+_model_lock = threading.Lock()
+
+
+def get_course_model() -> CourseModel:
+    """
+    Returns the compiled model of course_structure.json, shared by all
+    sessions. The model is rebuilt only when the content repository reloads
+    the file.
+    """
+    global _model
+    structure = get_course_structure()
+    cached = _model
+    if cached is not None and cached[0] is structure:
+        return cached[1]
+    with _model_lock:
+        if _model is None or _model[0] is not structure:
+            _model = (structure, CourseModel(structure))
+        return _model[1]
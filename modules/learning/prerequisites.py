@@ -0,0 +1,78 @@
+"""
+Lesson prerequisites for BrainVenture application.
+
+Lessons may list the ids of lessons that must be completed first in a
+"prerequisites" field of course_structure.json. The prerequisites are compiled
+into a graph over lesson ordinals when the course model is built: unknown ids
+and cycles are rejected at load time, and the prerequisites of every lesson
+are kept as a bitset (a Python int with bit N set for the lesson with
+ordinal N).
+
+Per-user sets of completed and unlocked lessons are bitsets too, so the status
+of every lesson is answered with bit operations and a completion only
+re-checks the lessons that depend on the completed one.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+
+class PrerequisiteGraph:
+    """Prerequisite bitsets and dependents of the lessons of a course."""
+
+    def __init__(self, lessons: Sequence, by_id: Dict[str, object]):
+        """
+        Args:
+            lessons: Lessons in course order (with id, ordinal and data attributes)
+            by_id: Lessons indexed by id
+
+        Raises:
+            ValueError: If a prerequisite is unknown or the prerequisites contain a cycle
+        """
+        self.requires: List[int] = [0] * len(lessons)
+        dependents: List[List[int]] = [[] for _ in lessons]
+        for lesson in lessons:
+            for prerequisite_id in lesson.data.get("prerequisites", []):
+                prerequisite = by_id.get(str(prerequisite_id))
+                if prerequisite is None:
+                    raise ValueError(f"Lesson {lesson.id} requires unknown lesson {prerequisite_id}")
+                if not self.requires[lesson.ordinal] >> prerequisite.ordinal & 1:
+                    self.requires[lesson.ordinal] |= 1 << prerequisite.ordinal
+                    dependents[prerequisite.ordinal].append(lesson.ordinal)
+        self.dependents: Tuple[Tuple[int, ...], ...] = tuple(tuple(d) for d in dependents)
+        self.order: Tuple[int, ...] = self._topological_order(lessons)
+        # Lessons without prerequisites are unlocked from the start
+        self.roots = sum(1 << i for i, mask in enumerate(self.requires) if not mask)
+
+    def _topological_order(self, lessons: Sequence) -> Tuple[int, ...]:
+        """Returns lesson ordinals with every lesson after its prerequisites (Kahn's algorithm)."""
+        remaining = [bin(mask).count("1") for mask in self.requires]
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        order = []
+        while ready:
+            ordinal = ready.pop()
+            order.append(ordinal)
+            for dependent in self.dependents[ordinal]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(remaining):
+            cycle = [lessons[i].id for i, count in enumerate(remaining) if count]
+            raise ValueError(f"Lesson prerequisites contain a cycle: {', '.join(cycle)}")
+        return tuple(order)
+
+    def unlocked(self, completed: int) -> int:
+        """Returns the bitset of lessons whose prerequisites are all in the completed bitset."""
+        unlocked = self.roots
+        for ordinal, mask in enumerate(self.requires):
+            if mask and mask & ~completed == 0:
+                unlocked |= 1 << ordinal
+        return unlocked
+
+    def unlocked_after(self, ordinal: int, completed: int, unlocked: int) -> int:
+        """
+        Updates the unlocked bitset after the lesson with the given ordinal was
+        added to the completed bitset; only its dependents are checked.
+        """
+        for dependent in self.dependents[ordinal]:
+            if self.requires[dependent] & ~completed == 0:
+                unlocked |= 1 << dependent
+        return unlocked
@@ -0,0 +1,192 @@
+"""
+Course progress of BrainVenture users.
+
+Completed lessons are counted per block and per module of the compiled course
+model. The counters of a user are built once per process from the user store
+and then updated incrementally when a lesson is completed through the
+aggregator, so pages read progress without scanning the completion list.
+
+Completed and unlocked lessons are also kept as bitsets over lesson ordinals
+(see modules.learning.prerequisites), which answer lesson statuses.
+"""
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from modules.learning.course_model import CourseModel, get_course_model
+
+# Lesson statuses
+COMPLETED = "completed"
+AVAILABLE = "available"
+LOCKED = "locked"
+
+
+class CourseProgress:
+    """Completion counters of one user."""
+
+    def __init__(self, model: CourseModel, completed_ids: Iterable[str] = ()):
+        """
+        Args:
+            model: Compiled course model the counters refer to
+            completed_ids: Ids of the lessons completed by the user (unknown ids are ignored)
+        """
+        self.model = model
+        self.completed = set()
+        self.by_block: Dict[str, int] = {block.id: 0 for block in model.blocks}
+        self.by_module: Dict[str, int] = {module.id: 0 for module in model.modules}
+        self.completed_mask = 0
+        # Lessons marked as completed in the course content count for every user
+        for lesson in model.lessons:
+            if lesson.completed:
+                self._count(lesson)
+        for lesson_id in completed_ids:
+            lesson = model.get(lesson_id)
+            if lesson is not None and lesson.id not in self.completed:
+                self._count(lesson)
+        self.unlocked_mask = model.prerequisites.unlocked(self.completed_mask)
+
+    def _count(self, lesson) -> None:
+        self.completed.add(lesson.id)
+        self.by_block[lesson.block.id] += 1
+        self.by_module[lesson.module.id] += 1
+        self.completed_mask |= 1 << lesson.ordinal
+
+    def add(self, lesson_id: str) -> bool:
+        """Counts a completed lesson. Returns False if it was already counted or is unknown."""
+        lesson = self.model.get(lesson_id)
+        if lesson is None or lesson.id in self.completed:
+            return False
+        self._count(lesson)
+        self.unlocked_mask = self.model.prerequisites.unlocked_after(
+            lesson.ordinal, self.completed_mask, self.unlocked_mask
+        )
+        return True
+
+    def is_completed(self, lesson_id: str) -> bool:
+        return lesson_id in self.completed
+
+    def status(self, lesson_id: str) -> str:
+        """Returns "completed", "available" (prerequisites completed) or "locked"."""
+        lesson = self.model.get(lesson_id)
+        if lesson is None:
+            return LOCKED
+        bit = 1 << lesson.ordinal
+        if self.completed_mask & bit:
+            return COMPLETED
+        return AVAILABLE if self.unlocked_mask & bit else LOCKED
+
+    @property
+    def available_mask(self) -> int:
+        """Bitset of the lessons that can be started but are not completed."""
+        return self.unlocked_mask & ~self.completed_mask
+
+    @property
+    def completed_count(self) -> int:
+        return len(self.completed)
+
+    @property
+    def total(self) -> int:
+        return len(self.model)
+
+    @property
+    def ratio(self) -> float:
+        """Completed part of the course (0.0-1.0)."""
+        return self.completed_count / self.total if self.total else 0.0
+
+    @property
+    def percentage(self) -> float:
+        return self.ratio * 100
+
+    def block_progress(self, block_id: str) -> Tuple[int, int]:
+        """Returns (completed, total) lessons of a block."""
+        block = self.model.blocks_by_id.get(block_id)
+        return self.by_block.get(block_id, 0), block.lesson_count if block else 0
+
+    def module_progress(self, module_id: str) -> Tuple[int, int]:
+        """Returns (completed, total) lessons of a module."""
+        module = self.model.modules_by_id.get(module_id)
+        return self.by_module.get(module_id, 0), len(module.lessons) if module else 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the progress statistics in the format of helpers.get_course_progress."""
+        return {
+            "total_lessons": self.total,
+            "completed_lessons": self.completed_count,
+            "progress_percentage": self.percentage,
+            "modules_completion": {module_id: count for module_id, count in self.by_module.items() if count},
+        }
+
+
+class ProgressAggregator:
+    """Per-user course progress counters shared by all sessions of the process."""
+
+    def __init__(self, user_store=None):
+        """
+        Args:
+            user_store: Store of completed lessons (default: the application user store)
+        """
+        self._user_store = user_store
+        self._progress: Dict[str, CourseProgress] = {}
+        self._lock = threading.Lock()
+        # Completions of one user are serialized without blocking other users
+        self._user_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def user_store(self):
+        if self._user_store is None:
+            from core.data.user_store import get_user_store
+            self._user_store = get_user_store()
+        return self._user_store
+
+    def get(self, user_id: str) -> CourseProgress:
+        """Returns the progress of a user, loading the completed lessons on first use."""
+        model = get_course_model()
+        progress = self._progress.get(user_id)
+        if progress is not None and progress.model is model:
+            return progress
+        with self._lock:
+            progress = self._progress.get(user_id)
+            if progress is None or progress.model is not model:
+                # Built again only after the course structure was reloaded
+                progress = CourseProgress(model, self.user_store.get_completed_lessons(user_id))
+                self._progress[user_id] = progress
+            return progress
+
+    def complete_lesson(self, user_id: str, lesson_id: str) -> bool:
+        """
+        Records a completed lesson in the user store and in the counters.
+        Returns False if the lesson was already completed.
+        """
+        progress = self.get(user_id)
+        with self._user_lock(user_id):
+            completed = self.user_store.mark_lesson_completed(user_id, lesson_id)
+            progress.add(lesson_id)
+        return completed
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            lock = self._user_locks.get(user_id)
+            if lock is None:
+                lock = self._user_locks[user_id] = threading.Lock()
+            return lock
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drops the counters of a user (or of all users) so that they are loaded again."""
+        with self._lock:
+            if user_id is None:
+                self._progress.clear()
+            else:
+                self._progress.pop(user_id, None)
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_progress_aggregator() -> ProgressAggregator:
+    """Returns the progress aggregator shared by all sessions of the process."""
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = ProgressAggregator()
+    return _aggregator
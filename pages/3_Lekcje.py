@@ -10,58 +10,72 @@ import sys
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.navigation import create_sidebar_navigation, hide_streamlit_navigation
-from components.theme_switcher import initialize_theme
-from utils.theme_provider import ThemeProvider
-from utils.ui import card, grid
+from core.analytics.profiling import timed_page, profiled
 
-# Hide default navigation
-hide_streamlit_navigation()
+with timed_page("Lekcje"):
+    from utils.navigation import create_sidebar_navigation, hide_streamlit_navigation
+    from components.theme_switcher import initialize_theme
+    from utils.theme_provider import ThemeProvider
+    from utils.ui import card, grid
+    from modules.learning.course_model import CourseModel, get_course_model
+    from modules.learning.progress import CourseProgress, get_progress_aggregator, LOCKED
+    from config.app_config import DEFAULT_USER_ID
+    from core.analytics.events import emit
 
-# Initialize themes
-initialize_theme()  # Kolory (jasny, ciemny, itp.)
-ThemeProvider.initialize()  # Layout (Material3, Fluent, itp.)
+    # Hide default navigation
+    hide_streamlit_navigation()
 
-# Apply combined theme
-ThemeProvider.apply_theme()
+    # Initialize themes
+    initialize_theme()  # Kolory (jasny, ciemny, itp.)
+    ThemeProvider.initialize()  # Layout (Material3, Fluent, itp.)
 
-# Navigation utilities are already imported above
+    # Apply combined theme
+    ThemeProvider.apply_theme()
 
-# Hide default navigation
-hide_streamlit_navigation()
+    # Navigation utilities are already imported above
 
-# Apply custom CSS
-css_path = os.path.join("static", "css", "style.css")
-if os.path.exists(css_path):
-    with open(css_path, "r", encoding='utf-8') as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    # Hide default navigation
+    hide_streamlit_navigation()
 
-# Import the horizontal submenu function
-from utils.navigation import create_horizontal_submenu
+    # Import the horizontal submenu function
+    from utils.navigation import create_horizontal_submenu
 
-# Add sidebar navigation
-create_sidebar_navigation("Lekcje")
+    # Add sidebar navigation
+    create_sidebar_navigation("Lekcje")
 
-# Create horizontal submenu for lessons categories
-lesson_categories = ["Neurobiologia", "Emocje", "Podejmowanie decyzji", "Praktyka"]
-lesson_icons = ["diagram-3", "emoji-smile", "lightning", "gear"]
-active_category = create_horizontal_submenu("", lesson_categories, lesson_icons)
+    # Create horizontal submenu for lessons categories
+    lesson_categories = ["Neurobiologia", "Emocje", "Podejmowanie decyzji", "Praktyka"]
+    lesson_icons = ["diagram-3", "emoji-smile", "lightning", "gear"]
+    active_category = create_horizontal_submenu("", lesson_categories, lesson_icons)
 
-# Page content
-st.title("📚 Lekcje")
-st.markdown("""
+    # Page content
+    st.title("📚 Lekcje")
+    st.markdown("""
 Poniżej znajdziesz dostępne lekcje kursu Neuroliderstwa. Wybierz interesującą Cię lekcję,
 aby rozpocząć naukę.
 """)
 
-# Initialize session state if needed
-if 'selected_lesson' not in st.session_state:
-    st.session_state.selected_lesson = None
+    # Initialize session state if needed
+    if 'selected_lesson' not in st.session_state:
+        st.session_state.selected_lesson = None
 
-# Definicja funkcji show_sample_lesson najpierw, zanim zostanie wywołana
-def show_sample_lesson():
-    """Show the sample lesson content."""
-    st.markdown("""
+    # Lesson with sample content
+    SAMPLE_LESSON_TITLE = "Co to jest neuroprzywództwo?"
+
+    progress_aggregator = get_progress_aggregator()
+
+    def is_lesson_completed(lesson, progress):
+        """Check whether a lesson is completed in the course data or by the user."""
+        return lesson.completed or progress.is_completed(lesson.id)
+
+    def is_lesson_locked(lesson, progress):
+        """Check whether the prerequisites of a lesson are not completed yet."""
+        return progress.status(lesson.id) == LOCKED
+
+    # Definicja funkcji show_sample_lesson najpierw, zanim zostanie wywołana
+    def show_sample_lesson(lesson):
+        """Show the sample lesson content."""
+        st.markdown("""
     ## Wprowadzenie do neuroprzywództwa
     
     Neuroprzywództwo to nowoczesne podejście do przywództwa, które łączy wiedzę z dziedziny neurobiologii
@@ -76,10 +90,10 @@ def show_sample_lesson():
     4. **Rozwijanie inteligencji emocjonalnej** - kluczowego aspektu w zarządzaniu relacjami
     """)
     
-    st.image("https://www.coachingcognition.com/wp-content/uploads/2016/08/NeuroLeadership_4pillars.png", 
-             caption="Cztery filary neuroprzywództwa")
+        st.image("https://www.coachingcognition.com/wp-content/uploads/2016/08/NeuroLeadership_4pillars.png", 
+                 caption="Cztery filary neuroprzywództwa")
     
-    st.markdown("""
+        st.markdown("""
     ## Dlaczego neuroprzywództwo jest ważne?
     
     Tradycyjne modele przywództwa często nie uwzględniają tego, jak mózg faktycznie działa. 
@@ -91,147 +105,182 @@ def show_sample_lesson():
     - Budować bardziej autentyczne i skuteczne relacje z zespołem
     """)
     
-    st.video("https://www.youtube.com/watch?v=tGdsOXZTyEA")
+        st.video("https://www.youtube.com/watch?v=tGdsOXZTyEA")
     
-    st.markdown("""
+        st.markdown("""
     ## Quiz sprawdzający wiedzę
     """)
     
-    with st.form("lesson_quiz"):
-        st.markdown("**Pytanie 1: Co jest głównym celem neuroprzywództwa?**")
-        q1 = st.radio(
-            "Wybierz odpowiedź:",
-            [
-                "Zwiększanie zysków firmy",
-                "Kontrolowanie zachowań pracowników",
-                "Łączenie wiedzy neurobiologicznej z praktyką przywództwa",
-                "Wprowadzanie sztucznej inteligencji do zarządzania"
-            ],
-            index=None
-        )
+        lesson_quiz(lesson)
+
+    def show_lesson_passed():
+        """Congratulate the user on passing the lesson quiz."""
+        st.balloons()
+        st.success("Gratulacje! Ukończyłeś lekcję pomyślnie!")
+
+    # Checking the answers reruns only the quiz, not the lesson content above it
+    @st.fragment
+    def lesson_quiz(lesson):
+        """Show the quiz of the sample lesson and record its completion."""
+        if st.session_state.pop("lesson_passed", None) == lesson.id:
+            # Shown after the page was rerun to unlock the next lesson
+            show_lesson_passed()
+
+        with st.form("lesson_quiz"):
+            st.markdown("**Pytanie 1: Co jest głównym celem neuroprzywództwa?**")
+            q1 = st.radio(
+                "Wybierz odpowiedź:",
+                [
+                    "Zwiększanie zysków firmy",
+                    "Kontrolowanie zachowań pracowników",
+                    "Łączenie wiedzy neurobiologicznej z praktyką przywództwa",
+                    "Wprowadzanie sztucznej inteligencji do zarządzania"
+                ],
+                index=None
+            )
         
-        st.markdown("**Pytanie 2: Który obszar NIE należy do kluczowych aspektów neuroprzywództwa?**")
-        q2 = st.radio(
-            "Wybierz odpowiedź:",
-            [
-                "Zrozumienie procesów mózgowych",
-                "Mikromanagement pracowników",
-                "Świadomość wpływu emocji",
-                "Rozwijanie inteligencji emocjonalnej"
-            ],
-            index=None
-        )
+            st.markdown("**Pytanie 2: Który obszar NIE należy do kluczowych aspektów neuroprzywództwa?**")
+            q2 = st.radio(
+                "Wybierz odpowiedź:",
+                [
+                    "Zrozumienie procesów mózgowych",
+                    "Mikromanagement pracowników",
+                    "Świadomość wpływu emocji",
+                    "Rozwijanie inteligencji emocjonalnej"
+                ],
+                index=None
+            )
         
-        submitted = st.form_submit_button("Sprawdź odpowiedzi")
+            submitted = st.form_submit_button("Sprawdź odpowiedzi")
         
-        if submitted:
-            score = 0
+            if submitted:
+                score = 0
             
-            if q1 == "Łączenie wiedzy neurobiologicznej z praktyką przywództwa":
-                st.success("✓ Pytanie 1: Poprawna odpowiedź!")
-                score += 1
-            else:
-                st.error("✗ Pytanie 1: Niepoprawna odpowiedź. Neuroprzywództwo łączy wiedzę neurobiologiczną z praktyką przywództwa.")
+                if q1 == "Łączenie wiedzy neurobiologicznej z praktyką przywództwa":
+                    st.success("✓ Pytanie 1: Poprawna odpowiedź!")
+                    score += 1
+                else:
+                    st.error("✗ Pytanie 1: Niepoprawna odpowiedź. Neuroprzywództwo łączy wiedzę neurobiologiczną z praktyką przywództwa.")
             
-            if q2 == "Mikromanagement pracowników":
-                st.success("✓ Pytanie 2: Poprawna odpowiedź!")
-                score += 1
-            else:
-                st.error("✗ Pytanie 2: Niepoprawna odpowiedź. Mikromanagement nie jest elementem neuroprzywództwa.")
+                if q2 == "Mikromanagement pracowników":
+                    st.success("✓ Pytanie 2: Poprawna odpowiedź!")
+                    score += 1
+                else:
+                    st.error("✗ Pytanie 2: Niepoprawna odpowiedź. Mikromanagement nie jest elementem neuroprzywództwa.")
             
-            st.markdown(f"**Twój wynik: {score}/2 punktów**")
+                st.markdown(f"**Twój wynik: {score}/2 punktów**")
+                emit("quiz_submitted", DEFAULT_USER_ID, lesson_id=lesson.id, score=score, max_score=2)
             
-            if score == 2:
-                st.balloons()
-                st.success("Gratulacje! Ukończyłeś lekcję pomyślnie!")
-                
-                # Mark the lesson as completed
-                for block in course_structure:
-                    for module in block['modules']:
-                        for lesson in module['lessons']:
-                            if lesson['title'] == "Co to jest neuroprzywództwo?":
-                                lesson['completed'] = True
-
-# Load course structure
-def load_course_structure():
-    """Load the course structure from a JSON file or return default structure."""
+                if score == 2:
+                    next_lesson = course.next_lesson(lesson)
+                    next_locked = next_lesson is not None and is_lesson_locked(next_lesson, user_progress)
+
+                    # Mark the lesson as completed in the user's profile
+                    if progress_aggregator.complete_lesson(DEFAULT_USER_ID, lesson.id):
+                        emit("lesson_completed", DEFAULT_USER_ID, lesson_id=lesson.id)
+                        if next_locked and not is_lesson_locked(next_lesson, user_progress):
+                            # The next lesson button outside the quiz needs the whole page
+                            st.session_state.lesson_passed = lesson.id
+                            st.rerun(scope="app")
+                    show_lesson_passed()
+
+    # Load course structure
+    @profiled()
+    def load_course_model():
+        """Load the compiled course structure or return the default structure."""
+        try:
+            return get_course_model()
+        except ValueError as e:
+            # Invalid course content (e.g. unknown or cyclic prerequisites)
+            st.error(f"Nie udało się wczytać struktury kursu: {e}")
+            return None
+        except FileNotFoundError:
+            # Return default structure (first block only for MVP)
+            return CourseModel([
+                {
+                    "emoji": "🔥",
+                    "title": "Neurobiologia przywództwa",
+                    "modules": [
+                        {
+                            "title": "Wprowadzenie do neuroprzywództwa",
+                            "lessons": [
+                                {"title": "Co to jest neuroprzywództwo?", "completed": True},
+                                {"title": "Mózg lidera – struktura i funkcje"}
+                            ]
+                        }
+                    ]
+                }
+            ])
+
+    course = load_course_model()
+    if course is None:
+        st.stop()
+
+    # Progress of the user, read once per render (completing a lesson updates it in place)
     try:
-        with open(os.path.join("data", "content", "course_structure.json"), "r", encoding="utf-8") as f:
-            return json.load(f)
+        user_progress = progress_aggregator.get(DEFAULT_USER_ID)
     except FileNotFoundError:
-        # Return default structure (first block only for MVP)
-        return [
-            {
-                "emoji": "🔥",
-                "title": "Neurobiologia przywództwa",
-                "modules": [
-                    {
-                        "title": "Wprowadzenie do neuroprzywództwa",
-                        "lessons": [
-                            {"title": "Co to jest neuroprzywództwo?", "completed": True},
-                            {"title": "Mózg lidera – struktura i funkcje"}
-                        ]
-                    }
-                ]
-            }
-        ]
+        user_progress = CourseProgress(course)
 
-course_structure = load_course_structure()
+    # Lessons are selected by their course id
+    selected_lesson = course.get(st.session_state.selected_lesson)
 
-# If no lesson is selected, show the course structure
-if st.session_state.selected_lesson is None:
-    for block in course_structure:
-        st.markdown(f"## {block['emoji']} {block['title']}")
+    # If no lesson is selected, show the course structure
+    if selected_lesson is None:
+        for block in course.blocks:
+            st.markdown(f"## {block.emoji} {block.title}")
         
-        for module in block['modules']:
-            st.markdown(f"### {module['title']}")
+            for module in block.modules:
+                st.markdown(f"### {module.title}")
             
-            # Create lesson cards
-            lesson_cards = []
-            for i, lesson in enumerate(module['lessons']):
-                lesson_status = "✅" if lesson.get("completed", False) else "📝"
-                card_content = {
-                    "title": f"{lesson_status} {lesson['title']}",
-                    "content": "Kliknij, aby rozpocząć lekcję",
-                    "button_text": "Rozpocznij lekcję",
-                    "button_url": f"#{i}",
-                    "progress": 1.0 if lesson.get("completed", False) else 0.0
-                }
-                lesson_cards.append(card_content)
+                # Create lesson cards
+                lesson_cards = []
+                for lesson in module.lessons:
+                    lesson_completed = is_lesson_completed(lesson, user_progress)
+                    lesson_status = "✅" if lesson_completed else ("🔒" if is_lesson_locked(lesson, user_progress) else "📝")
+                    card_content = {
+                        "title": f"{lesson_status} {lesson.title}",
+                        "content": "Kliknij, aby rozpocząć lekcję",
+                        "button_text": "Rozpocznij lekcję",
+                        "button_url": f"#{lesson.slug}",
+                        "progress": 1.0 if lesson_completed else 0.0
+                    }
+                    lesson_cards.append(card_content)
             
-            # Display the lessons in a grid layout
-            grid(lesson_cards, 3)
+                # Display the lessons in a grid layout
+                grid(lesson_cards, 3)
             
-            # Add buttons for each lesson
-            cols = st.columns(3)
-            for i, lesson in enumerate(module['lessons']):
-                col_idx = i % 3
-                with cols[col_idx]:
-                    if st.button(f"Otwórz: {lesson['title']}", key=f"lesson_{block['title']}_{module['title']}_{i}"):
-                        st.session_state.selected_lesson = {
-                            "block": block['title'],
-                            "module": module['title'],
-                            "lesson": lesson['title'],
-                            "index": i
-                        }
-                        st.rerun()
-else:
-    # Display the selected lesson
-    lesson_data = st.session_state.selected_lesson
-    st.markdown(f"#### {lesson_data['block']} > {lesson_data['module']}")
-    st.markdown(f"# {lesson_data['lesson']}")
-    
-    # Display lesson content
-    if lesson_data['lesson'] == "Co to jest neuroprzywództwo?":
-        show_sample_lesson()
+                # Add buttons for each lesson
+                cols = st.columns(3)
+                for lesson in module.lessons:
+                    col_idx = lesson.index % 3
+                    with cols[col_idx]:
+                        if st.button(f"Otwórz: {lesson.title}", key=f"lesson_{lesson.id}",
+                                     disabled=is_lesson_locked(lesson, user_progress)):
+                            st.session_state.selected_lesson = lesson.id
+                            st.rerun()
     else:
-        st.info("Ta lekcja jest jeszcze w przygotowaniu.")
+        # Display the selected lesson
+        st.markdown(f"#### {selected_lesson.block.title} > {selected_lesson.module.title}")
+        st.markdown(f"# {selected_lesson.title}")
+    
+        # Display lesson content
+        if selected_lesson.title == SAMPLE_LESSON_TITLE:
+            show_sample_lesson(selected_lesson)
+        else:
+            st.info("Ta lekcja jest jeszcze w przygotowaniu.")
         
-    # Navigation buttons
-    st.markdown("---")
-    col1, col2 = st.columns([1, 1])
+        # Navigation buttons
+        st.markdown("---")
+        col1, col2 = st.columns([1, 1])
+    
+        with col1:
+            if st.button("⬅️ Wróć do listy lekcji"):
+                st.session_state.selected_lesson = None
+                st.rerun()
     
-    with col1:
-        if st.button("⬅️ Wróć do listy lekcji"):
-            st.session_state.selected_lesson = None
-            st.rerun()
+        with col2:
+            next_lesson = course.next_lesson(selected_lesson)
+            if next_lesson is not None and st.button("Następna lekcja ➡️", disabled=is_lesson_locked(next_lesson, user_progress)):
+                st.session_state.selected_lesson = next_lesson.id
+                st.rerun()
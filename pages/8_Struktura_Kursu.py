@@ -1,5 +1,6 @@
 import streamlit as st
 import json
+import math
 import os
 import sys
 
@@ -13,105 +14,133 @@ st.set_page_config(
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.navigation import hide_streamlit_navigation, create_sidebar_navigation
-from utils.theme_provider import ThemeProvider
-from components.theme_switcher import initialize_theme, create_theme_switcher, get_current_theme, get_current_layout
-
-# Hide default Streamlit navigation
-hide_streamlit_navigation()
-
-# Initialize and apply themes
-initialize_theme()
-ThemeProvider.initialize()
-ThemeProvider.apply_theme()
-
-# Add sidebar navigation
-create_sidebar_navigation("Struktura Kursu")
-
-# Add theme switcher to sidebar
-st.sidebar.markdown("### Zmień styl interfejsu")
-theme_changed = create_theme_switcher(st.sidebar)
-if theme_changed:
-    st.rerun()
-
-# Function to load course structure
-def load_course_structure():
-    """Load the course structure from the JSON file."""
-    try:
-        file_path = os.path.join("data", "content", "course_structure.json")
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        st.error(f"Nie udało się wczytać struktury kursu: {e}")
-        return []
-
-# Page title
-st.title("📚 Struktura Kursu")
-st.markdown("""
+from core.analytics.profiling import timed_page, profiled
+
+with timed_page("Struktura Kursu"):
+    from utils.navigation import hide_streamlit_navigation, create_sidebar_navigation
+    from utils.theme_provider import ThemeProvider
+    from components.theme_switcher import initialize_theme, create_theme_switcher, get_current_theme, get_current_layout
+    from modules.learning.course_model import get_course_model
+    from modules.learning.progress import get_progress_aggregator, COMPLETED, AVAILABLE, LOCKED
+    from config.app_config import DEFAULT_USER_ID, MAX_LESSONS_PER_PAGE
+
+    # Hide default Streamlit navigation
+    hide_streamlit_navigation()
+
+    # Initialize and apply themes
+    initialize_theme()
+    ThemeProvider.initialize()
+    ThemeProvider.apply_theme()
+
+    # Add sidebar navigation
+    create_sidebar_navigation("Struktura Kursu")
+
+    # Add theme switcher to sidebar
+    st.sidebar.markdown("### Zmień styl interfejsu")
+    theme_changed = create_theme_switcher(st.sidebar)
+    if theme_changed:
+        st.rerun()
+
+    # Function to load course structure
+    @profiled()
+    def load_course_model():
+        """Load the compiled course structure from the JSON file."""
+        try:
+            return get_course_model()
+        except Exception as e:
+            st.error(f"Nie udało się wczytać struktury kursu: {e}")
+            return None
+
+    # Page title
+    st.title("📚 Struktura Kursu")
+    st.markdown("""
 Poniżej znajdziesz pełną strukturę kursu BrainVenture. Kliknij na nazwę modułu, 
 aby zobaczyć dostępne lekcje. Możesz bezpośrednio przejść do wybranej lekcji klikając na jej tytuł.
 """)
 
-# Load course structure
-course_structure = load_course_structure()
-
-# Function to generate a unique key for each item
-def get_unique_key(block_idx, module_idx=None, lesson_idx=None):
-    if lesson_idx is not None:
-        return f"lesson_{block_idx}_{module_idx}_{lesson_idx}"
-    elif module_idx is not None:
-        return f"module_{block_idx}_{module_idx}"
-    else:
-        return f"block_{block_idx}"
-
-# Display course blocks with expandable modules
-for block_idx, block in enumerate(course_structure):
-    with st.container():
-        st.markdown(f"## {block.get('emoji', '📒')} {block.get('title', 'Blok')}")
-        st.markdown(block.get('description', ''))
-        
-        # Display modules as expandable sections
-        for module_idx, module in enumerate(block.get('modules', [])):
-            module_key = get_unique_key(block_idx, module_idx)
-            with st.expander(f"**{module.get('title', 'Moduł')}**"):
-                # Module description if available
-                if 'description' in module:
-                    st.markdown(module.get('description', ''))
-                
-                # Display lessons as cards
-                for lesson_idx, lesson in enumerate(module.get('lessons', [])):
-                    lesson_key = get_unique_key(block_idx, module_idx, lesson_idx)
-                    
-                    # Create a card-like container for each lesson
-                    with st.container():
-                        col1, col2 = st.columns([4, 1])
-                        
-                        with col1:
-                            title = lesson.get('title', 'Lekcja')
-                            # Add completed indicator if lesson is completed
-                            if lesson.get('completed', False):
-                                st.markdown(f"✅ **{title}**")
-                            else:
-                                st.markdown(f"◻️ **{title}**")
-                                
-                            # Add description if available
-                            if 'description' in lesson:
-                                st.markdown(f"<small>{lesson['description']}</small>", unsafe_allow_html=True)
-                        
-                        with col2:
-                            if st.button("Rozpocznij", key=lesson_key):
-                                # Store lesson info in session state
-                                st.session_state['selected_lesson'] = {
-                                    'block': block_idx,
-                                    'module': module_idx,
-                                    'lesson': lesson_idx,
-                                    'title': title
-                                }
-                                # Navigate to lesson page
-                                st.switch_page("pages/3_Lekcja.py")
+    # Icons of lesson statuses
+    LESSON_STATUS_ICONS = {COMPLETED: "✅", AVAILABLE: "◻️", LOCKED: "🔒"}
+
+    # Load course structure
+    course = load_course_model()
+    progress = get_progress_aggregator().get(DEFAULT_USER_ID) if course else None
+
+    # Only the lessons of the expanded module are rendered, one page at a time
+    if "structure_module" not in st.session_state:
+        st.session_state.structure_module = None
+        st.session_state.structure_page = 0
+
+    def toggle_module(module_id):
+        """Expand a module (collapsing the previous one) or collapse it if it is open."""
+        expanded = st.session_state.structure_module != module_id
+        st.session_state.structure_module = module_id if expanded else None
+        st.session_state.structure_page = 0
+
+    def change_page(step):
+        st.session_state.structure_page += step
+
+    def render_lessons(module):
+        """Render one page of the lessons of a module with pagination controls."""
+        page_count = max(math.ceil(len(module.lessons) / MAX_LESSONS_PER_PAGE), 1)
+        page = min(st.session_state.structure_page, page_count - 1)
+        start = page * MAX_LESSONS_PER_PAGE
+    
+        # Module description if available
+        if module.description:
+            st.markdown(module.description)
+    
+        # Display lessons as cards
+        for lesson in module.lessons[start:start + MAX_LESSONS_PER_PAGE]:
+            # Create a card-like container for each lesson
+            with st.container():
+                col1, col2 = st.columns([4, 1])
+            
+                with col1:
+                    # Add status indicator (completed, available or locked by prerequisites)
+                    status = progress.status(lesson.id)
+                    st.markdown(f"{LESSON_STATUS_ICONS[status]} **{lesson.title}**")
                     
-                    # Add small divider between lessons
-                    st.markdown("<hr style='margin: 8px 0; opacity: 0.3'>", unsafe_allow_html=True)
+                    # Add description if available
+                    if lesson.description:
+                        st.markdown(f"<small>{lesson.description}</small>", unsafe_allow_html=True)
+            
+                with col2:
+                    if st.button("Rozpocznij", key=f"lesson_{lesson.id}", disabled=status == LOCKED):
+                        # Store the lesson id in session state
+                        st.session_state['selected_lesson'] = lesson.id
+                        # Navigate to lesson page
+                        st.switch_page("pages/3_Lekcje.py")
+    
+        # Pagination of long modules
+        if page_count > 1:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                st.button("⬅️ Poprzednie", key=f"prev_{module.id}", disabled=page == 0,
+                          on_click=change_page, args=(-1,))
+            with col2:
+                st.markdown(f"<div style='text-align: center'>Strona {page + 1}/{page_count}</div>",
+                            unsafe_allow_html=True)
+            with col3:
+                st.button("Następne ➡️", key=f"next_{module.id}", disabled=page == page_count - 1,
+                          on_click=change_page, args=(1,))
+
+    # Display course blocks with expandable modules
+    for block in (course.blocks if course else ()):
+        with st.container():
+            st.markdown(f"## {block.emoji} {block.title}")
+            completed, total = progress.block_progress(block.id)
+            st.caption(f"Ukończone lekcje: {completed}/{total}")
+            st.markdown(block.description)
+        
+            # Display modules as expandable sections
+            for module in block.modules:
+                completed, total = progress.module_progress(module.id)
+                expanded = st.session_state.structure_module == module.id
+                st.button(f"{'▼' if expanded else '▶'} {module.title} ({completed}/{total})", key=f"module_{module.id}",
+                          on_click=toggle_module, args=(module.id,))
+                if expanded:
+                    with st.container(border=True):
+                        render_lessons(module)
         
-        # Add divider between blocks
-        st.markdown("---")
\ No newline at end of file
+            # Add divider between blocks
+            st.markdown("---")
@@ -0,0 +1,69 @@
+import streamlit as st
+import os
+import sys
+
+# Page config must be the first Streamlit command
+st.set_page_config(
+    page_title="Admin",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.navigation import hide_streamlit_navigation
+from components.theme_switcher import initialize_theme
+from utils.theme_provider import ThemeProvider
+from core.analytics.profiling import get_profiler, is_enabled, timed_page, PAGE_SPAN, PERCENTILES
+from config.app_config import DEBUG
+
+with timed_page("Admin"):
+    # Admin page: not listed in the sidebar menu, opened directly with /Admin
+
+    # Hide default Streamlit navigation
+    hide_streamlit_navigation()
+
+    # Initialize and apply themes
+    initialize_theme()
+    ThemeProvider.initialize()
+    ThemeProvider.apply_theme()
+
+    st.title("⏱️ Czasy renderowania")
+
+    if not is_enabled():
+        st.info("Profilowanie jest wyłączone. Włącz PROFILING_ENABLED w config/app_config.py "
+                "lub ustaw zmienną środowiskową BRAINVENTURE_PROFILING=1.")
+
+    try:
+        metrics = get_profiler().load()
+    except Exception as e:
+        st.error(f"Nie udało się wczytać metryk: {e}")
+        metrics = {}
+
+    if not metrics:
+        st.info("Brak zapisanych pomiarów.")
+
+    for page in sorted(metrics):
+        spans = metrics[page]
+        st.markdown(f"### {page}")
+        # The whole page first, then the slowest spans
+        names = sorted(spans, key=lambda name: (name != PAGE_SPAN, -spans[name]["p95_ms"]))
+        st.dataframe(
+            [
+                {
+                    "Span": name,
+                    "Liczba": spans[name]["count"],
+                    "Średnia [ms]": round(spans[name]["mean_ms"], 2),
+                    **{f"p{p} [ms]": round(spans[name][f"p{p}_ms"], 2) for p in PERCENTILES},
+                    "Max [ms]": round(spans[name]["max_ms"], 2),
+                }
+                for name in names
+            ],
+            hide_index=True,
+        )
+
+    # The page has no login, so resetting metrics is only offered in debug mode
+    if DEBUG and metrics and st.button("Wyczyść metryki"):
+        get_profiler().reset()
+        st.rerun()
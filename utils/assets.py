@@ -0,0 +1,148 @@
+"""
+Static image assets for BrainVenture application.
+
+The images directory is scanned once per process. Every image is read into an
+immutable manifest (bytes, dimensions and content hash) together with resized
+variants for the widths at which the pages show images, so reruns serve images
+from memory without checking the filesystem or sending full-size files.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple, Optional, Tuple
+
+import streamlit as st
+
+from config.app_config import IMAGE_DISPLAY_WIDTHS, IMAGE_PIXEL_DENSITY, IMAGES_DIR
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+logger = logging.getLogger("brainventure")
+
+
+class Asset(NamedTuple):
+    """An image from the images directory with its resized variants."""
+    name: str
+    data: bytes
+    width: int
+    height: int
+    digest: str
+    # Pixel width -> image bytes, smallest first
+    variants: Tuple[Tuple[int, bytes], ...]
+
+    def for_width(self, width: Optional[int]) -> bytes:
+        """Returns the smallest variant that is sharp when shown at the given width."""
+        if width is None:
+            return self.data
+        needed = width * IMAGE_PIXEL_DENSITY
+        for variant_width, data in self.variants:
+            if variant_width >= needed:
+                return data
+        return self.data
+
+
+def _resize(image, width: int) -> bytes:
+    from PIL import Image
+
+    height = max(round(image.height * width / image.width), 1)
+    buffer = io.BytesIO()
+    image.resize((width, height), Image.LANCZOS).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _load_asset(name: str, path: str, widths: Iterable[int]) -> Asset:
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        variants = []
+        for width in sorted({w * IMAGE_PIXEL_DENSITY for w in widths}):
+            if width >= image.width:
+                break
+            resized = _resize(image, width)
+            # Flat images can compress worse after resampling; the original is served then
+            if len(resized) < len(data):
+                variants.append((width, resized))
+        return Asset(name, data, image.width, image.height, hashlib.sha256(data).hexdigest(), tuple(variants))
+
+
+class AssetRegistry:
+    """Manifest of the images in a directory, built once when the registry is created."""
+
+    def __init__(self, images_dir: str = IMAGES_DIR, widths: Iterable[int] = IMAGE_DISPLAY_WIDTHS):
+        """
+        Args:
+            images_dir: Directory scanned (recursively) for images
+            widths: Display widths for which resized variants are generated
+        """
+        self.images_dir = images_dir
+        assets = {}
+        for root, _, files in os.walk(images_dir):
+            for filename in sorted(files):
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, images_dir).replace(os.sep, "/")
+                try:
+                    assets[name] = _load_asset(name, path, widths)
+                except Exception as e:
+                    logger.warning("Skipping image %s: %s", path, e)
+        self.manifest: Mapping[str, Asset] = MappingProxyType(assets)
+
+    def _name(self, name: str) -> str:
+        """Accepts names relative to the images directory or paths inside it."""
+        name = name.replace(os.sep, "/")
+        prefix = self.images_dir.replace(os.sep, "/").rstrip("/") + "/"
+        return name[len(prefix):] if name.startswith(prefix) else name
+
+    def get(self, name: str) -> Optional[Asset]:
+        """Returns the asset of an image (e.g. "neuroleader_types/neuroempata.png") or None."""
+        return self.manifest.get(self._name(name))
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def image_bytes(self, name: str, width: Optional[int] = None) -> Optional[bytes]:
+        """Returns the image bytes best suited for the display width, or None if there is no such image."""
+        asset = self.get(name)
+        return asset.for_width(width) if asset else None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_assets() -> AssetRegistry:
+    """Returns the asset registry shared by all sessions of the process."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AssetRegistry()
+    return _registry
+
+
+def show_image(name: str, width: Optional[int] = None, **kwargs) -> bool:
+    """
+    Shows an image from the registry with st.image.
+
+    Args:
+        name: Image name relative to the images directory (or a path inside it)
+        width: Display width in pixels (None for the column width)
+        **kwargs: Other arguments of st.image
+
+    Returns:
+        bool: False if there is no such image
+    """
+    data = get_assets().image_bytes(name, width)
+    if data is None:
+        return False
+    if width is not None:
+        kwargs["width"] = width
+    st.image(data, **kwargs)
+    return True
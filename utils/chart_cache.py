@@ -0,0 +1,92 @@
+"""
+Cache of rendered charts for BrainVenture application.
+
+Charts are rendered once (as image bytes or SVG markup) and reused on later
+reruns and by other sessions showing the same data. Entries are evicted in
+least recently used order when the total size exceeds the memory limit.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Union
+
+from config.app_config import CHART_CACHE_MAX_BYTES
+
+# Rendered chart: image bytes or SVG markup
+ChartData = Union[bytes, str]
+
+
+def chart_key(*parts: Any) -> str:
+    """Returns a cache key for the given chart inputs (scores, labels, theme, size...)."""
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """Thread-safe LRU cache of rendered charts with a limit on their total size."""
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Maximum total size of the cached charts
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ChartData]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached charts (bytes or characters)."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        """Returns the cached chart or None."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: ChartData) -> None:
+        """Stores a chart, evicting the least recently used charts if needed."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, key: str, render: Callable[[], ChartData]) -> ChartData:
+        """Returns the cached chart or renders, stores and returns it."""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        """Removes all cached charts."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Cache shared by all sessions of the process (BRAINVENTURE_CHART_CACHE_MAX_BYTES
+# overrides the limit; 0 disables caching)
+chart_cache = ChartCache(int(os.environ.get("BRAINVENTURE_CHART_CACHE_MAX_BYTES", CHART_CACHE_MAX_BYTES)))
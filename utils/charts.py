@@ -0,0 +1,170 @@
+"""
+Chart rendering for BrainVenture application.
+
+Radar charts are generated as SVG markup in pure Python, without importing
+matplotlib. The output depends only on the input (numbers are written with
+fixed precision), so identical charts produce identical markup and are kept
+in the shared chart cache.
+
+Charts that still need matplotlib should use managed_figure(): figures are
+created with the object-oriented API instead of pyplot, so no global figure
+manager keeps them alive after rendering.
+"""
+import io
+import math
+import threading
+from contextlib import contextmanager
+from html import escape
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from config.app_config import PRIMARY_COLOR, UI_FONT
+from utils.chart_cache import chart_cache, chart_key
+
+# Chart colors matching the light and dark color themes
+CHART_THEMES: Dict[str, Dict[str, str]] = {
+    "light": {"line": PRIMARY_COLOR, "text": "#333333", "grid": "#e0e0e0", "background": "#ffffff"},
+    "dark": {"line": PRIMARY_COLOR, "text": "#e0e0e0", "grid": "#444444", "background": "#1e1e1e"},
+}
+
+# SVG pixels per inch of the chart size
+PIXELS_PER_INCH = 72
+# Space for the title above the chart and for the axis labels around it
+TITLE_HEIGHT = 40
+LABEL_MARGIN = 110
+
+
+_live_figures = 0
+_live_figures_lock = threading.Lock()
+
+
+def live_figure_count() -> int:
+    """Returns the number of matplotlib figures currently being rendered."""
+    return _live_figures
+
+
+@contextmanager
+def managed_figure(size: Tuple[float, float], **subplot_kw) -> Iterator[tuple]:
+    """
+    Creates a matplotlib figure with a single axes and releases it when the block ends.
+
+    Args:
+        size: Figure size in inches
+        **subplot_kw: Arguments passed to add_subplot (e.g. polar=True)
+
+    Yields:
+        tuple: (figure, axes)
+    """
+    global _live_figures
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=size)
+    with _live_figures_lock:
+        _live_figures += 1
+    try:
+        yield fig, fig.add_subplot(**subplot_kw)
+    finally:
+        # Break the references between the figure, its axes and artists
+        fig.clear()
+        with _live_figures_lock:
+            _live_figures -= 1
+
+
+def figure_to_png(fig) -> bytes:
+    """Renders a matplotlib figure to PNG bytes."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", facecolor=fig.get_facecolor(), bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _fmt(number: float) -> str:
+    """Formats a number with fixed precision (never "-0.00")."""
+    text = f"{number:.2f}"
+    return "0.00" if text == "-0.00" else text
+
+
+def _points(points: List[Tuple[float, float]]) -> str:
+    return " ".join(f"{_fmt(x)},{_fmt(y)}" for x, y in points)
+
+
+def _render_radar_svg(labels: Sequence[str], values: Sequence[float], title: str, theme: str,
+                      size: Tuple[float, float], max_value: int, fill_alpha: float) -> str:
+    colors = CHART_THEMES.get(theme, CHART_THEMES["light"])
+    width, height = size[0] * PIXELS_PER_INCH, size[1] * PIXELS_PER_INCH
+    cx, cy = width / 2, TITLE_HEIGHT + (height - TITLE_HEIGHT) / 2
+    radius = max(min(width, height - TITLE_HEIGHT) / 2 - LABEL_MARGIN / 2, 10)
+
+    # Axes start at the top and go clockwise
+    count = len(labels)
+    angles = [-math.pi / 2 + 2 * math.pi * i / count for i in range(count)]
+
+    def point(angle: float, value: float) -> Tuple[float, float]:
+        distance = radius * min(max(value, 0), max_value) / max_value
+        return cx + distance * math.cos(angle), cy + distance * math.sin(angle)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_fmt(width)} {_fmt(height)}" '
+        f'width="{_fmt(width)}" height="{_fmt(height)}" font-family="{escape(UI_FONT)}">',
+        f'<rect width="100%" height="100%" fill="{colors["background"]}"/>',
+        f'<text x="{_fmt(cx)}" y="{_fmt(TITLE_HEIGHT * 0.7)}" text-anchor="middle" font-size="18" '
+        f'fill="{colors["text"]}">{escape(title)}</text>',
+    ]
+
+    # Grid rings with their values, then the spokes
+    for level in range(1, max_value + 1):
+        parts.append(
+            f'<circle cx="{_fmt(cx)}" cy="{_fmt(cy)}" r="{_fmt(radius * level / max_value)}" '
+            f'fill="none" stroke="{colors["grid"]}" stroke-width="1"/>'
+        )
+        x, y = point(-math.pi / 2, level)
+        parts.append(
+            f'<text x="{_fmt(x + 4)}" y="{_fmt(y - 3)}" font-size="11" fill="{colors["text"]}">{level}</text>'
+        )
+    for angle in angles:
+        x, y = point(angle, max_value)
+        parts.append(
+            f'<line x1="{_fmt(cx)}" y1="{_fmt(cy)}" x2="{_fmt(x)}" y2="{_fmt(y)}" '
+            f'stroke="{colors["grid"]}" stroke-width="1"/>'
+        )
+
+    # Polygon of the values
+    if count:
+        polygon = _points([point(angle, value) for angle, value in zip(angles, values)])
+        parts.append(
+            f'<polygon points="{polygon}" fill="{colors["line"]}" fill-opacity="{_fmt(fill_alpha)}" '
+            f'stroke="{colors["line"]}" stroke-width="2" stroke-linejoin="round"/>'
+        )
+
+    # Axis labels outside the outer ring
+    for angle, label in zip(angles, labels):
+        x, y = point(angle, max_value)
+        horizontal = math.cos(angle)
+        anchor = "middle" if abs(horizontal) < 0.1 else ("start" if horizontal > 0 else "end")
+        parts.append(
+            f'<text x="{_fmt(x + 12 * horizontal)}" y="{_fmt(y + 18 * math.sin(angle) + 4)}" '
+            f'text-anchor="{anchor}" font-size="13" fill="{colors["text"]}">{escape(label)}</text>'
+        )
+
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def radar_chart_svg(labels: Sequence[str], values: Sequence[float], title: str, theme: str = "light",
+                    size: Tuple[float, float] = (10, 8), max_value: int = 5, fill_alpha: float = 0.4) -> str:
+    """
+    Returns a radar chart as SVG markup, rendering it only if it is not cached.
+
+    Args:
+        labels: Axis labels
+        values: Value for each axis (0..max_value)
+        title: Chart title
+        theme: Color theme ("light" or "dark")
+        size: Chart size in inches
+        max_value: Value at the outer ring
+        fill_alpha: Opacity of the filled area
+    """
+    labels = [str(label) for label in labels]
+    values = [float(value) for value in values]
+    key = chart_key("radar", labels, values, title, theme, list(size), max_value, fill_alpha)
+    return chart_cache.get_or_render(
+        key, lambda: _render_radar_svg(labels, values, title, theme, size, max_value, fill_alpha)
+    )
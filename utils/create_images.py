@@ -4,9 +4,13 @@ from PIL import Image, ImageDraw, ImageFont
 import io
 import os
 import json
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
+
+# Add the project root to the path (the script is run directly)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.charts import managed_figure
 
 def create_logo():
     """Create a simple logo for the BrainVenture app."""
@@ -122,74 +126,73 @@ def create_type_main_image(type_id, type_info, output_dir):
 
 def create_type_brain_image(type_id, type_info, output_dir):
     """Create a brain activity visualization for a neuroleader type."""
-    # Set up the figure
-    fig, ax = plt.subplots(figsize=(8, 6))
-    
-    # Create a brain outline
-    brain_x = np.linspace(0, 10, 100)
-    brain_top = 6 + 2 * np.sin(brain_x) - 0.2 * (brain_x - 5) ** 2
-    brain_bottom = 2 + 0.5 * np.sin(brain_x / 2)
-    
-    # Fill brain shape
-    ax.fill_between(brain_x, brain_bottom, brain_top, color='#e0e0e0')
-    
-    # Add activation areas based on type
-    title = None
-    if type_id == "neuroanalityk":
-        # Prefrontal cortex activation (low)
-        ax.fill_between([7, 9.5], [6, 7], [7, 7.5], color='#3498db', alpha=0.5)
-        # Amygdala activation (high)
-        ax.fill_between([4.5, 5.5], [3, 3], [4, 4], color='#e74c3c', alpha=0.7)
-        title = "Niska aktywność kory przedczołowej, wysoka aktywność ciała migdałowatego"
-    
-    elif type_id == "neuroreaktor":
-        # Limbic system activation (high)
-        ax.fill_between([4, 6], [3, 3], [5, 5], color='#e74c3c', alpha=0.7)
-        # Prefrontal cortex activation (low)
-        ax.fill_between([7, 9.5], [6, 7], [7, 7.5], color='#3498db', alpha=0.3)
-        title = "Wysoka aktywność układu limbicznego, niska aktywność kory przedczołowej"
-    
-    elif type_id == "neurobalanser":
-        # Balanced activation
-        ax.fill_between([7, 9.5], [6, 7], [7, 7.5], color='#3498db', alpha=0.6)
-        ax.fill_between([4, 6], [3, 3], [5, 5], color='#2ecc71', alpha=0.6)
-        title = "Zrównoważona aktywność kory przedczołowej i układu limbicznego"
-    
-    elif type_id == "neuroempata":
-        # Oxytocin system (high)
-        ax.fill_between([3, 5], [4, 4], [6, 6], color='#2ecc71', alpha=0.7)
-        # Mirror neurons (high)
-        ax.fill_between([6, 8], [5, 5], [6.5, 6.5], color='#9b59b6', alpha=0.7)
-        title = "Wysoka aktywność układu oksytocynowego i neuronów lustrzanych"
-    
-    elif type_id == "neuroinnowator":
-        # Default mode network (high)
-        ax.fill_between([2, 4], [5, 5], [7, 7], color='#f39c12', alpha=0.7)
-        # Hippocampus (high)
-        ax.fill_between([5, 6], [3.5, 3.5], [5, 5], color='#9b59b6', alpha=0.7)
-        title = "Wysoka aktywność sieci trybu domyślnego i hipokampu"
-    
-    elif type_id == "neuroinspirator":
-        # Limbic system (high)
-        ax.fill_between([4, 6], [3, 3], [5, 5], color='#e67e22', alpha=0.7)
-        # Anterior cingulate cortex (high)
-        ax.fill_between([6, 8], [4.5, 4.5], [6, 6], color='#f1c40f', alpha=0.7)
-        title = "Wysoka aktywność układu limbicznego i przedniej kory zakrętu obręczy"
-      # Remove axes
-    ax.axis('off')
-    
-    # Add title
-    if 'title' in locals() and title:
-        plt.title(title)
-    else:
-        plt.title(f"Aktywność mózgu: {type_id}")
-    
-    plt.tight_layout()
+    # Set up the figure (released when the block ends)
+    with managed_figure((8, 6)) as (fig, ax):
+    
+        # Create a brain outline
+        brain_x = np.linspace(0, 10, 100)
+        brain_top = 6 + 2 * np.sin(brain_x) - 0.2 * (brain_x - 5) ** 2
+        brain_bottom = 2 + 0.5 * np.sin(brain_x / 2)
+    
+        # Fill brain shape
+        ax.fill_between(brain_x, brain_bottom, brain_top, color='#e0e0e0')
+    
+        # Add activation areas based on type
+        title = None
+        if type_id == "neuroanalityk":
+            # Prefrontal cortex activation (low)
+            ax.fill_between([7, 9.5], [6, 7], [7, 7.5], color='#3498db', alpha=0.5)
+            # Amygdala activation (high)
+            ax.fill_between([4.5, 5.5], [3, 3], [4, 4], color='#e74c3c', alpha=0.7)
+            title = "Niska aktywność kory przedczołowej, wysoka aktywność ciała migdałowatego"
+    
+        elif type_id == "neuroreaktor":
+            # Limbic system activation (high)
+            ax.fill_between([4, 6], [3, 3], [5, 5], color='#e74c3c', alpha=0.7)
+            # Prefrontal cortex activation (low)
+            ax.fill_between([7, 9.5], [6, 7], [7, 7.5], color='#3498db', alpha=0.3)
+            title = "Wysoka aktywność układu limbicznego, niska aktywność kory przedczołowej"
+    
+        elif type_id == "neurobalanser":
+            # Balanced activation
+            ax.fill_between([7, 9.5], [6, 7], [7, 7.5], color='#3498db', alpha=0.6)
+            ax.fill_between([4, 6], [3, 3], [5, 5], color='#2ecc71', alpha=0.6)
+            title = "Zrównoważona aktywność kory przedczołowej i układu limbicznego"
+    
+        elif type_id == "neuroempata":
+            # Oxytocin system (high)
+            ax.fill_between([3, 5], [4, 4], [6, 6], color='#2ecc71', alpha=0.7)
+            # Mirror neurons (high)
+            ax.fill_between([6, 8], [5, 5], [6.5, 6.5], color='#9b59b6', alpha=0.7)
+            title = "Wysoka aktywność układu oksytocynowego i neuronów lustrzanych"
+    
+        elif type_id == "neuroinnowator":
+            # Default mode network (high)
+            ax.fill_between([2, 4], [5, 5], [7, 7], color='#f39c12', alpha=0.7)
+            # Hippocampus (high)
+            ax.fill_between([5, 6], [3.5, 3.5], [5, 5], color='#9b59b6', alpha=0.7)
+            title = "Wysoka aktywność sieci trybu domyślnego i hipokampu"
+    
+        elif type_id == "neuroinspirator":
+            # Limbic system (high)
+            ax.fill_between([4, 6], [3, 3], [5, 5], color='#e67e22', alpha=0.7)
+            # Anterior cingulate cortex (high)
+            ax.fill_between([6, 8], [4.5, 4.5], [6, 6], color='#f1c40f', alpha=0.7)
+            title = "Wysoka aktywność układu limbicznego i przedniej kory zakrętu obręczy"
+          # Remove axes
+        ax.axis('off')
+    
+        # Add title
+        if 'title' in locals() and title:
+            ax.set_title(title)
+        else:
+            ax.set_title(f"Aktywność mózgu: {type_id}")
     
-    # Save the image
-    img_path = os.path.join(output_dir, f"{type_id}_brain.png")
-    plt.savefig(img_path)
-    plt.close()
+        fig.tight_layout()
+    
+        # Save the image
+        img_path = os.path.join(output_dir, f"{type_id}_brain.png")
+        fig.savefig(img_path)
     
     return img_path
 
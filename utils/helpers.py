@@ -7,6 +7,8 @@ import datetime
 
 from typing import Dict, List, Any, Optional, Union
 
+from core.data.atomic_io import atomic_write_json
+
 def load_json_data(filepath: str, default: Optional[Any] = None) -> Any:
     """Load JSON data from a file, with a default return value if the file doesn't exist."""
     try:
@@ -16,41 +18,21 @@ def load_json_data(filepath: str, default: Optional[Any] = None) -> Any:
         return default if default is not None else {}
         
 def save_json_data(filepath: str, data: Any) -> bool:
-    """Save data to a JSON file."""
+    """Save data to a JSON file (atomically, readers never see a partial file)."""
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(filepath, data)
         return True
     except Exception:
         return False
         
 def get_course_progress(user_data: Dict[str, Any]) -> Dict[str, Any]:
     """Calculate course progress statistics based on user data."""
-    total_lessons = 150  # Total number of lessons in the course
-    completed_lessons = user_data.get('completed_lessons', [])
-    completed_count = len(completed_lessons)
-    
-    # Calculate progress percentage
-    progress_percentage = (completed_count / total_lessons) * 100 if total_lessons > 0 else 0
-    
-    # Calculate module completion
-    modules_completion = {}
-    for lesson_id in completed_lessons:
-        module_id = lesson_id.split('.')[0]
-        if module_id not in modules_completion:
-            modules_completion[module_id] = 1
-        else:
-            modules_completion[module_id] += 1
-    
-    return {
-        'total_lessons': total_lessons,
-        'completed_lessons': completed_count,
-        'progress_percentage': progress_percentage,
-        'modules_completion': modules_completion
-    }
+    from modules.learning.course_model import get_course_model
+    from modules.learning.progress import CourseProgress
+
+    # Totals come from the course structure; use ProgressAggregator for stored users
+    progress = CourseProgress(get_course_model(), user_data.get('completed_lessons', []))
+    return progress.summary()
     
 def format_date(date_str: str, output_format: str = "%d %B %Y") -> str:
     """Format a date string into a human-readable format."""
@@ -60,15 +42,31 @@ def format_date(date_str: str, output_format: str = "%d %B %Y") -> str:
     except ValueError:
         return date_str
         
-def get_lesson_status(user_data: Dict[str, Any], lesson_id: str) -> str:
-    """Get the status of a lesson for a user."""
+def get_lesson_status(user_data: Dict[str, Any], lesson_id: str, progress=None) -> str:
+    """
+    Get the status of a lesson for a user. Lessons of the course are also gated
+    by the prerequisites compiled from the course content. When statuses of
+    many lessons are needed, build the CourseProgress once per render (e.g.
+    get_progress_aggregator().get(user_id)) and pass it as progress.
+    """
+    from modules.learning.course_model import get_course_model
+    from modules.learning.progress import CourseProgress
+
     completed_lessons = user_data.get('completed_lessons', [])
-    
-    if lesson_id in completed_lessons:
+
+    model = progress.model if progress is not None else get_course_model()
+    if lesson_id in model:
+        if progress is None:
+            progress = CourseProgress(model, completed_lessons)
+        status = progress.status(lesson_id)
+        if status != "available":
+            return status
+    elif lesson_id in completed_lessons:
         return "completed"
         
     # Check if prerequisites are met
     prerequisites = user_data.get('prerequisites', {}).get(lesson_id, [])
+    completed_lessons = set(completed_lessons)
     if all(prereq in completed_lessons for prereq in prerequisites):
         return "available"
         
@@ -0,0 +1,463 @@
+"""
+Load generator for BrainVenture application.
+
+Starts the app with `streamlit run` in a temporary working directory (user
+data, norms and metrics are written there; course content and static files
+are linked from the project) and simulates concurrent browser sessions
+speaking the Streamlit websocket protocol. Every session lands on the home
+page and then walks the learner journey Dashboard -> Typy Neuroliderów ->
+typology test (every question answered) -> results -> Profil, with think
+time between steps, until the run ends.
+
+The report gives journeys and reruns per second, rerun latency percentiles
+per step, and RSS and CPU of the server process sampled over time (read from
+/proc, so only on Linux). Storage backends and caching modes are compared by
+listing several values; every combination runs against a fresh server:
+
+    python utils/load_test.py --sessions 20 --duration 60 --backend json,sqlite --write-behind 1,0
+
+All sessions use DEFAULT_USER_ID, as the app has no login yet. The websocket
+client needs the development requirements:
+
+    pip install -r requirements-dev.txt
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(ROOT_DIR, "Home.py")
+# Read-only project files needed by the server in its working directory
+LINKED_PATHS = (os.path.join("data", "content"), "static")
+
+DASHBOARD_PAGE = "Dashboard"
+TYPOLOGY_PAGE = "Typy Neuroliderow"
+PROFILE_PAGE = "Profil"
+START_LABEL = "Rozpocznij test"
+ANSWER_LABEL = "1 = zdecydowanie się nie zgadzam, 5 = zdecydowanie się zgadzam"
+SUBMIT_LABEL = "Sprawdź swój typ"
+
+PERCENTILES = (50, 95, 99)
+RERUN_TIMEOUT = 60.0
+SERVER_START_TIMEOUT = 60.0
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Returns the p-th percentile (nearest rank) of the values, 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(len(ordered) * p / 100 + 0.5) - 1))]
+
+
+# Server
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _prepare_work_dir() -> str:
+    """Creates the server's working directory with links to the read-only project files."""
+    work_dir = tempfile.mkdtemp(prefix="brainventure-load-")
+    for path in LINKED_PATHS:
+        target = os.path.join(work_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.symlink(os.path.join(ROOT_DIR, path), target)
+        except OSError:
+            # Symbolic links need extra privileges on Windows
+            shutil.copytree(os.path.join(ROOT_DIR, path), target)
+    return work_dir
+
+
+def start_server(mode: Dict[str, str], work_dir: str, port: int) -> subprocess.Popen:
+    """Starts the app on the port with the mode's environment overrides."""
+    env = dict(os.environ, **{name: value for name, value in mode.items() if value is not None})
+    # The server writes to its own copy of the file handle
+    with open(os.path.join(work_dir, "server.log"), "w", encoding="utf-8") as log:
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "streamlit", "run", MAIN_SCRIPT,
+                "--server.headless=true", "--server.address=127.0.0.1", f"--server.port={port}",
+                "--server.fileWatcherType=none", "--server.runOnSave=false",
+                "--browser.gatherUsageStats=false",
+            ],
+            cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+
+
+def wait_until_ready(process: subprocess.Popen, port: int) -> None:
+    """Waits for the health endpoint of the server."""
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not start in time")
+
+
+class ServerMonitor:
+    """Samples RSS and CPU usage of the server process from /proc."""
+
+    def __init__(self, pid: int, interval: float):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._ticks_per_second = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _read(self) -> Optional[Tuple[float, float]]:
+        """Returns (CPU seconds, RSS in MB) or None when /proc is not available."""
+        try:
+            with open(f"/proc/{self.pid}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/status", "r") as f:
+                rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration):
+            return None
+        # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+        return (int(fields[11]) + int(fields[12])) / self._ticks_per_second, rss_kb / 1024
+
+    async def run(self, stop: asyncio.Event) -> None:
+        start = time.monotonic()
+        previous = self._read()
+        previous_time = start
+        while previous is not None and not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            current, now = self._read(), time.monotonic()
+            if current is None:
+                break
+            self.samples.append({
+                "t": round(now - start, 2),
+                "rss_mb": round(current[1], 1),
+                "cpu_percent": round((current[0] - previous[0]) / (now - previous_time) * 100, 1),
+            })
+            previous, previous_time = current, now
+
+
+# Sessions
+
+class Widget:
+    """Widget rendered in the last run of a session."""
+
+    def __init__(self, kind: str, element: Any, fragment_id: str):
+        self.kind = kind
+        self.id = element.id
+        self.label = element.label
+        self.element = element
+        self.fragment_id = fragment_id
+
+
+class Session:
+    """Browser session talking to the server over the Streamlit websocket."""
+
+    def __init__(self, url: str, rng: random.Random, think_time: float, results: "LoadResults"):
+        self.url = url
+        self.rng = rng
+        self.think_time = think_time
+        self.results = results
+        self.websocket = None
+        self.pages: Dict[str, str] = {}
+        self.page_hash = ""
+        self.widgets: List[Widget] = []
+
+    async def connect(self) -> None:
+        from websockets.asyncio.client import connect
+
+        self.websocket = await connect(self.url, subprotocols=["streamlit"], max_size=None)
+        self.pages, self.page_hash, self.widgets = {}, "", []
+        await self.step("home")
+
+    async def close(self) -> None:
+        if self.websocket is not None:
+            await self.websocket.close()
+            self.websocket = None
+
+    def find(self, kind: str, label: str) -> List[Widget]:
+        """Returns the widgets of the kind with the label, in page order."""
+        return [widget for widget in self.widgets if widget.kind == kind and widget.label == label]
+
+    async def rerun(self, page_hash: Optional[str] = None, widget_states=(), fragment_id: str = "") -> float:
+        """Sends a rerun request and waits until the script run ends; returns its latency."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_hash if page_hash is None else page_hash
+        client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(widget_states)
+        start = time.perf_counter()
+        await self.websocket.send(message.SerializeToString())
+        await asyncio.wait_for(self._receive_run(), RERUN_TIMEOUT)
+        return time.perf_counter() - start
+
+    async def _receive_run(self) -> None:
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            message = ForwardMsg()
+            message.ParseFromString(await self.websocket.recv())
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                new_session = message.new_session
+                self.pages = {page.page_name: page.page_script_hash for page in new_session.app_pages}
+                self.page_hash = new_session.page_script_hash
+                fragments = set(new_session.fragment_ids_this_run)
+                # A full run replaces every widget, a fragment run only its own
+                self.widgets = [w for w in self.widgets if fragments and w.fragment_id not in fragments]
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    raise RuntimeError(f"App error: {element.exception.message}")
+                widget = getattr(element, element_type)
+                if getattr(widget, "id", "") and hasattr(widget, "label"):
+                    self.widgets.append(Widget(element_type, widget, message.delta.fragment_id))
+            elif kind == "page_not_found":
+                raise RuntimeError(f"Page not found: {message.page_not_found.page_name}")
+            elif kind == "script_finished" and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                if message.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Script compile error")
+                return
+
+    async def step(self, name: str, **rerun_args) -> None:
+        """Runs one journey step and records its latency."""
+        self.results.record(name, await self.rerun(**rerun_args))
+
+    async def click(self, name: str, button: Widget, widget_states=()) -> None:
+        """Clicks the button, sending the given widget values with it."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        trigger = WidgetState(id=button.id, trigger_value=True)
+        await self.step(name, widget_states=list(widget_states) + [trigger], fragment_id=button.fragment_id)
+
+    async def think(self) -> None:
+        await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+
+    async def take_test(self) -> None:
+        """Opens the typology test, answers every question and submits the form."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        await self.step("typology", page_hash=self.pages[TYPOLOGY_PAGE])
+        if not self.find("button", SUBMIT_LABEL):
+            await self.think()
+            await self.click("start_test", self.find("button", START_LABEL)[0])
+            # The button only changes the page state; the form appears on the next run
+            if not self.find("button", SUBMIT_LABEL):
+                await self.step("test_form")
+        await self.think()
+        answers = []
+        for slider in self.find("slider", ANSWER_LABEL):
+            state = WidgetState(id=slider.id)
+            state.double_array_value.data.append(self.rng.randint(int(slider.element.min), int(slider.element.max)))
+            answers.append(state)
+        await self.click("results", self.find("button", SUBMIT_LABEL)[0], answers)
+
+    async def journey(self) -> None:
+        await self.step("dashboard", page_hash=self.pages[DASHBOARD_PAGE])
+        await self.think()
+        await self.take_test()
+        await self.think()
+        await self.step("profile", page_hash=self.pages[PROFILE_PAGE])
+        self.results.journeys += 1
+        await self.think()
+
+    async def run(self, deadline: float) -> None:
+        """Repeats the journey until the deadline, reconnecting after errors."""
+        while time.monotonic() < deadline:
+            try:
+                if self.websocket is None:
+                    await self.connect()
+                await self.journey()
+            except Exception as e:
+                self.results.record_error(e)
+                await self.close()
+                await asyncio.sleep(1)
+        await self.close()
+
+
+class LoadResults:
+    """Latencies and errors recorded by all sessions of a run."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.journeys = 0
+
+    def record(self, step: str, seconds: float) -> None:
+        self.latencies.setdefault(step, []).append(seconds * 1000)
+
+    def record_error(self, error: Exception) -> None:
+        key = f"{type(error).__name__}: {error}"[:200]
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        def stats(values):
+            return {"count": len(values), **{f"p{p}_ms": round(percentile(values, p), 1) for p in PERCENTILES}}
+
+        every = [value for values in self.latencies.values() for value in values]
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "journeys": self.journeys,
+            "journeys_per_s": round(self.journeys / elapsed, 3),
+            "reruns_per_s": round(len(every) / elapsed, 2),
+            "latency": stats(every),
+            "steps": {step: stats(values) for step, values in self.latencies.items()},
+            "errors": self.errors,
+        }
+
+
+async def generate_load(port: int, pid: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs the sessions against the server and returns the summary with server samples."""
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    results = LoadResults()
+    monitor = ServerMonitor(pid, args.sample_interval)
+    stop = asyncio.Event()
+    monitor_task = asyncio.ensure_future(monitor.run(stop))
+
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    rng = random.Random(args.seed)
+
+    async def session(index: int) -> None:
+        # Sessions are started evenly over the ramp-up period
+        await asyncio.sleep(args.ramp_up * index / args.sessions)
+        await Session(url, random.Random(rng.random()), args.think_time, results).run(deadline)
+
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    stop.set()
+    await monitor_task
+
+    summary = results.summary(time.monotonic() - start)
+    samples = monitor.samples
+    summary["server"] = {
+        "peak_rss_mb": max((s["rss_mb"] for s in samples), default=None),
+        "mean_cpu_percent": round(sum(s["cpu_percent"] for s in samples) / len(samples), 1) if samples else None,
+        "samples": samples,
+    }
+    return summary
+
+
+def run_mode(mode: Dict[str, str], args: argparse.Namespace) -> Dict[str, Any]:
+    """Starts a fresh server with the mode's settings and generates load against it."""
+    work_dir = _prepare_work_dir()
+    port = _free_port()
+    process = start_server(mode, work_dir, port)
+    try:
+        wait_until_ready(process, port)
+        return asyncio.run(generate_load(port, process.pid, args))
+    except RuntimeError:
+        with open(os.path.join(work_dir, "server.log"), "r", encoding="utf-8") as f:
+            sys.stderr.write(f.read()[-4000:])
+        raise
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Report
+
+def _mode_label(mode: Dict[str, str]) -> str:
+    names = {
+        "BRAINVENTURE_STORAGE_BACKEND": "backend",
+        "BRAINVENTURE_WRITE_BEHIND": "write_behind",
+        "BRAINVENTURE_CHART_CACHE_MAX_BYTES": "chart_cache",
+    }
+    return " ".join(f"{names[name]}={value}" for name, value in mode.items() if value is not None) or "config"
+
+
+def print_report(label: str, summary: Dict[str, Any]) -> None:
+    latency = summary["latency"]
+    print(f"\n== {label}")
+    print(f"journeys: {summary['journeys']} ({summary['journeys_per_s']}/s), "
+          f"reruns: {latency['count']} ({summary['reruns_per_s']}/s), "
+          f"errors: {sum(summary['errors'].values())}")
+    print(f"{'step':<12}{'count':>8}" + "".join(f"{f'p{p} [ms]':>12}" for p in PERCENTILES))
+    for step, stats in list(summary["steps"].items()) + [("all", latency)]:
+        print(f"{step:<12}{stats['count']:>8}" + "".join(f"{stats[f'p{p}_ms']:>12}" for p in PERCENTILES))
+    server = summary["server"]
+    if server["samples"]:
+        print(f"server: peak RSS {server['peak_rss_mb']} MB, mean CPU {server['mean_cpu_percent']}%")
+    for error, count in summary["errors"].items():
+        print(f"  {count} x {error}")
+
+
+def print_comparison(runs: List[Dict[str, Any]]) -> None:
+    print(f"\n{'mode':<48}{'reruns/s':>10}" + "".join(f"{f'p{p} [ms]':>10}" for p in PERCENTILES)
+          + f"{'RSS [MB]':>10}{'CPU [%]':>9}")
+    for run in runs:
+        summary = run["summary"]
+        server = summary["server"]
+        print(f"{run['mode']:<48}{summary['reruns_per_s']:>10}"
+              + "".join(f"{summary['latency'][f'p{p}_ms']:>10}" for p in PERCENTILES)
+              + f"{str(server['peak_rss_mb']):>10}{str(server['mean_cpu_percent']):>9}")
+
+
+def _values(text: Optional[str]) -> List[Optional[str]]:
+    return [value.strip() for value in text.split(",")] if text else [None]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate concurrent learners against a local BrainVenture server.")
+    parser.add_argument("--sessions", type=int, default=10, help="number of simultaneous sessions")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of full load after the ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds over which the sessions are started")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean pause between steps in seconds")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between server RSS/CPU samples")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the simulated answers and pauses")
+    parser.add_argument("--backend", help="storage backends to compare, e.g. json,sqlite")
+    parser.add_argument("--write-behind", help="write-behind modes to compare, e.g. 1,0")
+    parser.add_argument("--chart-cache-bytes", help="chart cache limits to compare, e.g. 33554432,0")
+    parser.add_argument("--output", help="JSON file for the full results (with the server samples)")
+    args = parser.parse_args(argv)
+
+    modes = [
+        {
+            "BRAINVENTURE_STORAGE_BACKEND": backend,
+            "BRAINVENTURE_WRITE_BEHIND": write_behind,
+            "BRAINVENTURE_CHART_CACHE_MAX_BYTES": chart_cache,
+        }
+        for backend, write_behind, chart_cache in itertools.product(
+            _values(args.backend), _values(args.write_behind), _values(args.chart_cache_bytes)
+        )
+    ]
+    runs = []
+    for mode in modes:
+        label = _mode_label(mode)
+        summary = run_mode(mode, args)
+        print_report(label, summary)
+        runs.append({"mode": label, "sessions": args.sessions, "summary": summary})
+    if len(runs) > 1:
+        print_comparison(runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
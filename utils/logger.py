@@ -1,51 +1,172 @@
 """
 Logger utility for BrainVenture application.
+
+Loggers set up here never write on the calling (script) thread: records are
+put on a queue by a QueueHandler and written by a single background
+QueueListener per log file, which owns the console and file handlers. Log
+files are named after the day (app_YYYYMMDD.log), roll over to a new file at
+midnight and are additionally rotated by size within a day. Setting up the
+same logger again does not add handlers.
 """
+import atexit
+import glob
 import logging
+import logging.handlers
 import os
-import datetime
-from typing import Optional
+import queue
+import re
+import threading
+from datetime import date, timedelta
+from typing import Dict, Optional
 
-def setup_logger(name: str, log_level: int = logging.INFO, log_file: Optional[str] = None) -> logging.Logger:
-    """Set up a logger with the specified configuration."""
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(log_level)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # Create file handler if log_file is specified
-    if log_file:
-        # Ensure log directory exists
+from config.app_config import LOG_BACKUP_COUNT, LOG_MAX_BYTES, LOG_RETENTION_DAYS, LOGS_DIR
+from core.analytics.events import emit, get_schemas
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    File handler writing to <name>_YYYYMMDD<ext> for the current day. A new
+    file is started at midnight; within a day the file is rotated by size
+    (<name>_YYYYMMDD<ext>.1, .2, ...). Files of days older than the retention
+    period are removed when the day changes.
+    """
+
+    def __init__(self, log_file: str, max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT,
+                 retention_days: int = LOG_RETENTION_DAYS):
+        """
+        Args:
+            log_file: Path without the date, e.g. data/logs/app.log
+            max_bytes: Size after which the file of the day is rotated (0 disables)
+            backup_count: Number of rotated files kept per day
+            retention_days: Number of days whose files are kept (0 keeps all)
+        """
+        self.log_file = log_file
+        self.retention_days = retention_days
+        self.day = self._today()
         log_dir = os.path.dirname(log_file)
         if log_dir:
             os.makedirs(log_dir, exist_ok=True)
-            
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+        super().__init__(self._dated_path(self.day), maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+
+    @staticmethod
+    def _today() -> date:
+        return date.today()
+
+    def _dated_path(self, day: date) -> str:
+        root, ext = os.path.splitext(self.log_file)
+        return f"{root}_{day:%Y%m%d}{ext}"
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return self._today() != self.day or bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        today = self._today()
+        if today == self.day:
+            super().doRollover()
+            return
+        # New day: switch to the file of the day instead of renaming the old one
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.day = today
+        self.baseFilename = os.path.abspath(self._dated_path(today))
+        self._remove_expired()
+
+    def _remove_expired(self) -> None:
+        if not self.retention_days:
+            return
+        root, ext = os.path.splitext(self.log_file)
+        oldest = f"{self.day - timedelta(days=self.retention_days - 1):%Y%m%d}"
+        pattern = re.compile(re.escape(os.path.basename(root)) + r"_(\d{8})" + re.escape(ext))
+        for path in glob.glob(f"{glob.escape(root)}_*{ext}*"):
+            match = pattern.match(os.path.basename(path))
+            if match and match.group(1) < oldest:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# Background writers keyed by log file (None: console only)
+_listeners: Dict[Optional[str], logging.handlers.QueueListener] = {}
+_listeners_lock = threading.Lock()
+
+
+def _get_listener(log_file: Optional[str]) -> logging.handlers.QueueListener:
+    """Returns the running background writer for the log file, starting it on first use."""
+    listener = _listeners.get(log_file)
+    if listener is None:
+        with _listeners_lock:
+            listener = _listeners.get(log_file)
+            if listener is None:
+                formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+                handlers = [logging.StreamHandler()]
+                if log_file:
+                    handlers.append(DailyRotatingFileHandler(log_file))
+                for handler in handlers:
+                    handler.setFormatter(formatter)
+                listener = logging.handlers.QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+                listener.start()
+                if not _listeners:
+                    # Records still queued are written when the process exits
+                    atexit.register(shutdown)
+                _listeners[log_file] = listener
+    return listener
+
+
+def setup_logger(name: str, log_level: int = logging.INFO, log_file: Optional[str] = None) -> logging.Logger:
+    """
+    Set up a logger writing through the background writer of the log file.
+    Calling it again for the same logger and file only updates its level.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(log_level)
+    listener = _get_listener(log_file)
+    for handler in logger.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            if handler.queue is listener.queue:
+                return logger
+            # Handler of another log file or of a stopped writer
+            logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(listener.queue))
     return logger
 
+
+def shutdown() -> None:
+    """Writes the queued records and stops the background writers."""
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
 # Create default application logger
 app_logger = setup_logger(
     'brainventure',
     log_level=logging.INFO,
-    log_file=os.path.join('data', 'logs', f'app_{datetime.datetime.now().strftime("%Y%m%d")}.log')
+    log_file=os.path.join(LOGS_DIR, 'app.log')
 )
 
+
 def log_user_activity(user_id: str, action: str, details: Optional[dict] = None) -> None:
-    """Log user activity for analytics purposes."""
+    """
+    Log user activity for analytics purposes. Besides the log line, the
+    activity is recorded in the activity event stream (see
+    core.analytics.events): as an event of the action's type if the action is
+    a registered event type, otherwise as a generic "activity" event.
+    """
     if details is None:
         details = {}
-        
-    app_logger.info(f"User {user_id} - {action} - {details}")
+
+    app_logger.info("User %s - %s - %s", user_id, action, details)
+    if action in get_schemas():
+        emit(action, user_id, **details)
+    else:
+        emit("activity", user_id, action=action, details=details)
@@ -2,10 +2,13 @@
 Navigation utilities for the BrainVenture app.
 """
 import streamlit as st
-import os
 from streamlit_option_menu import option_menu
 from utils.theme_provider import ThemeProvider, UITheme
 from components.theme_switcher import get_current_theme, get_current_layout
+from utils.assets import show_image
+from core.analytics.profiling import profiled
+from core.analytics.events import emit
+from config.app_config import DEFAULT_USER_ID
 
 def hide_streamlit_navigation():
     """Hide the default Streamlit navigation sidebar and top menu."""
@@ -43,6 +46,7 @@ def hide_streamlit_navigation():
     </style>
     """, unsafe_allow_html=True)
 
+@profiled()
 def create_sidebar_navigation(current_page=None):
     """
     Creates a consistent navigation sidebar for all pages.
@@ -54,15 +58,16 @@ def create_sidebar_navigation(current_page=None):
     if current_page is None:
         current_page = st.session_state.get("current_page", "Dashboard")
     
+    # Record a page view when the user enters the page (not on every rerun)
+    if st.session_state.get("current_page") != current_page:
+        emit("page_view", DEFAULT_USER_ID, page=current_page)
+    
     # Store the current page in session state
     st.session_state["current_page"] = current_page
     
     with st.sidebar:
         # Show logo if available
-        logo_path = os.path.join("static", "images", "brainventure_logo.png")
-        if os.path.exists(logo_path):
-            st.image(logo_path, width=150)
-        else:
+        if not show_image("brainventure_logo.png", width=150):
             st.title(" BrainVenture")
         
         # Main navigation menu - usunięto "Lekcje" i "Ustawienia"
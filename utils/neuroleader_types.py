@@ -2,32 +2,40 @@
 Moduł zarządzający typologią neuroliderów w aplikacji BrainVenture.
 """
 import json
-import os
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-from matplotlib.patches import Circle, RegularPolygon
-from matplotlib.path import Path
-from matplotlib.projections import register_projection
-from matplotlib.projections.polar import PolarAxes
-from matplotlib.spines import Spine
-from matplotlib.transforms import Affine2D
 from datetime import datetime
 
+from core.data.content_repository import (
+    get_neuroleader_types,
+    get_neuroleader_type_test,
+    get_neuroleader_type_description,
+)
+from core.data.user_store import get_user_store
+from core.analytics.norms import get_norms
+from core.analytics.profiling import profiled
+from components.theme_switcher import get_current_theme
+from utils.charts import radar_chart_svg
+from utils.assets import show_image
+from config.app_config import DEFAULT_USER_ID, SCORE_HIGH_THRESHOLD, SCORE_MEDIUM_THRESHOLD
+
 class NeuroleaderTypes:
     """Klasa do zarządzania typami neuroliderów w aplikacji."""
     
-    def __init__(self):
+    def __init__(self, user_store=None, norms=None):
+        """
+        Args:
+            user_store: Magazyn danych użytkowników (domyślnie współdzielony magazyn aplikacji)
+            norms: Normy wyników do rang centylowych (domyślnie współdzielone normy aplikacji)
+        """
+        self.user_store = user_store if user_store is not None else get_user_store()
+        self.norms = norms if norms is not None else get_norms()
         self.types_data = self._load_types_data()
         self.test_data = self._load_test_data()
         
     def _load_types_data(self):
         """Wczytuje podstawowe dane typów z pliku JSON."""
         try:
-            filepath = os.path.join("data", "content", "neuroleader_types.json")
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return get_neuroleader_types()
         except Exception as e:
             st.error(f"Nie udało się wczytać danych typów: {e}")
             return []
@@ -35,19 +43,15 @@ class NeuroleaderTypes:
     def _load_test_data(self):
         """Wczytuje dane testu z pliku JSON."""
         try:
-            filepath = os.path.join("data", "content", "neuroleader_type_test.json")
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return get_neuroleader_type_test()
         except Exception as e:
             st.error(f"Nie udało się wczytać danych testu: {e}")
             return {"questions": []}
     
     def _load_markdown_content(self, type_id):
         """Wczytuje treść markdowna dla danego typu."""
-        filepath = os.path.join("data", "content", "neuroleader_types", f"{type_id}.md")
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                return f.read()
+            return get_neuroleader_type_description(type_id)
         except Exception as e:
             st.error(f"Nie udało się wczytać opisu dla typu {type_id}: {e}")
             return ""
@@ -82,11 +86,12 @@ class NeuroleaderTypes:
             interpretations = score_interpretation.get(type_id, {})
         else:
             interpretations = {}
+        
         percentage = score / max_score
         
-        if percentage < 0.4:
+        if percentage < SCORE_MEDIUM_THRESHOLD:
             return interpretations.get("low", "Niski wynik")
-        elif percentage < 0.7:
+        elif percentage < SCORE_HIGH_THRESHOLD:
             return interpretations.get("medium", "Średni wynik")
         else:
             return interpretations.get("high", "Wysoki wynik")
@@ -101,128 +106,128 @@ class NeuroleaderTypes:
         Returns:
             dict: Wyniki testu
         """
-        # Inicjalizacja wyników
-        results = {
-            "neuroanalityk": 0,
-            "neuroreaktor": 0,
-            "neurobalanser": 0,
-            "neuroempata": 0,
-            "neuroinnowator": 0,
-            "neuroinspirator": 0,
-            "question_counts": {
-                "neuroanalityk": 0,
-                "neuroreaktor": 0,
-                "neurobalanser": 0,
-                "neuroempata": 0,
-                "neuroinnowator": 0,
-                "neuroinspirator": 0
-            }
-        }
+        # Silnik punktacji (NumPy) jest importowany dopiero przy pierwszym obliczeniu wyników
+        from utils.typology_scoring import get_scorer
         
-        # Obliczenie sumy punktów dla każdego typu
-        for question in self.get_test_questions():
-            q_id = question["id"]
-            q_type = question["type"]
-            
-            if q_id in answers:
-                results[q_type] += answers[q_id]
-                results["question_counts"][q_type] += 1
+        scorer = get_scorer(self.test_data, self.types_data)
+        final_results = scorer.score(answers)
         
-        # Normalizacja wyników (średnia punktów na pytanie)
-        normalized_results = {}
-        for type_id, score in results.items():
-            if type_id != "question_counts":
-                if results["question_counts"][type_id] > 0:
-                    normalized_results[type_id] = score / results["question_counts"][type_id]
-                else:
-                    normalized_results[type_id] = 0
+        # Dodaj interpretacje dla każdego typu
+        final_results["interpretations"] = {
+            type_id: self.interpret_score(type_id, score, scorer.max_score)
+            for type_id, score in final_results["scores"].items()
+        }
         
-        # Znalezienie dominującego i drugorzędnego typu
-        sorted_results = sorted(normalized_results.items(), key=lambda x: x[1], reverse=True)
+        return final_results
+    
+    def calculate_batch_results(self, answers):
+        """
+        Oblicza wyniki testu dla wielu osób naraz (np. arkuszy zaimportowanych dla grupy).
         
-        # Przygotuj końcowy wynik
-        final_results = {
-            "scores": normalized_results,
-            "dominant_type": sorted_results[0][0],
-            "secondary_type": sorted_results[1][0] if len(sorted_results) > 1 else None,
-            "tertiary_type": sorted_results[2][0] if len(sorted_results) > 2 else None,
-            "interpretations": {}
-        }
+        Args:
+            answers: Macierz odpowiedzi (osoby × pytania, w kolejności pytań testu),
+                DataFrame z kolumnami = id pytań lub ścieżka do pliku CSV/Parquet
+            
+        Returns:
+            pandas.DataFrame: Wyniki typów, typ dominujący, drugorzędny i trzeciorzędny
+                oraz interpretacje (kolumny interpretation_<typ>) dla każdej osoby
+        """
+        from utils.typology_scoring import get_scorer, interpretation_table, score_answer_sheet
         
-        # Dodaj interpretacje dla każdego typu
-        for type_id, score in normalized_results.items():
-            final_results["interpretations"][type_id] = self.interpret_score(
-                type_id, score, 5  # 5 to maksymalny wynik na pytanie
-            )
+        scorer = get_scorer(self.test_data, self.types_data)
+        interpretations = interpretation_table(self.test_data, scorer.type_ids)
+        return score_answer_sheet(scorer, answers, interpretations)
+    
+    def get_percentiles(self, scores, cohort=None):
+        """
+        Zwraca rangi centylowe wyników typów na tle wszystkich zapisanych wyników.
         
-        return final_results
+        Args:
+            scores: Słownik wyników typów (id typu -> wynik)
+            cohort: Nazwa grupy, z którą porównać wyniki (domyślnie cała populacja)
+            
+        Returns:
+            dict: id typu -> ranga centylowa 0-100 (None, jeśli brak danych)
+        """
+        return self.norms.percentiles(scores, cohort)
     
-    def save_test_results(self, user_id, results):
+    @profiled()
+    def save_test_results(self, user_id, results, cohort=None):
         """
-        Zapisuje wyniki testu do pliku user_data.json.
+        Zapisuje wyniki testu w historii testów użytkownika i aktualizuje normy wyników.
         
         Args:
-            user_id: ID użytkownika (obecnie niewykorzystywane, na przyszłość)
+            user_id: ID użytkownika
             results: Wyniki testu do zapisania
+            cohort: Grupa użytkownika (domyślnie pole "cohort" z profilu)
             
         Returns:
             bool: True jeśli zapis się powiódł, False w przeciwnym razie
         """
         try:
-            # Wczytaj aktualne dane użytkownika
-            user_data = self._load_user_data()
-            
-            # Dodaj lub zaktualizuj dane testu neurolidera
-            if "neuroleader_tests" not in user_data:
-                user_data["neuroleader_tests"] = []
-            
             # Dodaj datę do wyników
             test_result = results.copy()
             test_result["date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            # Dodaj nowy wynik na początku listy (najnowsze na górze)
-            user_data["neuroleader_tests"].insert(0, test_result)
+            # Dodaj rangi centylowe wyniku (liczonego razem z wynikami zapisanymi wcześniej)
+            if cohort is None:
+                cohort = self.user_store.get_user(user_id).get("cohort")
+            scores = results.get("scores", {})
+            test_result["percentiles"] = self.norms.percentiles(scores, include_score=True)
+            if cohort:
+                test_result["cohort"] = cohort
+                test_result["cohort_percentiles"] = self.norms.percentiles(scores, cohort, include_score=True)
+            
+            # Zapisz wynik jako najnowszy wpis w historii użytkownika
+            self.user_store.add_test_result(user_id, test_result)
             
-            # Zapisz zaktualizowane dane
-            self._save_user_data(user_data)
+            # Normy są aktualizowane dopiero po zapisaniu (zakolejkowaniu) wyniku
+            self.norms.add_result(scores, cohort)
             
             return True
         except Exception as e:
             st.error(f"Błąd podczas zapisywania wyników testu: {e}")
             return False
     
-    def get_user_test_history(self):
+    def get_user_test_history(self, user_id=DEFAULT_USER_ID):
         """
         Pobiera historię testów użytkownika.
         
+        Args:
+            user_id: ID użytkownika
+            
         Returns:
-            list: Lista wyników testów z datami
+            list: Lista wyników testów z datami (najnowsze na początku)
         """
         try:
-            user_data = self._load_user_data()
-            return user_data.get("neuroleader_tests", [])
+            return self.user_store.get_test_history(user_id)
         except Exception as e:
             st.error(f"Błąd podczas pobierania historii testów: {e}")
             return []
     
-    def _load_user_data(self):
-        """Wczytuje dane użytkownika z pliku JSON."""
+    def get_latest_test_result(self, user_id=DEFAULT_USER_ID):
+        """
+        Pobiera najnowszy wynik testu użytkownika.
+        
+        Args:
+            user_id: ID użytkownika
+            
+        Returns:
+            dict: Najnowszy wynik testu lub None, jeśli użytkownik nie ma historii
+        """
         try:
-            filepath = os.path.join("data", "content", "user_data.json")
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self.user_store.get_latest_test_result(user_id)
         except Exception as e:
-            st.error(f"Nie udało się wczytać danych użytkownika: {e}")
-            return {}
+            st.error(f"Błąd podczas pobierania wyniku testu: {e}")
+            return None
     
-    def _save_user_data(self, user_data):
-        """Zapisuje dane użytkownika do pliku JSON."""
+    def count_user_tests(self, user_id=DEFAULT_USER_ID):
+        """Zwraca liczbę zapisanych testów użytkownika."""
         try:
-            filepath = os.path.join("data", "content", "user_data.json")
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(user_data, f, indent=2, ensure_ascii=False)
+            return self.user_store.count_test_results(user_id)
         except Exception as e:
-            st.error(f"Nie udało się zapisać danych użytkownika: {e}")
+            st.error(f"Błąd podczas pobierania historii testów: {e}")
+            return 0
     
     def render_type_card(self, type_id):
         """Renderuje kartę typu (skrócony widok w liście typów)."""
@@ -237,10 +242,7 @@ class NeuroleaderTypes:
             st.markdown(f"<h1 style='font-size: 3rem; margin: 0;'>{type_info.get('icon', '')}</h1>", unsafe_allow_html=True)
             
             # Wyświetl obrazek jeśli istnieje
-            image_path = os.path.join("static", "images", "neuroleader_types", 
-                                     type_info.get("image", f"{type_id}.png"))
-            if os.path.exists(image_path):
-                st.image(image_path, width=120)
+            show_image(f"neuroleader_types/{type_info.get('image', f'{type_id}.png')}", width=120)
         
         with col2:
             # Wyświetl podstawowe informacje
@@ -264,6 +266,7 @@ class NeuroleaderTypes:
         # Renderuj markdown bezpośrednio w Streamlit
         st.markdown(markdown_content)
     
+    @profiled()
     def render_radar_chart(self, results):
         """Renderuje wykres radarowy wyników testu."""
         # Przygotuj dane do wykresu
@@ -275,43 +278,13 @@ class NeuroleaderTypes:
             categories.append(type_info["name"].split("–")[0].strip())  # Tylko pierwsza część nazwy
             values.append(results["scores"].get(type_id, 0))
         
-        # Licz ilość zmiennych
-        N = len(categories)
-        
-        # Co będzie kątem każdej osi w wykresie
-        angles = [n / float(N) * 2 * np.pi for n in range(N)]
-        angles += angles[:1]  # Domknij wykres
-        
-        # Wartości do wykresu
-        values_for_chart = values.copy()
-        values_for_chart += values[:1]  # Domknij wykres
-        
-        # Ustawienia wykresu
-        fig, ax = plt.subplots(figsize=(10, 8), subplot_kw=dict(polar=True))
-        
-        # Rysuj wykres
-        ax.plot(angles, values_for_chart, linewidth=2, linestyle='solid')
-        ax.fill(angles, values_for_chart, alpha=0.4)
-        
-        # Ustaw osie dla każdego kąta i etykiety
-        plt.xticks(angles[:-1], categories)
-        
-        # Ustaw limit osi Y
-        ax.set_ylim(0, 5)
-        
-        # Ustaw etykiety osi Y
-        ax.set_yticks([1, 2, 3, 4, 5])
-        ax.set_yticklabels(['1', '2', '3', '4', '5'])
-        
-        # Dodaj tytuł
-        plt.title("Profil neurolidera", size=15, pad=20)
-        
-        # Wyświetl wykres
-        st.pyplot(fig)
+        # Wykres z tymi samymi danymi i motywem jest pobierany z pamięci podręcznej
+        chart = radar_chart_svg(categories, values, "Profil neurolidera", theme=get_current_theme())
+        st.image(chart)
 
-    def display_test_history(self):
+    def display_test_history(self, user_id=DEFAULT_USER_ID):
         """Wyświetla historię testów neuroleaderskich użytkownika."""
-        test_history = self.get_user_test_history()
+        test_history = self.get_user_test_history(user_id)
         
         if not test_history:
             st.info("Nie masz jeszcze historii testów neuroleaderskich.")
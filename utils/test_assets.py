@@ -0,0 +1,100 @@
+"""
+Testy rejestru statycznych obrazów aplikacji BrainVenture.
+"""
+import io
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.assets import AssetRegistry, get_assets
+
+
+class TestAssetRegistry(unittest.TestCase):
+    """Testy manifestu obrazów i ich pomniejszonych wariantów."""
+
+    def setUp(self):
+        self.images_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.images_dir, "types"))
+        # Obraz z szumem, aby pomniejszone warianty były mniejsze od oryginału
+        rng = random.Random(5)
+        image = Image.new("RGB", (800, 400))
+        image.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(800 * 400)])
+        image.save(os.path.join(self.images_dir, "types", "big.png"))
+        Image.new("RGB", (100, 100), "white").save(os.path.join(self.images_dir, "small.png"))
+        with open(os.path.join(self.images_dir, "notes.txt"), "w") as f:
+            f.write("nie obraz")
+
+        self.registry = AssetRegistry(self.images_dir, widths=(120, 200))
+
+    def tearDown(self):
+        shutil.rmtree(self.images_dir, ignore_errors=True)
+
+    def test_manifest(self):
+        """Sprawdza, czy manifest zawiera tylko obrazy z wymiarami i hashem treści."""
+        self.assertEqual(sorted(self.registry.manifest), ["small.png", "types/big.png"])
+        asset = self.registry.get("types/big.png")
+        self.assertEqual((asset.width, asset.height), (800, 400))
+        self.assertEqual(len(asset.digest), 64)
+        with self.assertRaises(TypeError):
+            self.registry.manifest["other.png"] = asset
+
+    def test_variants_for_display_width(self):
+        """Sprawdza wybór wariantu o rozdzielczości dopasowanej do szerokości wyświetlania."""
+        asset = self.registry.get("types/big.png")
+        self.assertEqual([width for width, _ in asset.variants], [240, 400])
+
+        with Image.open(io.BytesIO(self.registry.image_bytes("types/big.png", width=120))) as image:
+            self.assertEqual(image.size, (240, 120))
+        with Image.open(io.BytesIO(self.registry.image_bytes("types/big.png", width=150))) as image:
+            self.assertEqual(image.size, (400, 200))
+        self.assertEqual(self.registry.image_bytes("types/big.png", width=500), asset.data)
+        self.assertEqual(self.registry.image_bytes("types/big.png"), asset.data)
+
+        # Obraz mniejszy niż warianty jest wysyłany w oryginale
+        self.assertEqual(self.registry.get("small.png").variants, ())
+
+    def test_names_and_missing_images(self):
+        """Sprawdza nazwy podane jako ścieżki oraz brakujące obrazy."""
+        path = os.path.join(self.images_dir, "types", "big.png")
+        self.assertIs(self.registry.get(path), self.registry.get("types/big.png"))
+        self.assertIsNone(self.registry.image_bytes("missing.png"))
+        self.assertNotIn("notes.txt", self.registry)
+
+    def test_unreadable_image_skipped(self):
+        """Sprawdza pominięcie uszkodzonego obrazu z ostrzeżeniem w logu."""
+        with open(os.path.join(self.images_dir, "broken.png"), "wb") as f:
+            f.write(b"nie obraz")
+        with self.assertLogs("brainventure", level="WARNING") as logs:
+            registry = AssetRegistry(self.images_dir, widths=(120,))
+        self.assertNotIn("broken.png", registry)
+        self.assertEqual(logs.records[0].args[0], os.path.join(self.images_dir, "broken.png"))
+
+    def test_card_image_outside_registry(self):
+        """Sprawdza, czy karty pokazują także istniejące obrazy spoza katalogu obrazów."""
+        from utils import ui
+
+        path = os.path.join(self.images_dir, "small.png")
+        with mock.patch.object(ui.st, "image") as image:
+            self.assertTrue(ui._show_item_image(path))
+            self.assertFalse(ui._show_item_image(os.path.join(self.images_dir, "missing.png")))
+        image.assert_called_once_with(path, use_column_width=True)
+
+    def test_application_images(self):
+        """Sprawdza, czy rejestr aplikacji zawiera logo i obrazy typów."""
+        assets = get_assets()
+        self.assertIs(get_assets(), assets)
+        self.assertIn("brainventure_logo.png", assets)
+        self.assertIn("neuroleader_types/neuroempata.png", assets)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Testy renderowania wykresów i pamięci podręcznej wykresów.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.chart_cache import ChartCache, chart_key, chart_cache
+from utils.charts import radar_chart_svg, managed_figure, live_figure_count, figure_to_png, _render_radar_svg
+
+
+class TestChartCache(unittest.TestCase):
+    """Testy pamięci podręcznej wyrenderowanych wykresów."""
+
+    def test_render_once(self):
+        """Sprawdza, czy wykres o tym samym kluczu jest renderowany tylko raz."""
+        cache = ChartCache(max_bytes=100)
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"png"
+
+        key = chart_key("radar", [1.0, 2.0], "light")
+        self.assertEqual(cache.get_or_render(key, render), b"png")
+        self.assertEqual(cache.get_or_render(key, render), b"png")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_depends_on_inputs(self):
+        """Sprawdza, czy klucz zależy od wyników, motywu i rozmiaru."""
+        base = chart_key("radar", [1.0, 2.0], "light", [10, 8])
+        self.assertEqual(base, chart_key("radar", [1.0, 2.0], "light", [10, 8]))
+        self.assertNotEqual(base, chart_key("radar", [1.0, 2.5], "light", [10, 8]))
+        self.assertNotEqual(base, chart_key("radar", [1.0, 2.0], "dark", [10, 8]))
+        self.assertNotEqual(base, chart_key("radar", [1.0, 2.0], "light", [8, 8]))
+
+    def test_lru_eviction_by_size(self):
+        """Sprawdza usuwanie najdawniej używanych wykresów po przekroczeniu limitu pamięci."""
+        cache = ChartCache(max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+        cache.put("c", b"1234")
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertLessEqual(cache.size, 10)
+
+        cache.put("big", b"x" * 11)
+        self.assertIsNone(cache.get("big"))
+
+    def test_radar_chart_cached(self):
+        """Sprawdza, czy wykres radarowy jest zwracany z pamięci podręcznej."""
+        chart_cache.clear()
+        labels = ["A", "B", "C"]
+        first = radar_chart_svg(labels, [1, 2, 3], "Profil", size=(3, 3))
+        second = radar_chart_svg(labels, [1.0, 2.0, 3.0], "Profil", size=(3, 3))
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, radar_chart_svg(labels, [1, 2, 3], "Profil", theme="dark", size=(3, 3)))
+
+
+class TestRadarChartSvg(unittest.TestCase):
+    """Testy generatora wykresu radarowego SVG."""
+
+    def test_identical_output(self):
+        """Sprawdza, czy te same dane dają identyczny SVG."""
+        args = (["Neuroanalityk", "Neuroempata", "Neuroreaktor"], [4.2, 3.1, 1.7], "Profil", "light", (10, 8), 5, 0.4)
+        first = _render_radar_svg(*args)
+        self.assertEqual(first, _render_radar_svg(*args))
+        self.assertTrue(first.startswith("<svg "))
+        self.assertEqual(first.count("<circle"), 5)
+        self.assertEqual(first.count("<polygon"), 1)
+
+    def test_labels_escaped(self):
+        """Sprawdza, czy etykiety są bezpiecznie wstawiane do SVG."""
+        svg = _render_radar_svg(["<b>A&B</b>", "C", "D"], [1, 2, 3], "Profil", "dark", (4, 4), 5, 0.4)
+        self.assertIn("&lt;b&gt;A&amp;B&lt;/b&gt;", svg)
+        self.assertNotIn("<b>", svg)
+
+    def test_without_matplotlib(self):
+        """Sprawdza, czy renderowanie wykresu nie importuje matplotlib."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = (
+            "import sys; from utils.charts import radar_chart_svg; "
+            "radar_chart_svg(['A', 'B', 'C'], [1, 2, 3], 'Profil'); "
+            "print('matplotlib' in sys.modules)"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "False")
+
+
+class TestManagedFigure(unittest.TestCase):
+    """Testy zarządzania figurami matplotlib."""
+
+    def test_figures_released(self):
+        """Sprawdza, czy figury są zwalniane po renderowaniu i nie trafiają do pyplot."""
+        import matplotlib.pyplot as plt
+
+        before = len(plt.get_fignums())
+        for i in range(5):
+            with managed_figure((3, 3), polar=True) as (fig, ax):
+                ax.plot([0, 1, 2], [i, 2, 3])
+                self.assertTrue(figure_to_png(fig).startswith(b"\x89PNG"))
+        self.assertEqual(live_figure_count(), 0)
+        self.assertEqual(len(plt.get_fignums()), before)
+
+    def test_counter_during_rendering(self):
+        """Sprawdza licznik figur w trakcie i po renderowaniu (także po błędzie)."""
+        with self.assertRaises(RuntimeError):
+            with managed_figure((2, 2)) as (fig, ax):
+                self.assertEqual(live_figure_count(), 1)
+                raise RuntimeError("błąd renderowania")
+        self.assertEqual(live_figure_count(), 0)
+
+    def test_type_brain_image(self):
+        """Sprawdza, czy generator obrazów typów zwalnia figury po zapisie pliku."""
+        import matplotlib.pyplot as plt
+        from utils.create_images import create_type_brain_image
+
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        before = len(plt.get_fignums())
+        path = create_type_brain_image("neuroempata", {}, output_dir)
+
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(live_figure_count(), 0)
+        self.assertEqual(len(plt.get_fignums()), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+"""
+Testy skompilowanego modelu struktury kursu.
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data.content_repository import get_course_structure
+from modules.learning.course_model import CourseModel, get_course_model
+from modules.learning.progress import CourseProgress, ProgressAggregator
+from utils.helpers import get_course_progress, get_lesson_status
+
+
+STRUCTURE = [
+    {
+        "title": "Blok A",
+        "emoji": "🔥",
+        "modules": [
+            {"title": "Moduł 1", "lessons": [{"title": "Wstęp"}, {"title": "Mózg lidera", "completed": True}]},
+            {"title": "Moduł 2", "lessons": [{"title": "Wstęp"}]},
+        ],
+    },
+    {"title": "Blok B", "modules": [{"title": "Moduł 3", "lessons": [{"title": "Emocje"}]}]},
+]
+
+
+class TestCourseModel(unittest.TestCase):
+    """Testy identyfikatorów, indeksów i pozycji lekcji."""
+
+    def setUp(self):
+        self.model = CourseModel(STRUCTURE)
+
+    def test_ids_and_parents(self):
+        """Sprawdza identyfikatory lekcji i wskaźniki na moduł i blok."""
+        self.assertEqual([lesson.id for lesson in self.model.lessons], ["1.1.1", "1.1.2", "1.2.1", "2.1.1"])
+        lesson = self.model.get("1.2.1")
+        self.assertEqual(lesson.module.title, "Moduł 2")
+        self.assertIs(lesson.block, self.model.blocks[0])
+        self.assertIs(self.model.modules_by_id["1.2"], lesson.module)
+        self.assertTrue(self.model.get("1.1.2").completed)
+        self.assertIsNone(self.model.get("9.9.9"))
+
+    def test_slugs_and_titles(self):
+        """Sprawdza unikalne slugi i indeks tytułów."""
+        self.assertEqual(self.model.by_slug["wstep"].id, "1.1.1")
+        self.assertEqual(self.model.by_slug["wstep-2"].id, "1.2.1")
+        self.assertEqual(self.model.by_title["Mózg lidera"].slug, "mozg-lidera")
+
+    def test_ordinals(self):
+        """Sprawdza pozycje lekcji i przechodzenie do następnej lekcji."""
+        last = self.model.get("2.1.1")
+        self.assertEqual((last.ordinal, last.module.ordinal), (3, 2))
+        self.assertIs(self.model.next_lesson(self.model.get("1.2.1")), last)
+        self.assertIsNone(self.model.next_lesson(last))
+        self.assertIsNone(self.model.previous_lesson(self.model.lessons[0]))
+
+    def test_duplicate_ids(self):
+        """Sprawdza, czy powtórzony identyfikator lekcji jest zgłaszany."""
+        structure = [{"modules": [{"lessons": [{"title": "A", "id": "x"}, {"title": "B", "id": "x"}]}]}]
+        with self.assertRaises(ValueError):
+            CourseModel(structure)
+
+    def test_explicit_ids(self):
+        """Sprawdza, czy własne identyfikatory nie zmieniają się po wstawieniu lekcji i nie mieszają się z pozycyjnymi."""
+        lessons = [{"title": "A", "id": "a"}, {"title": "B", "id": "b"}]
+        structure = [{"modules": [{"lessons": lessons}]}]
+        self.assertEqual(CourseModel(structure).get("b").title, "B")
+        lessons.insert(0, {"title": "Nowa", "id": "nowa"})
+        self.assertEqual(CourseModel(structure).get("b").title, "B")
+
+        lessons.append({"title": "Bez id"})
+        with self.assertRaises(ValueError):
+            CourseModel(structure)
+
+    def test_course_content(self):
+        """Sprawdza model zbudowany z course_structure.json."""
+        model = get_course_model()
+        self.assertIs(get_course_model(), model)
+        self.assertEqual(len(model), sum(
+            len(module["lessons"]) for block in get_course_structure() for module in block["modules"]
+        ))
+        self.assertEqual(len(model.by_slug), len(model))
+        # Ukończone lekcje zapisane przez użytkowników wskazują na stałe identyfikatory z treści
+        self.assertTrue(all("id" in lesson.data for lesson in model.lessons))
+
+
+class TestCourseProgress(unittest.TestCase):
+    """Testy liczników postępu kursu."""
+
+    def setUp(self):
+        self.model = CourseModel(STRUCTURE)
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_counters(self):
+        """Sprawdza liczniki bloków i modułów, z lekcjami ukończonymi w treści kursu."""
+        progress = CourseProgress(self.model, ["1.2.1", "nieznana"])
+        self.assertEqual((progress.completed_count, progress.total), (2, 4))
+        self.assertEqual(progress.block_progress("1"), (2, 3))
+        self.assertEqual(progress.module_progress("1.1"), (1, 2))
+
+        self.assertTrue(progress.add("2.1.1"))
+        self.assertFalse(progress.add("2.1.1"))
+        self.assertEqual(progress.block_progress("2"), (1, 1))
+        self.assertEqual(progress.percentage, 75.0)
+
+    def test_aggregator(self):
+        """Sprawdza ładowanie ukończonych lekcji ze store i ich przyrostowe zliczanie."""
+        from core.data.user_store import UserStore
+
+        store = UserStore(os.path.join(self.data_dir, "users"), legacy_file=None)
+        model = get_course_model()
+        first, second = model.lessons[1], model.lessons[2]
+        store.mark_lesson_completed("anna", first.id)
+
+        aggregator = ProgressAggregator(store)
+        progress = aggregator.get("anna")
+        self.assertTrue(progress.is_completed(first.id))
+        before = progress.completed_count
+
+        self.assertTrue(aggregator.complete_lesson("anna", second.id))
+        self.assertFalse(aggregator.complete_lesson("anna", second.id))
+        self.assertIs(aggregator.get("anna"), progress)
+        self.assertEqual(progress.completed_count, before + 1)
+        self.assertEqual(store.get_completed_lessons("anna"), [first.id, second.id])
+
+    def test_completions_of_users_are_independent(self):
+        """Sprawdza, czy ukończenie lekcji nie czeka na zapis innego użytkownika."""
+        from core.data.user_store import UserStore
+
+        started, release = threading.Event(), threading.Event()
+
+        class SlowStore(UserStore):
+            def mark_lesson_completed(self, user_id, lesson_id):
+                if user_id == "piotr":
+                    started.set()
+                    release.wait(5)
+                return super().mark_lesson_completed(user_id, lesson_id)
+
+        aggregator = ProgressAggregator(SlowStore(os.path.join(self.data_dir, "users"), legacy_file=None))
+        lesson_id = get_course_model().lessons[1].id
+        writer = threading.Thread(target=aggregator.complete_lesson, args=("piotr", lesson_id))
+        writer.start()
+        try:
+            self.assertTrue(started.wait(5))
+            done = threading.Event()
+            other = threading.Thread(target=lambda: (aggregator.complete_lesson("anna", lesson_id), done.set()))
+            other.start()
+            self.assertTrue(done.wait(5))
+        finally:
+            release.set()
+            writer.join()
+        self.assertTrue(aggregator.get("piotr").is_completed(lesson_id))
+
+    def test_helpers_summary(self):
+        """Sprawdza, czy get_course_progress liczy postęp względem struktury kursu."""
+        model = get_course_model()
+        summary = get_course_progress({"completed_lessons": [model.lessons[-1].id]})
+        self.assertEqual(summary["total_lessons"], len(model))
+        self.assertEqual(summary["modules_completion"][model.lessons[-1].module.id], 1)
+
+
+def _structure_with_prerequisites(prerequisites):
+    """Struktura z jednym modułem i lekcjami o podanych wymaganiach (id -> lista id)."""
+    lessons = [{"title": lesson_id, "id": lesson_id, "prerequisites": required}
+               for lesson_id, required in prerequisites.items()]
+    return [{"title": "Blok", "modules": [{"title": "Moduł", "lessons": lessons}]}]
+
+
+class TestPrerequisites(unittest.TestCase):
+    """Testy grafu wymagań wstępnych lekcji."""
+
+    def test_statuses(self):
+        """Sprawdza odblokowywanie lekcji po ukończeniu wszystkich wymagań."""
+        model = CourseModel(_structure_with_prerequisites({"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}))
+        progress = CourseProgress(model)
+        self.assertEqual([progress.status(i) for i in "abcd"], ["available", "locked", "locked", "locked"])
+
+        progress.add("a")
+        progress.add("b")
+        self.assertEqual([progress.status(i) for i in "abcd"], ["completed", "completed", "available", "locked"])
+        progress.add("c")
+        self.assertEqual(progress.status("d"), "available")
+        self.assertEqual(progress.available_mask, 1 << 3)
+
+    def test_topological_order(self):
+        """Sprawdza, czy każda lekcja występuje po swoich wymaganiach."""
+        model = CourseModel(_structure_with_prerequisites({"d": ["b", "c"], "b": ["a"], "c": ["a"], "a": []}))
+        position = {model.lessons[ordinal].id: i for i, ordinal in enumerate(model.prerequisites.order)}
+        self.assertLess(position["a"], position["b"])
+        self.assertLess(position["c"], position["d"])
+
+    def test_invalid_prerequisites(self):
+        """Sprawdza wykrywanie cykli i nieznanych lekcji przy wczytaniu kursu."""
+        with self.assertRaises(ValueError):
+            CourseModel(_structure_with_prerequisites({"a": ["c"], "b": ["a"], "c": ["b"]}))
+        with self.assertRaises(ValueError):
+            CourseModel(_structure_with_prerequisites({"a": ["x"]}))
+
+    def test_incremental_matches_full(self):
+        """Sprawdza, czy przyrostowa aktualizacja daje ten sam wynik co pełne przeliczenie."""
+        rng = random.Random(11)
+        ids = [f"l{i}" for i in range(40)]
+        model = CourseModel(_structure_with_prerequisites(
+            {lesson_id: rng.sample(ids[:i], min(i, rng.randint(0, 3))) for i, lesson_id in enumerate(ids)}
+        ))
+        progress = CourseProgress(model)
+        for lesson_id in rng.sample(ids, 25):
+            progress.add(lesson_id)
+            self.assertEqual(progress.unlocked_mask, model.prerequisites.unlocked(progress.completed_mask))
+
+    def test_lesson_status_helper(self):
+        """Sprawdza get_lesson_status dla lekcji kursu i lekcji spoza struktury."""
+        lesson = get_course_model().lessons[1]
+        self.assertEqual(get_lesson_status({"completed_lessons": [lesson.id]}, lesson.id), "completed")
+        self.assertEqual(get_lesson_status({}, lesson.id), "available")
+        user_data = {"completed_lessons": [], "prerequisites": {"x": ["y"]}}
+        self.assertEqual(get_lesson_status(user_data, "x"), "locked")
+        # Wymagania z danych użytkownika obowiązują także lekcje kursu
+        user_data = {"completed_lessons": [], "prerequisites": {lesson.id: ["y"]}}
+        self.assertEqual(get_lesson_status(user_data, lesson.id), "locked")
+        user_data["completed_lessons"].append("y")
+        self.assertEqual(get_lesson_status(user_data, lesson.id), "available")
+
+        # Postęp zbudowany raz dla całego drzewa lekcji
+        progress = CourseProgress(get_course_model(), [lesson.id])
+        statuses = [get_lesson_status({}, item.id, progress) for item in get_course_model().lessons[:3]]
+        self.assertEqual(statuses[1], "completed")
+        self.assertEqual(statuses, [progress.status(item.id) for item in get_course_model().lessons[:3]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,438 @@
+"""
+Testy warstwy danych (core/data) aplikacji BrainVenture.
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import multiprocessing
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data.content_repository import ContentRepository
+from core.data.user_store import UserStore, ConcurrentUpdateError
+from core.data.sqlite_store import SQLiteUserStore
+from core.data.history_log import HistoryLog
+from core.data.write_behind import WriteBehindQueue, WriteBehindStore
+
+
+class TestContentRepository(unittest.TestCase):
+    """Testy współdzielonego repozytorium treści."""
+
+    def setUp(self):
+        self.content_dir = tempfile.mkdtemp()
+        self.repository = ContentRepository(self.content_dir, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.content_dir, ignore_errors=True)
+
+    def _write(self, name, data):
+        with open(os.path.join(self.content_dir, name), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_file_parsed_once(self):
+        """Sprawdza, czy kolejne odczyty zwracają ten sam, współdzielony obiekt."""
+        self._write("types.json", [{"id": "neuroanalityk"}])
+        first = self.repository.get_json("types.json")
+        second = self.repository.get_json("types.json")
+        self.assertIs(first, second)
+
+    def test_reload_after_change(self):
+        """Sprawdza, czy zmiana pliku na dysku powoduje ponowne wczytanie."""
+        self._write("types.json", [{"id": "neuroanalityk"}])
+        first = self.repository.get_json("types.json")
+
+        self._write("types.json", [{"id": "neuroanalityk"}, {"id": "neuroempata"}])
+        path = os.path.join(self.content_dir, "types.json")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = self.repository.get_json("types.json")
+        self.assertIsNot(first, second)
+        self.assertEqual(len(second), 2)
+
+    def test_missing_file_raises(self):
+        """Sprawdza, czy brak pliku jest zgłaszany wyjątkiem."""
+        with self.assertRaises(FileNotFoundError):
+            self.repository.get_json("missing.json")
+
+
+def _save_results_in_process(users_dir, count):
+    """Zapisuje wyniki testów z osobnego procesu (test współbieżności)."""
+    store = UserStore(users_dir, legacy_file=None)
+    for i in range(count):
+        store.add_test_result("anna", {"n": i, "pid": os.getpid()})
+        store.update_user("anna", {"last_pid": os.getpid()})
+
+
+class TestHistoryLog(unittest.TestCase):
+    """Testy dziennika historii testów (tylko dopisywanie)."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.log = HistoryLog(os.path.join(self.data_dir, "tests"))
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_append_and_read(self):
+        """Sprawdza dopisywanie wpisów i odczyt od najnowszego."""
+        for i in range(5):
+            self.log.append({"n": i})
+
+        self.assertEqual(self.log.count(), 5)
+        self.assertEqual(self.log.latest(), {"n": 4})
+        self.assertEqual([e["n"] for e in self.log.read_newest()], [4, 3, 2, 1, 0])
+        self.assertEqual([e["n"] for e in self.log.read_newest(2, skip=1)], [3, 2])
+
+    def test_repair_after_interrupted_write(self):
+        """Sprawdza odtworzenie indeksu i usunięcie niepełnego wpisu po przerwanym zapisie."""
+        self.log.append({"n": 0})
+        with open(self.log.log_path, "ab") as f:
+            f.write(b'{"n":1}\n{"n":')
+
+        self.log.repair()
+        self.assertEqual(self.log.count(), 2)
+        self.assertEqual(self.log.latest(), {"n": 1})
+        self.log.append({"n": 2})
+        self.assertEqual([e["n"] for e in self.log.read_newest()], [2, 1, 0])
+
+    def test_compact(self):
+        """Sprawdza kompaktowanie z limitem liczby wpisów."""
+        self.log.extend({"n": i} for i in range(10))
+        self.log.compact(max_entries=3)
+
+        self.assertEqual(self.log.count(), 3)
+        self.assertEqual([e["n"] for e in self.log.read_newest()], [9, 8, 7])
+
+
+class UserStoreContract:
+    """Testy wspólne dla wszystkich implementacji magazynu danych użytkowników."""
+
+    def create_store(self, data_dir, legacy_file):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.legacy_file = os.path.join(self.data_dir, "user_data.json")
+        self.store = self.create_store(self.data_dir, self.legacy_file)
+
+    def tearDown(self):
+        close = getattr(self.store, "close", None)
+        if close:
+            close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_users_are_stored_separately(self):
+        """Sprawdza, czy zapis danych jednego użytkownika nie zmienia danych innego."""
+        self.store.update_user("anna", {"name": "Anna"})
+        self.store.update_user("piotr", {"name": "Piotr"})
+        self.store.add_test_result("anna", {"dominant_type": "neuroempata"})
+
+        self.assertEqual(self.store.get_user("anna")["name"], "Anna")
+        self.assertEqual(self.store.get_user("piotr")["name"], "Piotr")
+        self.assertEqual(self.store.count_test_results("anna"), 1)
+        self.assertEqual(self.store.count_test_results("piotr"), 0)
+
+    def test_history_newest_first(self):
+        """Sprawdza, czy najnowszy wynik jest na początku historii."""
+        self.store.add_test_result("anna", {"dominant_type": "neuroempata"})
+        self.store.add_test_result("anna", {"dominant_type": "neuroanalityk"})
+
+        history = self.store.get_test_history("anna")
+        self.assertEqual([r["dominant_type"] for r in history], ["neuroanalityk", "neuroempata"])
+        self.assertEqual(self.store.get_latest_test_result("anna")["dominant_type"], "neuroanalityk")
+        self.assertEqual(
+            [r["dominant_type"] for r in self.store.get_test_history("anna", limit=1, skip=1)], ["neuroempata"]
+        )
+
+    def test_legacy_data_import(self):
+        """Sprawdza import wspólnego pliku user_data.json dla domyślnego użytkownika."""
+        with open(self.legacy_file, "w", encoding="utf-8") as f:
+            json.dump({"name": "Jan Kowalski", "neuroleader_tests": [{"dominant_type": "neuroreaktor"}]}, f)
+
+        self.assertEqual(self.store.get_user("user")["name"], "Jan Kowalski")
+        self.assertNotIn("neuroleader_tests", self.store.get_user("user"))
+        self.assertEqual(self.store.get_latest_test_result("user")["dominant_type"], "neuroreaktor")
+
+    def test_legacy_import_before_progress_write(self):
+        """Sprawdza import starych danych, gdy pierwszym zapisem jest ukończenie lekcji lub odznaka."""
+        with open(self.legacy_file, "w", encoding="utf-8") as f:
+            json.dump({"name": "Jan Kowalski", "neuroleader_tests": [{"dominant_type": "neuroreaktor"}]}, f)
+
+        self.assertTrue(self.store.mark_lesson_completed("user", "1.1.1"))
+        self.assertTrue(self.store.award_badge("user", "pierwsza_lekcja"))
+        self.assertEqual(self.store.get_user("user")["name"], "Jan Kowalski")
+        self.assertEqual(self.store.get_latest_test_result("user")["dominant_type"], "neuroreaktor")
+        self.assertEqual(self.store.get_completed_lessons("user"), ["1.1.1"])
+
+    def test_optimistic_version_check(self):
+        """Sprawdza wykrywanie równoległej zmiany profilu."""
+        record = self.store.update_user("anna", {"name": "Anna"})
+        version = record["_version"]
+
+        self.store.update_user("anna", {"name": "Anna Nowak"}, expected_version=version)
+        with self.assertRaises(ConcurrentUpdateError):
+            self.store.update_user("anna", {"name": "Anna Kowalska"}, expected_version=version)
+        self.assertEqual(self.store.get_user("anna")["name"], "Anna Nowak")
+
+    def test_all_test_scores(self):
+        """Sprawdza odczyt wyników wszystkich użytkowników z kohortą."""
+        self.store.add_test_result("anna", {"scores": {"neuroempata": 4.0, "neuroreaktor": 2.5}, "cohort": "firma_a"})
+        self.store.add_test_result("piotr", {"scores": {"neuroempata": 2.0}})
+
+        self.assertEqual(sorted(self.store.get_all_test_scores(), key=lambda item: len(item[0])), [
+            ({"neuroempata": 2.0}, None),
+            ({"neuroempata": 4.0, "neuroreaktor": 2.5}, "firma_a"),
+        ])
+
+    def test_list_users(self):
+        """Sprawdza listę użytkowników z zapisanymi danymi."""
+        self.assertEqual(self.store.list_users(), [])
+        self.store.update_user("piotr", {"name": "Piotr"})
+        self.store.add_test_result("anna", {"dominant_type": "neuroempata"})
+        self.assertEqual(self.store.list_users(), ["anna", "piotr"])
+        self.assertEqual(self.store.count_test_results(self.store.list_users()[0]), 1)
+
+    def test_lessons_and_badges(self):
+        """Sprawdza zapis ukończonych lekcji i przyznanych odznak."""
+        self.assertTrue(self.store.mark_lesson_completed("anna", "1.1.1"))
+        self.assertFalse(self.store.mark_lesson_completed("anna", "1.1.1"))
+        self.store.mark_lesson_completed("anna", "1.1.2")
+        self.assertEqual(self.store.get_completed_lessons("anna"), ["1.1.1", "1.1.2"])
+
+        self.assertTrue(self.store.award_badge("anna", "first_lesson"))
+        self.assertFalse(self.store.award_badge("anna", "first_lesson"))
+        self.assertEqual([b["badge_id"] for b in self.store.get_badges("anna")], ["first_lesson"])
+
+
+class TestUserStore(UserStoreContract, unittest.TestCase):
+    """Testy magazynu danych użytkowników opartego na plikach JSON."""
+
+    def create_store(self, data_dir, legacy_file):
+        return UserStore(os.path.join(data_dir, "users"), legacy_file=legacy_file)
+
+    def test_unsafe_user_id(self):
+        """Sprawdza, czy ID użytkownika nie może wskazać katalogu spoza magazynu."""
+        self.store.update_user("../anna", {"name": "Anna"})
+        self.assertEqual(os.listdir(self.data_dir), ["users"])
+        self.assertEqual(self.store.get_user("../anna")["name"], "Anna")
+        self.assertEqual(self.store.get_user(self.store.list_users()[0])["name"], "Anna")
+
+    def test_history_read_waits_for_compaction(self):
+        """Sprawdza, czy odczyt historii czeka na blokadę zapisu (kompaktowanie podmienia pliki)."""
+        self.store.add_test_result("anna", {"n": 1})
+        done = threading.Event()
+        with self.store._lock("anna"):
+            reader = threading.Thread(target=lambda: (self.store.get_latest_test_result("anna"), done.set()))
+            reader.start()
+            self.assertFalse(done.wait(0.2))
+        self.assertTrue(done.wait(5))
+        reader.join()
+
+    def test_concurrent_processes(self):
+        """Sprawdza, czy równoległe zapisy z kilku procesów nie gubią wyników."""
+        users_dir = os.path.join(self.data_dir, "users")
+        processes = [
+            multiprocessing.Process(target=_save_results_in_process, args=(users_dir, 20))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        self.assertEqual(self.store.count_test_results("anna"), 80)
+        self.assertEqual(len(self.store.get_test_history("anna")), 80)
+        self.assertEqual(self.store.get_user("anna")["_version"], 80)
+
+
+class TestSQLiteUserStore(UserStoreContract, unittest.TestCase):
+    """Testy magazynu danych użytkowników opartego na SQLite."""
+
+    def create_store(self, data_dir, legacy_file):
+        return SQLiteUserStore(os.path.join(data_dir, "brainventure.db"), legacy_file=legacy_file)
+
+    def test_wal_journal(self):
+        """Sprawdza, czy baza działa w trybie WAL."""
+        mode = self.store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_latest_result_uses_index(self):
+        """Sprawdza, czy odczyt najnowszego wyniku korzysta z indeksu (user_id, date)."""
+        plan = self.store._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT result FROM test_runs WHERE user_id = ? "
+            "ORDER BY date DESC, id DESC LIMIT 1", ("anna",)
+        ).fetchall()
+        self.assertIn("idx_test_runs_user_date", " ".join(row["detail"] for row in plan))
+
+
+class _FailingOnceStore(UserStore):
+    """Magazyn, którego pierwszy zapis każdego rodzaju kończy się błędem."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failed = set()
+
+    def _fail_once(self, name):
+        if name not in self.failed:
+            self.failed.add(name)
+            raise OSError(f"{name} failed")
+
+    def update_user(self, user_id, changes, expected_version=None):
+        self._fail_once("update_user")
+        return super().update_user(user_id, changes, expected_version=expected_version)
+
+    def add_test_results(self, user_id, results):
+        self._fail_once("add_test_results")
+        super().add_test_results(user_id, results)
+
+    def mark_lesson_completed(self, user_id, lesson_id):
+        self._fail_once("mark_lesson_completed")
+        return super().mark_lesson_completed(user_id, lesson_id)
+
+
+class TestWriteBehindStore(unittest.TestCase):
+    """Testy kolejki zapisów w tle."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.backend = UserStore(self.data_dir, legacy_file=None)
+        # Długi interwał: w testach zapisy są wykonywane tylko przez flush()
+        self.queue = WriteBehindQueue(flush_interval=60, max_pending=100)
+        self.store = WriteBehindStore(self.backend, self.queue)
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_writes_are_coalesced(self):
+        """Sprawdza, czy zmiany profilu i wyniki testów są zapisywane jednym zapisem."""
+        self.store.update_user("anna", {"name": "Anna"})
+        self.store.update_user("anna", {"email": "anna@example.com"})
+        self.store.add_test_result("anna", {"n": 1})
+        self.store.add_test_result("anna", {"n": 2})
+        self.assertEqual(self.queue.pending_count(), 2)
+        self.assertEqual(self.backend.count_test_results("anna"), 0)
+
+        self.queue.flush()
+        record = self.backend.get_user("anna")
+        self.assertEqual((record["name"], record["email"], record["_version"]), ("Anna", "anna@example.com", 1))
+        self.assertEqual([r["n"] for r in self.backend.get_test_history("anna")], [2, 1])
+
+    def test_reads_see_own_writes(self):
+        """Sprawdza, czy odczyt danych użytkownika uwzględnia jego zapisy z kolejki."""
+        self.store.add_test_result("anna", {"n": 1})
+        self.store.add_test_result("piotr", {"n": 1})
+        self.assertTrue(self.store.mark_lesson_completed("anna", "1.1.1"))
+        self.assertFalse(self.store.mark_lesson_completed("anna", "1.1.1"))
+
+        self.assertEqual(self.store.get_latest_test_result("anna")["n"], 1)
+        self.assertEqual(self.store.get_completed_lessons("anna"), ["1.1.1"])
+        # Odczyt nie zapisuje kolejki, dane nadal czekają na zapis w tle
+        self.assertEqual(self.queue.pending_count(), 3)
+        self.assertEqual(self.backend.count_test_results("anna"), 0)
+
+    def test_reads_merge_stored_and_queued_data(self):
+        """Sprawdza odczyt historii i profilu złożonych z danych zapisanych i zakolejkowanych."""
+        self.backend.add_test_results("anna", [{"n": 1}, {"n": 2}])
+        self.backend.update_user("anna", {"name": "Anna", "email": "anna@example.com"})
+        self.store.add_test_results("anna", [{"n": 3}, {"n": 4}])
+        self.store.update_user("anna", {"name": "Anna Nowak"})
+
+        self.assertEqual(self.store.count_test_results("anna"), 4)
+        self.assertEqual([r["n"] for r in self.store.get_test_history("anna")], [4, 3, 2, 1])
+        for limit, skip in [(1, 0), (3, 0), (2, 1), (2, 3), (None, 2), (1, 5)]:
+            with self.subTest(limit=limit, skip=skip):
+                history = [r["n"] for r in self.store.get_test_history("anna", limit=limit, skip=skip)]
+                expected = [4, 3, 2, 1][skip:]
+                self.assertEqual(history, expected if limit is None else expected[:limit])
+        record = self.store.get_user("anna")
+        self.assertEqual((record["name"], record["email"]), ("Anna Nowak", "anna@example.com"))
+
+        self.queue.flush()
+        self.assertEqual([r["n"] for r in self.store.get_test_history("anna")], [4, 3, 2, 1])
+        self.assertEqual(self.store.get_user("anna")["name"], "Anna Nowak")
+
+    def test_update_returns_record(self):
+        """Sprawdza, czy zakolejkowana zmiana profilu zwraca zaktualizowany rekord."""
+        self.backend.update_user("anna", {"name": "Anna", "email": "anna@example.com"})
+        record = self.store.update_user("anna", {"name": "Anna Nowak"})
+        self.assertEqual((record["name"], record["email"], record["_version"]), ("Anna Nowak", "anna@example.com", 2))
+        self.assertEqual(self.store.get_user("anna")["_version"], 2)
+
+        # Wersja odczytana przed zapisem kolejki jest zgodna z wersją po zapisie
+        record = self.store.update_user("anna", {"email": "anna@nowak.pl"}, expected_version=2)
+        self.assertEqual(record["_version"], 3)
+
+    def test_failed_write_is_retried(self):
+        """Sprawdza, czy dane zapisu zakończonego błędem są zapisywane przy kolejnej próbie."""
+        store = WriteBehindStore(_FailingOnceStore(self.data_dir, legacy_file=None), self.queue)
+        store.update_user("anna", {"name": "Anna"})
+        store.add_test_result("anna", {"n": 1})
+        store.mark_lesson_completed("anna", "1.1.1")
+        self.queue.flush()
+        self.assertEqual(self.queue.pending_count(), 3)
+        # Nowsze zapisy dołączają do danych czekających na ponowienie
+        store.update_user("anna", {"email": "anna@example.com"})
+        store.add_test_result("anna", {"n": 2})
+        store.mark_lesson_completed("anna", "1.1.2")
+        self.queue.flush()
+
+        self.assertEqual(self.queue.pending_count(), 0)
+        record = self.backend.get_user("anna")
+        self.assertEqual((record["name"], record["email"]), ("Anna", "anna@example.com"))
+        self.assertEqual([r["n"] for r in self.backend.get_test_history("anna")], [2, 1])
+        self.assertEqual(self.backend.get_completed_lessons("anna"), ["1.1.1", "1.1.2"])
+
+    def test_read_does_not_wait_for_other_users(self):
+        """Sprawdza, czy odczyt danych użytkownika nie czeka na zapisy innego użytkownika."""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_write():
+            started.set()
+            release.wait(5)
+
+        self.queue.submit("user:piotr", slow_write)
+        writer = threading.Thread(target=self.queue.flush)
+        writer.start()
+        try:
+            self.assertTrue(started.wait(5))
+            done = threading.Event()
+            reader = threading.Thread(target=lambda: (self.store.get_user("anna"), done.set()))
+            reader.start()
+            self.assertTrue(done.wait(5))
+        finally:
+            release.set()
+            writer.join()
+
+    def test_background_flush_and_close(self):
+        """Sprawdza zapis w tle oraz zapis zaległych danych przy zamknięciu."""
+        queue = WriteBehindQueue(flush_interval=0.01)
+        written = threading.Event()
+        queue.submit("anna", written.set)
+        self.assertTrue(written.wait(5))
+
+        queue.flush_interval = 60
+        results = []
+        queue.submit("anna", lambda: results.append(1))
+        queue.close()
+        self.assertEqual(results, [1])
+
+    def test_bounded_queue(self):
+        """Sprawdza, czy przepełniona kolejka czeka na zapis zamiast rosnąć."""
+        queue = WriteBehindQueue(flush_interval=0.01, max_pending=5)
+        results = []
+        for i in range(50):
+            queue.submit("anna", lambda i=i: results.append(i))
+            self.assertLessEqual(queue.pending_count(), 5)
+        queue.close()
+        self.assertEqual(results, list(range(50)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Testy strumienia zdarzeń aktywności użytkowników.
+"""
+import os
+import sys
+import glob
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analytics.events import EventStream, SCHEMAS_FILE, emit, read_events, register_event, validate_event
+
+
+class TestEventSchemas(unittest.TestCase):
+    """Testy rejestru schematów zdarzeń."""
+
+    def test_validation(self):
+        """Sprawdza odrzucanie nieznanych typów, brakujących pól i błędnych typów pól."""
+        validate_event("quiz_submitted", {"lesson_id": "1.1.1", "score": 2, "max_score": 2})
+        validate_event("typology_test_completed", {"dominant_type": "a", "secondary_type": None, "scores": {}})
+        invalid = [
+            ("nieznane_zdarzenie", {}),
+            ("lesson_completed", {}),
+            ("lesson_completed", {"lesson_id": "1.1.1", "extra": 1}),
+            ("quiz_submitted", {"lesson_id": "1.1.1", "score": "2", "max_score": 2}),
+            ("quiz_submitted", {"lesson_id": "1.1.1", "score": True, "max_score": 2}),
+        ]
+        for event_type, payload in invalid:
+            with self.subTest(event_type=event_type, payload=payload):
+                with self.assertRaises(ValueError):
+                    validate_event(event_type, payload)
+
+    def test_conflicting_registration(self):
+        """Sprawdza, czy typ nie może zostać zarejestrowany z innym schematem."""
+        register_event("page_view", {"page": str})
+        with self.assertRaises(ValueError):
+            register_event("page_view", {"page": int})
+
+
+class TestEventStream(unittest.TestCase):
+    """Testy zapisu segmentów JSONL i ich odczytu."""
+
+    def setUp(self):
+        self.events_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.events_dir, ignore_errors=True)
+
+    def _segments(self):
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.events_dir, "events-*")))
+
+    def test_write_and_read(self):
+        """Sprawdza zapis zdarzeń, plik schematów i filtrowanie przy odczycie."""
+        stream = EventStream(self.events_dir, compress=False)
+        stream.emit("page_view", "anna", page="Dashboard")
+        stream.emit("lesson_completed", "anna", lesson_id="1.1.1")
+        stream.flush()
+
+        events = list(read_events(self.events_dir))
+        self.assertEqual([event["type"] for event in events], ["page_view", "lesson_completed"])
+        self.assertEqual(events[0]["user"], "anna")
+        self.assertEqual(events[0]["data"], {"page": "Dashboard"})
+        self.assertEqual(events[1]["v"], 1)
+        self.assertEqual([e["data"]["lesson_id"] for e in read_events(self.events_dir, "lesson_completed")], ["1.1.1"])
+        self.assertEqual(list(read_events(self.events_dir, since=events[-1]["ts"] + 1)), [])
+
+        with open(os.path.join(self.events_dir, SCHEMAS_FILE), encoding="utf-8") as f:
+            schemas = json.load(f)
+        self.assertEqual(schemas["typology_test_completed"]["fields"]["secondary_type"], ["str", "null"])
+
+    def test_segments_are_compressed(self):
+        """Sprawdza rozpoczynanie nowych segmentów po przekroczeniu rozmiaru i ich kompresję."""
+        stream = EventStream(self.events_dir, segment_max_bytes=200, compress=True)
+        with mock.patch.object(EventStream, "_today", return_value=date(2024, 3, 1)):
+            for i in range(10):
+                stream.emit("lesson_completed", "anna", lesson_id=f"1.1.{i}")
+                stream.flush()
+            stream.close()
+
+        segments = self._segments()
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(name.startswith("events-20240301-") and name.endswith(".jsonl.gz") for name in segments))
+        lessons = [event["data"]["lesson_id"] for event in read_events(self.events_dir)]
+        self.assertEqual(lessons, [f"1.1.{i}" for i in range(10)])
+
+    def test_new_segment_every_day(self):
+        """Sprawdza nowy segment po zmianie dnia i kompresję segmentów z poprzednich dni."""
+        stream = EventStream(self.events_dir, compress=True)
+        with mock.patch.object(EventStream, "_today", return_value=date(2024, 3, 1)) as today:
+            stream.emit("page_view", "anna", page="Dashboard")
+            stream.flush()
+            today.return_value = date(2024, 3, 2)
+            stream.emit("page_view", "anna", page="Profil")
+            stream.flush()
+
+        segments = self._segments()
+        self.assertEqual(len(segments), 2)
+        self.assertTrue(segments[0].startswith("events-20240301-") and segments[0].endswith(".gz"))
+        self.assertTrue(segments[1].startswith("events-20240302-") and segments[1].endswith(".jsonl"))
+        self.assertEqual([e["data"]["page"] for e in read_events(self.events_dir)], ["Dashboard", "Profil"])
+
+
+class TestEmit(unittest.TestCase):
+    """Testy zapisu zdarzeń przez funkcje używane na stronach aplikacji."""
+
+    def setUp(self):
+        self.events_dir = tempfile.mkdtemp()
+        self.stream = EventStream(self.events_dir, compress=False)
+        patches = [
+            mock.patch("core.analytics.events._event_stream", self.stream),
+            mock.patch("core.analytics.events.ANALYTICS_ENABLED", True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.stream.flush()
+        shutil.rmtree(self.events_dir, ignore_errors=True)
+
+    def test_invalid_event_is_dropped(self):
+        """Sprawdza, czy niepoprawne zdarzenie jest pomijane zamiast przerywać stronę."""
+        with self.assertLogs("brainventure", level="WARNING"):
+            emit("quiz_submitted", "anna", lesson_id="1.1.1", score="2", max_score=2)
+        emit("lesson_completed", "anna", lesson_id="1.1.1")
+        self.stream.flush()
+        self.assertEqual([e["type"] for e in read_events(self.events_dir)], ["lesson_completed"])
+
+    def test_log_user_activity(self):
+        """Sprawdza zapis aktywności o zarejestrowanym i niezarejestrowanym typie."""
+        from utils.logger import log_user_activity
+
+        with self.assertLogs("brainventure", level="INFO") as logs:
+            log_user_activity("anna", "lesson_completed", {"lesson_id": "1.1.1"})
+            log_user_activity("anna", "login", {"ip": "127.0.0.1"})
+        self.stream.flush()
+        # Komunikat jest formatowany dopiero przy zapisie rekordu
+        self.assertEqual(logs.records[1].args, ("anna", "login", {"ip": "127.0.0.1"}))
+        self.assertEqual(logs.records[1].getMessage(), "User anna - login - {'ip': '127.0.0.1'}")
+
+        events = list(read_events(self.events_dir))
+        self.assertEqual([e["type"] for e in events], ["lesson_completed", "activity"])
+        self.assertEqual(events[1]["data"], {"action": "login", "details": {"ip": "127.0.0.1"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
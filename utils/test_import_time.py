@@ -0,0 +1,101 @@
+"""
+Testy czasu uruchamiania stron i importu modułów aplikacji BrainVenture.
+
+Każdy pomiar wykonywany jest w osobnym procesie, aby zmierzyć zimny import
+(bez modułów wczytanych wcześniej przez inne testy).
+"""
+import os
+import sys
+import glob
+import json
+import subprocess
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ciężkie biblioteki importowane dopiero przy pierwszym użyciu
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")
+
+# Budżety czasu (sekundy) mierzone po imporcie streamlit
+MODULE_IMPORT_BUDGET = 1.0
+PAGE_RUN_BUDGET = 3.0
+
+# Moduły używane przez strony, które nie mogą importować ciężkich bibliotek
+LIGHT_MODULES = (
+    "utils.neuroleader_types",
+    "utils.helpers",
+    "utils.charts",
+    "utils.navigation",
+    "core.data.user_store",
+    "core.analytics.norms",
+)
+
+_MEASURE_IMPORT = """
+import json, sys, time
+import streamlit
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}}))
+"""
+
+# Strona jest wykonywana jak przy pierwszym wejściu (bez serwera Streamlit);
+# dane użytkowników trafiają do katalogu tymczasowego
+_MEASURE_PAGE = """
+import json, logging, os, runpy, shutil, sys, tempfile, time, traceback
+logging.disable(logging.CRITICAL)
+import streamlit
+import config.app_config as app_config
+data_dir = tempfile.mkdtemp()
+app_config.USERS_DIR = os.path.join(data_dir, "users")
+app_config.SQLITE_DB_FILE = os.path.join(data_dir, "brainventure.db")
+app_config.NORMS_FILE = os.path.join(data_dir, "norms.json")
+app_config.METRICS_FILE = os.path.join(data_dir, "metrics.json")
+app_config.EVENTS_DIR = os.path.join(data_dir, "events")
+app_config.LOGS_DIR = os.path.join(data_dir, "logs")
+error = None
+start = time.perf_counter()
+try:
+    runpy.run_path({page!r}, run_name="__main__")
+except Exception:
+    error = traceback.format_exc()
+seconds = time.perf_counter() - start
+shutil.rmtree(data_dir, ignore_errors=True)
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules), "error": error}}))
+"""
+
+
+def _measure(code):
+    """Uruchamia kod w nowym procesie i zwraca zmierzony czas oraz wczytane moduły."""
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """Testy czasu zimnego importu modułów i uruchomienia stron."""
+
+    def test_modules_import_lazily(self):
+        """Sprawdza, czy moduły aplikacji nie importują ciężkich bibliotek przy imporcie."""
+        for module in LIGHT_MODULES:
+            with self.subTest(module=module):
+                result = _measure(_MEASURE_IMPORT.format(module=module))
+                loaded = [name for name in HEAVY_MODULES if name in result["modules"]]
+                self.assertEqual(loaded, [], f"{module} importuje {loaded}")
+                self.assertLess(result["seconds"], MODULE_IMPORT_BUDGET)
+
+    def test_pages_within_budget(self):
+        """Sprawdza czas pierwszego uruchomienia każdej strony i brak importu matplotlib."""
+        pages = sorted(glob.glob(os.path.join(ROOT_DIR, "pages", "[0-9]*.py")))
+        self.assertGreater(len(pages), 0)
+        for page in pages:
+            with self.subTest(page=os.path.basename(page)):
+                result = _measure(_MEASURE_PAGE.format(page=page))
+                # Strona, która przerwała działanie błędem, nie może zmieścić się w budżecie
+                self.assertIsNone(result["error"], result["error"])
+                self.assertNotIn("matplotlib", result["modules"])
+                self.assertLess(result["seconds"], PAGE_RUN_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Testy kolejkowego logowania i rotacji plików logów.
+"""
+import os
+import sys
+import glob
+import logging
+import logging.handlers
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import logger as logger_module
+from utils.logger import DailyRotatingFileHandler, setup_logger
+
+
+def _record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+class TestLogger(unittest.TestCase):
+    """Testy konfiguracji loggerów i zapisu w wątku tła."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.log_dir, "app.log")
+
+    def tearDown(self):
+        logger_module.shutdown()
+        logger = logging.getLogger("brainventure_test")
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def test_setup_is_idempotent(self):
+        """Sprawdza, czy ponowna konfiguracja loggera nie powiela wpisów."""
+        logger = setup_logger("brainventure_test", log_file=self.log_file)
+        self.assertIs(setup_logger("brainventure_test", log_file=self.log_file), logger)
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertIsInstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+        logger.info("jeden wpis")
+        logger_module.shutdown()
+        with open(glob.glob(os.path.join(self.log_dir, "app_*.log"))[0], encoding="utf-8") as f:
+            self.assertEqual(f.read().count("jeden wpis"), 1)
+
+    def test_setup_after_shutdown(self):
+        """Sprawdza, czy logger zatrzymanego zapisu dostaje nową kolejkę."""
+        logger = setup_logger("brainventure_test", log_file=self.log_file)
+        logger_module.shutdown()
+        setup_logger("brainventure_test", log_file=self.log_file)
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertIs(logger.handlers[0].queue, logger_module._get_listener(self.log_file).queue)
+
+
+class TestDailyRotatingFileHandler(unittest.TestCase):
+    """Testy rotacji plików logów po dniach i po rozmiarze."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.log_dir, "app.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _files(self):
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.log_dir, "*")))
+
+    def test_new_file_every_day(self):
+        """Sprawdza przejście do pliku nowego dnia i usuwanie plików starszych niż okres przechowywania."""
+        with mock.patch.object(DailyRotatingFileHandler, "_today", return_value=date(2024, 3, 1)) as today:
+            handler = DailyRotatingFileHandler(self.log_file, retention_days=2)
+            handler.handle(_record("pierwszy dzień"))
+            today.return_value = date(2024, 3, 2)
+            handler.handle(_record("drugi dzień"))
+            today.return_value = date(2024, 3, 3)
+            handler.handle(_record("trzeci dzień"))
+            handler.close()
+
+        self.assertEqual(self._files(), ["app_20240302.log", "app_20240303.log"])
+        with open(os.path.join(self.log_dir, "app_20240303.log"), encoding="utf-8") as f:
+            self.assertEqual(f.read().strip(), "trzeci dzień")
+
+    def test_rotation_by_size(self):
+        """Sprawdza rotację pliku dnia po przekroczeniu rozmiaru."""
+        with mock.patch.object(DailyRotatingFileHandler, "_today", return_value=date(2024, 3, 1)):
+            handler = DailyRotatingFileHandler(self.log_file, max_bytes=100, backup_count=2)
+            for i in range(20):
+                handler.handle(_record(f"wpis numer {i:02d}"))
+            handler.close()
+
+        self.assertEqual(self._files(), ["app_20240301.log", "app_20240301.log.1", "app_20240301.log.2"])
+        with open(os.path.join(self.log_dir, "app_20240301.log"), encoding="utf-8") as f:
+            self.assertIn("wpis numer 19", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
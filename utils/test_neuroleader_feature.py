@@ -5,18 +5,32 @@ import os
 import sys
 import json
 from datetime import datetime
+import shutil
+import tempfile
 import unittest
 
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.neuroleader_types import NeuroleaderTypes
+from core.data.user_store import UserStore
+from core.analytics.norms import ScoreNorms
+from core.data.write_behind import WriteBehindQueue
 
 class TestNeuroliderFeature(unittest.TestCase):
     """Klasa do testowania funkcjonalności typologii neuroliderów."""
     
     def setUp(self):
-        self.neuroleader_types = NeuroleaderTypes()
+        # Testy zapisują dane w tymczasowym katalogu, aby nie zmieniać danych aplikacji
+        self.users_dir = tempfile.mkdtemp()
+        self.user_store = UserStore(self.users_dir, legacy_file=None)
+        self.queue = WriteBehindQueue(flush_interval=60)
+        self.norms = ScoreNorms(os.path.join(self.users_dir, "norms.json"), write_queue=self.queue)
+        self.neuroleader_types = NeuroleaderTypes(user_store=self.user_store, norms=self.norms)
+        
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.users_dir, ignore_errors=True)
         
     def test_types_data_loaded(self):
         """Sprawdza, czy dane typów neuroliderów zostały poprawnie załadowane."""
@@ -88,14 +102,12 @@ class TestNeuroliderFeature(unittest.TestCase):
             print(f"✅ Zapisano testowe wyniki dla użytkownika {test_user_id}")
             
             # Próba odczytu zapisanych danych
-            user_data_path = os.path.join("data", "content", "user_data.json")
-            with open(user_data_path, "r", encoding="utf-8") as f:
-                user_data = json.load(f)
+            test_history = self.neuroleader_types.get_user_test_history(test_user_id)
             
-            # Sprawdź czy dane testowe są w pliku
-            if "neuroleader_tests" in user_data and len(user_data["neuroleader_tests"]) > 0:
+            # Sprawdź czy dane testowe są w historii użytkownika
+            if len(test_history) > 0:
                 # Sprawdź pierwszy (najnowszy) wpis w historii testów
-                latest_test = user_data["neuroleader_tests"][0]
+                latest_test = test_history[0]
                 self.assertEqual(latest_test["dominant_type"], "neuroanalityk")
                 print("✅ Znaleziono i zweryfikowano dane testów neuroliderów")
             else:
@@ -0,0 +1,307 @@
+"""
+Benchmarki renderowania stron aplikacji BrainVenture (streamlit.testing AppTest).
+
+Każdy scenariusz uruchamiany jest w osobnym procesie: mierzony jest czas
+pierwszego uruchomienia strony (zimny, z importem modułów aplikacji), mediana
+czasu kolejnych przebiegów (ciepły), liczba elementów strony i szczytowe
+zużycie pamięci jednego przebiegu (tracemalloc). Wyniki porównywane są
+z zapisanymi wartościami bazowymi w utils/page_benchmarks.json; pogorszenie
+ponad tolerancję kończy test błędem.
+
+Czasy i pamięć zależą od maszyny, na której zapisano wartości bazowe, dlatego
+domyślnie sprawdzana jest tylko liczba elementów stron. Pełne porównanie:
+
+    BRAINVENTURE_BENCHMARKS=1 python -m pytest utils/test_page_benchmarks.py
+
+Wartości bazowe zapisuje się po świadomej zmianie wydajności:
+
+    BRAINVENTURE_UPDATE_BASELINES=1 python -m pytest utils/test_page_benchmarks.py
+"""
+import os
+import sys
+import glob
+import json
+import random
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to the path
+sys.path.insert(0, ROOT_DIR)
+
+BASELINES_FILE = os.path.join(ROOT_DIR, "utils", "page_benchmarks.json")
+
+# Liczba mierzonych ciepłych przebiegów (wynik to mediana)
+WARM_RUNS = 5
+# Dopuszczalne pogorszenie względem wartości bazowej
+TIME_TOLERANCE = 1.5
+TIME_SLACK_MS = 50.0
+MEMORY_TOLERANCE = 1.25
+# Liczba zapisanych testów typologii w scenariuszu z długą historią
+HISTORY_LENGTH = 50
+
+# Strona jest wykonywana przez AppTest w nowym procesie; dane użytkowników
+# pochodzą z katalogu przygotowanego przez scenariusz
+_MEASURE_SCENARIO = """
+import json, logging, os, sys
+logging.disable(logging.CRITICAL)
+os.environ["BRAINVENTURE_PROFILING"] = "0"
+import streamlit
+import config.app_config as app_config
+app_config.USERS_DIR = os.path.join({data_dir!r}, "users")
+app_config.SQLITE_DB_FILE = os.path.join({data_dir!r}, "brainventure.db")
+app_config.NORMS_FILE = os.path.join({data_dir!r}, "norms.json")
+app_config.METRICS_FILE = os.path.join({data_dir!r}, "metrics.json")
+app_config.EVENTS_DIR = os.path.join({data_dir!r}, "events")
+app_config.LOGS_DIR = os.path.join({data_dir!r}, "logs")
+from utils.test_page_benchmarks import SCENARIOS, measure
+print(json.dumps(measure(SCENARIOS[{name!r}])))
+"""
+
+
+def _count_elements(node):
+    """Zwraca liczbę elementów (liści) w drzewie strony AppTest."""
+    children = getattr(node, "children", None)
+    if children is None:
+        return 1
+    return sum(_count_elements(child) for child in children.values())
+
+
+def _seed_store(data_dir):
+    """Tworzy magazyn danych użytkowników (backend jak w aplikacji) w katalogu scenariusza."""
+    if os.environ.get("BRAINVENTURE_STORAGE_BACKEND") == "sqlite":
+        from core.data.sqlite_store import SQLiteUserStore
+        return SQLiteUserStore(os.path.join(data_dir, "brainventure.db"))
+    from core.data.user_store import UserStore
+    return UserStore(os.path.join(data_dir, "users"))
+
+
+class Scenario:
+    """Strona z przygotowanymi danymi, stanem sesji i interakcjami przed pomiarem."""
+
+    def __init__(self, name, page, seed=None, setup=None, interact=None, rerun=None):
+        """
+        Args:
+            name: Nazwa scenariusza (klucz w pliku wartości bazowych)
+            page: Ścieżka strony względem katalogu projektu
+            seed: Funkcja(data_dir) zapisująca dane użytkownika przed pomiarem
+            setup: Funkcja(at) ustawiająca stan sesji przed pierwszym uruchomieniem
+            interact: Funkcja(at) wykonywana po pierwszym uruchomieniu (bez pomiaru)
+            rerun: Funkcja(at, i) wykonująca i-ty ciepły przebieg (domyślnie at.run())
+        """
+        self.name = name
+        self.page = page
+        self.seed = seed
+        self.setup = setup
+        self.interact = interact
+        self.rerun = rerun or (lambda at, i: at.run())
+
+
+def measure(scenario):
+    """
+    Mierzy scenariusz w bieżącym procesie.
+
+    Returns:
+        dict: cold_ms, warm_ms, elements (maksimum z ciepłych przebiegów) i peak_kb
+    """
+    import time
+    import statistics
+    import tracemalloc
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT_DIR, scenario.page), default_timeout=60)
+    if scenario.setup:
+        scenario.setup(at)
+    start = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - start) * 1000
+    if scenario.interact:
+        scenario.interact(at)
+
+    warm, elements = [], 0
+    for i in range(WARM_RUNS):
+        start = time.perf_counter()
+        scenario.rerun(at, i)
+        warm.append((time.perf_counter() - start) * 1000)
+        elements = max(elements, _count_elements(at.main) + _count_elements(at.sidebar))
+    if at.exception:
+        raise RuntimeError(f"{scenario.page}: {at.exception[0].value}")
+
+    tracemalloc.start()
+    scenario.rerun(at, WARM_RUNS)
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return {
+        "cold_ms": round(cold_ms, 1),
+        "warm_ms": round(statistics.median(warm), 1),
+        "elements": elements,
+        "peak_kb": round(peak_kb, 1),
+    }
+
+
+# Scenariusz: ukończony test typologii i długa historia testów
+
+def _seed_typology_history(data_dir):
+    from config.app_config import DEFAULT_USER_ID
+    from utils.neuroleader_types import NeuroleaderTypes
+
+    store = _seed_store(data_dir)
+    manager = NeuroleaderTypes(user_store=store)
+    rng = random.Random(7)
+    results = []
+    for day in range(HISTORY_LENGTH):
+        answers = {q["id"]: rng.randint(1, 5) for q in manager.get_test_questions()}
+        result = manager.calculate_test_results(answers)
+        result["date"] = f"2024-01-01 {day // 60:02d}:{day % 60:02d}:00"
+        results.append(result)
+    store.add_test_results(DEFAULT_USER_ID, results)
+
+
+def _latest_test_result(at):
+    from config.app_config import DEFAULT_USER_ID
+    from core.data.user_store import get_user_store
+    at.session_state["test_results"] = get_user_store().get_latest_test_result(DEFAULT_USER_ID)
+
+
+def _show_test_history(at):
+    next(c for c in at.checkbox if c.label == "Pokaż historię testów").check().run()
+
+
+# Scenariusz: cała struktura kursu (wszystkie lekcje ukończone, kolejne moduły rozwinięte)
+
+def _seed_completed_course(data_dir):
+    from config.app_config import DEFAULT_USER_ID
+    from modules.learning.course_model import get_course_model
+
+    store = _seed_store(data_dir)
+    for lesson in get_course_model().lessons:
+        store.mark_lesson_completed(DEFAULT_USER_ID, lesson.id)
+
+
+def _expand_next_module(at, i):
+    from modules.learning.course_model import get_course_model
+
+    modules = get_course_model().modules
+    at.session_state["structure_module"] = modules[i % len(modules)].id
+    at.session_state["structure_page"] = 0
+    at.run()
+
+
+# Scenariusz: przełączanie motywów (każdy przebieg z innym motywem i układem)
+
+def _switch_theme(at, i):
+    from utils.theme_provider import COLOR_THEME_CSS, LAYOUT_CSS
+
+    combinations = [(theme, layout) for theme in COLOR_THEME_CSS for layout in LAYOUT_CSS]
+    theme, layout = combinations[(i + 1) % len(combinations)]
+    at.session_state["theme"] = theme
+    at.session_state["layout"] = layout
+    at.run()
+
+
+def _page_scenarios():
+    """Scenariusz pierwszego wejścia na każdą stronę z katalogu pages/."""
+    pages = sorted(glob.glob(os.path.join(ROOT_DIR, "pages", "[0-9]*.py")))
+    return [
+        Scenario(os.path.splitext(os.path.basename(page))[0], os.path.relpath(page, ROOT_DIR))
+        for page in pages
+    ]
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in _page_scenarios() + [
+        Scenario("typology_history", "pages/5_Typy_Neuroliderow.py",
+                 seed=_seed_typology_history, setup=_latest_test_result, interact=_show_test_history),
+        Scenario("course_structure_full", "pages/8_Struktura_Kursu.py",
+                 seed=_seed_completed_course, rerun=_expand_next_module),
+        Scenario("theme_switching", "pages/6_Theme_Tester.py", rerun=_switch_theme),
+    ]
+}
+
+
+def _run_scenario(scenario):
+    """Przygotowuje dane scenariusza i mierzy go w nowym procesie."""
+    data_dir = tempfile.mkdtemp()
+    try:
+        if scenario.seed:
+            scenario.seed(data_dir)
+        output = subprocess.run(
+            [sys.executable, "-c", _MEASURE_SCENARIO.format(name=scenario.name, data_dir=data_dir)],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            raise RuntimeError(output.stderr.strip().splitlines()[-1])
+        return json.loads(output.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def _load_baselines():
+    try:
+        with open(BASELINES_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def regressions(result, baseline, timings=True):
+    """
+    Zwraca opisy pomiarów gorszych od wartości bazowej ponad tolerancję.
+
+    Args:
+        result: Wynik pomiaru scenariusza
+        baseline: Wartości bazowe scenariusza
+        timings: Czy porównywać czasy i pamięć (inaczej tylko liczbę elementów)
+    """
+    limits = {"elements": baseline["elements"]}
+    if timings:
+        limits.update({
+            "cold_ms": baseline["cold_ms"] * TIME_TOLERANCE + TIME_SLACK_MS,
+            "warm_ms": baseline["warm_ms"] * TIME_TOLERANCE + TIME_SLACK_MS,
+            "peak_kb": baseline["peak_kb"] * MEMORY_TOLERANCE,
+        })
+    return [
+        f"{metric}: {result[metric]} > {limit:g} (bazowo {baseline[metric]})"
+        for metric, limit in limits.items()
+        if result[metric] > limit
+    ]
+
+
+class TestPageBenchmarks(unittest.TestCase):
+    """Porównanie czasów, liczby elementów i pamięci stron z wartościami bazowymi."""
+
+    def test_regressions(self):
+        """Sprawdza funkcję porównującą pomiar z wartościami bazowymi."""
+        baseline = {"cold_ms": 1000.0, "warm_ms": 100.0, "elements": 40, "peak_kb": 2000.0}
+        self.assertEqual(regressions(dict(baseline, cold_ms=1500.0), baseline), [])
+        problems = regressions(dict(baseline, warm_ms=300.0, elements=41), baseline)
+        self.assertEqual(sorted(problem.split(":")[0] for problem in problems), ["elements", "warm_ms"])
+        problems = regressions(dict(baseline, warm_ms=300.0, elements=41), baseline, timings=False)
+        self.assertEqual([problem.split(":")[0] for problem in problems], ["elements"])
+
+    def test_pages_against_baselines(self):
+        """Mierzy każdy scenariusz i porównuje wynik z plikiem wartości bazowych."""
+        update = os.environ.get("BRAINVENTURE_UPDATE_BASELINES") == "1"
+        # Czasy i pamięć tylko na żądanie, bo zależą od obciążenia maszyny
+        timings = os.environ.get("BRAINVENTURE_BENCHMARKS") == "1"
+        baselines = _load_baselines()
+        for name, scenario in SCENARIOS.items():
+            with self.subTest(scenario=name):
+                result = _run_scenario(scenario)
+                if update:
+                    baselines[name] = result
+                    continue
+                self.assertIn(name, baselines, "brak wartości bazowych (BRAINVENTURE_UPDATE_BASELINES=1)")
+                self.assertEqual(regressions(result, baselines[name], timings), [], f"{name}: {result}")
+        if update:
+            with open(BASELINES_FILE, "w", encoding="utf-8") as f:
+                json.dump(baselines, f, indent=2, sort_keys=True)
+                f.write("\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Testy pomiarów czasu renderowania stron.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analytics import profiling
+from core.analytics.profiling import Profiler, PAGE_SPAN, NO_PAGE, summarize
+
+
+class TestProfiler(unittest.TestCase):
+    """Testy histogramów czasów i pliku metryk."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.metrics_file = os.path.join(self.data_dir, "metrics.json")
+        self.profiler = Profiler(self.metrics_file, flush_interval=3600)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_percentiles(self):
+        """Sprawdza p50/p95/p99 odczytane z histogramu (dokładność jednego przedziału)."""
+        for ms in range(1, 101):
+            self.profiler.record("Dashboard", "apply_theme", ms / 1000)
+        summary = self.profiler.load()["Dashboard"]["apply_theme"]
+
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["mean_ms"], 50.5)
+        self.assertEqual(summary["max_ms"], 100)
+        for p in (50, 95, 99):
+            self.assertGreaterEqual(summary[f"p{p}_ms"], p)
+            self.assertLessEqual(summary[f"p{p}_ms"], p * 1.13)
+
+    def test_page_spans(self):
+        """Sprawdza przypisanie spanów do strony i pomiar całej strony."""
+        self.profiler.start_page("Profil")
+        with self.profiler.span("load_user_data"):
+            pass
+        self.profiler.end_page()
+        with self.profiler.span("fragment"):
+            pass
+
+        metrics = self.profiler.load()
+        self.assertEqual(set(metrics["Profil"]), {"load_user_data", PAGE_SPAN})
+        self.assertIn("fragment", metrics[NO_PAGE])
+
+    def test_interrupted_page(self):
+        """Sprawdza pomiar strony przerwanej wyjątkiem (np. st.rerun() lub st.switch_page())."""
+        with self.assertRaises(RuntimeError):
+            with self.profiler.page("Home"):
+                raise RuntimeError("switch_page")
+
+        self.assertEqual(self.profiler.load()["Home"][PAGE_SPAN]["count"], 1)
+        self.assertEqual(self.profiler.current_page, NO_PAGE)
+
+    def test_merge_between_processes(self):
+        """Sprawdza łączenie histogramów kilku procesów w pliku metryk."""
+        other = Profiler(self.metrics_file, flush_interval=3600)
+        self.profiler.record("Lekcje", PAGE_SPAN, 0.010)
+        other.record("Lekcje", PAGE_SPAN, 0.030)
+        self.profiler.flush()
+        other.flush()
+
+        self.assertEqual(self.profiler.load()["Lekcje"][PAGE_SPAN]["count"], 2)
+        self.profiler.reset()
+        self.assertEqual(self.profiler.load(), {})
+
+    def test_empty_histogram(self):
+        """Sprawdza podsumowanie pustego histogramu."""
+        summary = summarize(profiling._empty_stats())
+        self.assertEqual((summary["count"], summary["p99_ms"]), (0, 0.0))
+
+    def test_disabled(self):
+        """Sprawdza, czy wyłączone profilowanie nie opakowuje funkcji."""
+        def load_data():
+            return 1
+
+        with mock.patch.dict(os.environ, {"BRAINVENTURE_PROFILING": "0"}):
+            self.assertFalse(profiling.is_enabled())
+            self.assertIs(profiling.profiled()(load_data), load_data)
+        with mock.patch.dict(os.environ, {"BRAINVENTURE_PROFILING": "1"}):
+            wrapped = profiling.profiled()(load_data)
+            self.assertIsNot(wrapped, load_data)
+            self.assertEqual(wrapped.__name__, "load_data")
+
+
+if __name__ == "__main__":
+    unittest.main()
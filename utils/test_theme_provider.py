@@ -0,0 +1,53 @@
+"""
+Testy prekompilowanych pakietów stylów motywów aplikacji BrainVenture.
+"""
+import os
+import sys
+import unittest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.theme_provider import _css_repository, STYLE_FILE, get_theme_bundle, minify_css
+
+
+class TestThemeBundles(unittest.TestCase):
+    """Testy budowania i cache'owania pakietów CSS."""
+
+    def test_minify_keeps_selectors(self):
+        """Sprawdza, czy minifikacja usuwa komentarze i białe znaki, zachowując selektory."""
+        css = """
+        /* komentarz */
+        div.stTabs [data-baseweb="tab"] :hover ,
+        .stButton > button {
+            color : red ;
+            padding: 10px  24px;
+        }
+        """
+        self.assertEqual(
+            minify_css(css),
+            'div.stTabs [data-baseweb="tab"] :hover,.stButton>button{color :red;padding:10px 24px}',
+        )
+
+    def test_bundle_cached(self):
+        """Sprawdza, czy pakiet jest budowany raz i zawiera style.css."""
+        bundle = get_theme_bundle("light", "material3")
+        self.assertIs(get_theme_bundle("light", "material3"), bundle)
+        self.assertTrue(bundle.html.startswith(f'<style data-bundle="{bundle.digest}">'))
+
+        style = minify_css(_css_repository.get_text(STYLE_FILE))
+        self.assertTrue(bundle.css.endswith(style))
+
+    def test_themes_and_layouts_differ(self):
+        """Sprawdza, czy motywy i układy dają różne pakiety, a nieznane mają wartości domyślne."""
+        digests = {
+            get_theme_bundle(theme, layout).digest
+            for theme in ("light", "dark")
+            for layout in ("material3", "fluent", "neuro", "default")
+        }
+        self.assertEqual(len(digests), 8)
+        self.assertIs(get_theme_bundle("unknown", "unknown"), get_theme_bundle("dark", "default"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+"""
+Testy silnika punktacji testu typologii neuroliderów.
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data.content_repository import get_neuroleader_types, get_neuroleader_type_test
+from utils.typology_scoring import TypologyScorer, get_scorer, interpretation_table, score_answer_sheet
+from utils.neuroleader_types import NeuroleaderTypes
+from core.analytics.norms import ScoreNorms
+from core.data.write_behind import WriteBehindQueue
+
+
+def _reference_scores(questions, type_ids, answers):
+    """Wyniki liczone pętlą po pytaniach (tak jak poprzednia implementacja)."""
+    sums = {type_id: 0.0 for type_id in type_ids}
+    weights = {type_id: 0.0 for type_id in type_ids}
+    for question in questions:
+        if question["id"] in answers:
+            answer = answers[question["id"]]
+            if question.get("reverse"):
+                answer = 6 - answer
+            weight = question.get("weight", 1)
+            sums[question["type"]] += answer * weight
+            weights[question["type"]] += weight
+    return {t: sums[t] / weights[t] if weights[t] else 0 for t in type_ids}
+
+
+class TestTypologyScorer(unittest.TestCase):
+    """Testy punktacji odpowiedzi macierzą wag."""
+
+    def setUp(self):
+        self.test_data = get_neuroleader_type_test()
+        self.types_data = get_neuroleader_types()
+        self.scorer = get_scorer(self.test_data, self.types_data)
+
+    def test_matches_reference_scoring(self):
+        """Sprawdza zgodność wyników z punktacją liczoną pętlą."""
+        questions = self.test_data["questions"]
+        rng = random.Random(7)
+        for _ in range(20):
+            answers = {q["id"]: rng.randint(1, 5) for q in questions}
+            expected = _reference_scores(questions, self.scorer.type_ids, answers)
+            scores = self.scorer.score(answers)["scores"]
+            for type_id in self.scorer.type_ids:
+                self.assertAlmostEqual(scores[type_id], expected[type_id])
+
+    def test_types_from_content(self):
+        """Sprawdza, czy lista typów pochodzi z neuroleader_types.json."""
+        self.assertEqual(list(self.scorer.type_ids), [t["id"] for t in self.types_data])
+        self.assertIs(get_scorer(self.test_data, self.types_data), self.scorer)
+
+    def test_weighted_and_reverse_questions(self):
+        """Sprawdza pytania ważone i punktowane odwrotnie."""
+        questions = [
+            {"id": "a1", "type": "a", "weight": 3},
+            {"id": "a2", "type": "a", "reverse": True},
+            {"id": "b1", "type": "b"},
+        ]
+        scorer = TypologyScorer(questions, ["a", "b"])
+        answers = {"a1": 5, "a2": 2, "b1": 4}
+
+        result = scorer.score(answers)
+        self.assertAlmostEqual(result["scores"]["a"], (5 * 3 + 4) / 4)
+        self.assertEqual(result["scores"], _reference_scores(questions, ["a", "b"], answers))
+
+    def test_ties_and_missing_answers(self):
+        """Sprawdza remisy (kolejność typów) i typy bez odpowiedzi."""
+        questions = [{"id": "a1", "type": "a"}, {"id": "b1", "type": "b"}, {"id": "c1", "type": "c"}]
+        scorer = TypologyScorer(questions, ["a", "b", "c"])
+
+        result = scorer.score({"b1": 4, "c1": 4})
+        self.assertEqual(result["scores"]["a"], 0)
+        self.assertEqual(
+            (result["dominant_type"], result["secondary_type"], result["tertiary_type"]), ("b", "c", "a")
+        )
+
+    def test_unknown_type(self):
+        """Sprawdza, czy pytanie z nieznanym typem jest zgłaszane."""
+        with self.assertRaises(ValueError):
+            TypologyScorer([{"id": "x1", "type": "x"}], ["a"])
+
+    def test_score_matrix_of_answers(self):
+        """Sprawdza punktację wielu osób naraz."""
+        answers = np.full((2, len(self.scorer.question_ids)), 3.0)
+        answers[1, :] = np.nan
+        scores = self.scorer.score_vectors(answers)
+        self.assertEqual(scores.shape, (2, len(self.scorer.type_ids)))
+        self.assertTrue(np.allclose(scores[0], 3.0))
+        self.assertTrue(np.allclose(scores[1], 0.0))
+
+
+class TestBatchScoring(unittest.TestCase):
+    """Testy punktacji arkuszy odpowiedzi wielu osób."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.manager = NeuroleaderTypes(user_store=object())
+        self.questions = self.manager.get_test_questions()
+        rng = np.random.default_rng(3)
+        self.matrix = rng.integers(1, 6, size=(50, len(self.questions))).astype(float)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_matches_single_scoring(self):
+        """Sprawdza, czy wyniki wsadowe są takie same jak dla pojedynczych odpowiedzi."""
+        batch = self.manager.calculate_batch_results(self.matrix)
+        self.assertEqual(len(batch), 50)
+
+        for row in (0, 17, 49):
+            answers = {q["id"]: self.matrix[row, i] for i, q in enumerate(self.questions)}
+            single = self.manager.calculate_test_results(answers)
+            self.assertEqual(batch.loc[row, "dominant_type"], single["dominant_type"])
+            self.assertEqual(batch.loc[row, "tertiary_type"], single["tertiary_type"])
+            for type_id, score in single["scores"].items():
+                self.assertAlmostEqual(batch.loc[row, type_id], score)
+                self.assertEqual(batch.loc[row, f"interpretation_{type_id}"], single["interpretations"][type_id])
+
+    def test_csv_answer_sheet(self):
+        """Sprawdza punktację arkusza CSV z kolumnami w dowolnej kolejności."""
+        frame = pd.DataFrame(self.matrix, columns=[q["id"] for q in self.questions])
+        frame = frame[list(reversed(frame.columns))]
+        path = os.path.join(self.data_dir, "answers.csv")
+        frame.to_csv(path, index=False)
+
+        from_file = self.manager.calculate_batch_results(path)
+        from_matrix = self.manager.calculate_batch_results(self.matrix)
+        pd.testing.assert_frame_equal(from_file, from_matrix)
+
+    def test_invalid_answers(self):
+        """Sprawdza, czy odpowiedzi spoza skali są zgłaszane."""
+        frame = pd.DataFrame(self.matrix, columns=[q["id"] for q in self.questions])
+        frame.iloc[3, 0] = 7
+        with self.assertRaises(ValueError):
+            self.manager.calculate_batch_results(frame)
+
+        matrix = self.matrix.copy()
+        matrix[5, 2] = 0
+        with self.assertRaises(ValueError):
+            self.manager.calculate_batch_results(matrix)
+        matrix[5, 2] = np.nan
+        self.assertEqual(len(self.manager.calculate_batch_results(matrix)), 50)
+
+    def test_sheet_without_question_columns(self):
+        """Sprawdza, czy arkusz bez kolumn pytań testu jest odrzucany zamiast punktowany zerami."""
+        frame = pd.DataFrame(self.matrix, columns=[f"pytanie_{i}" for i in range(len(self.questions))])
+        with self.assertRaises(ValueError):
+            self.manager.calculate_batch_results(frame)
+
+    def test_without_interpretations(self):
+        """Sprawdza, czy pominięcie interpretacji pomija ich kolumny."""
+        scorer = get_scorer(self.manager.test_data, self.manager.types_data)
+        result = score_answer_sheet(scorer, self.matrix[:2])
+        self.assertFalse(any(c.startswith("interpretation_") for c in result.columns))
+        table = interpretation_table({}, scorer.type_ids)
+        self.assertEqual(table.shape, (len(scorer.type_ids), 3))
+
+
+class TestScoreNorms(unittest.TestCase):
+    """Testy norm wyników i rang centylowych."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.norms_file = os.path.join(self.data_dir, "norms.json")
+        # Długi interwał: plik norm jest zapisywany tylko przez flush()
+        self.queue = WriteBehindQueue(flush_interval=60)
+        self.norms = ScoreNorms(self.norms_file, bins=50, write_queue=self.queue)
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_percentile_rank(self):
+        """Sprawdza rangi centylowe względem zapisanych wyników."""
+        self.assertIsNone(self.norms.percentile("neuroempata", 3.0))
+        self.norms.add_results({"neuroempata": score} for score in (1.0, 2.0, 3.0, 4.0))
+
+        self.assertEqual(self.norms.count("neuroempata"), 4)
+        self.assertEqual(self.norms.percentile("neuroempata", 0.5), 0)
+        self.assertEqual(self.norms.percentile("neuroempata", 3.0), 62.5)
+        self.assertEqual(self.norms.percentile("neuroempata", 5.0), 100)
+
+    def test_cohorts(self):
+        """Sprawdza, czy wyniki grupy trafiają do norm grupy i całej populacji."""
+        self.norms.add_result({"neuroempata": 4.0}, cohort="firma_a")
+        self.norms.add_result({"neuroempata": 2.0})
+
+        self.assertEqual(self.norms.count("neuroempata"), 2)
+        self.assertEqual(self.norms.count("neuroempata", cohort="firma_a"), 1)
+        self.assertEqual(self.norms.percentile("neuroempata", 3.0, cohort="firma_a"), 0)
+
+    def test_shared_between_instances(self):
+        """Sprawdza, czy normy zapisane przez inny proces są widoczne po zmianie pliku."""
+        other = ScoreNorms(self.norms_file, bins=50, write_queue=self.queue)
+        self.assertIsNone(self.norms.percentile("neuroempata", 3.0))
+        other.add_result({"neuroempata": 2.0})
+        self.assertEqual(self.norms.count("neuroempata"), 0)
+        self.queue.flush()
+        self.assertEqual(self.norms.count("neuroempata"), 1)
+
+    def test_instances_of_one_file_are_merged(self):
+        """Sprawdza, czy kolejka scala wyniki każdej instancji zapisującej ten sam plik."""
+        other = ScoreNorms(self.norms_file, bins=50, write_queue=self.queue)
+        self.norms.add_result({"neuroempata": 2.0})
+        other.add_result({"neuroempata": 4.0})
+        self.assertEqual(self.queue.pending_count(), 2)
+
+        self.queue.flush()
+        self.assertEqual(ScoreNorms(self.norms_file, bins=50).count("neuroempata"), 2)
+
+    def test_counts_merged_in_background(self):
+        """Sprawdza, czy wyniki są liczone od razu, a plik norm jest zapisywany przy scalaniu."""
+        self.norms.add_result({"neuroempata": 2.0})
+        self.assertFalse(os.path.exists(self.norms_file))
+        self.assertEqual(self.norms.count("neuroempata"), 1)
+
+        self.queue.flush()
+        self.norms.add_result({"neuroempata": 4.0})
+        self.assertEqual(self.norms.count("neuroempata"), 2)
+        self.assertEqual(self.norms.percentile("neuroempata", 3.0), 50)
+        self.assertEqual(ScoreNorms(self.norms_file, bins=50).count("neuroempata"), 1)
+
+    def test_rebuild_from_stored_results(self):
+        """Sprawdza przeliczenie norm z wyników zapisanych wcześniej."""
+        from core.analytics.norms import rebuild_norms
+        from core.data.user_store import UserStore
+
+        store = UserStore(os.path.join(self.data_dir, "users"), legacy_file=None)
+        store.add_test_result("anna", {"scores": {"neuroempata": 4.0}, "cohort": "firma_a"})
+        store.add_test_result("piotr", {"scores": {"neuroempata": 2.0}})
+        self.norms.add_result({"neuroempata": 1.0})
+
+        self.assertEqual(rebuild_norms(store, self.norms), 2)
+        self.assertEqual(self.norms.count("neuroempata"), 2)
+        self.assertEqual(self.norms.count("neuroempata", cohort="firma_a"), 1)
+
+    def test_saved_result_has_percentiles(self):
+        """Sprawdza, czy zapis wyniku aktualizuje normy i zapisuje rangi centylowe."""
+        from core.data.user_store import UserStore
+
+        store = UserStore(os.path.join(self.data_dir, "users"), legacy_file=None)
+        manager = NeuroleaderTypes(user_store=store, norms=self.norms)
+        store.update_user("anna", {"cohort": "firma_a"})
+
+        self.assertTrue(
+            manager.save_test_results("anna", {"dominant_type": "neuroempata", "scores": {"neuroempata": 4.0}})
+        )
+        saved = manager.get_latest_test_result("anna")
+        self.assertEqual(saved["percentiles"], {"neuroempata": 50.0})
+        self.assertEqual(saved["cohort_percentiles"], {"neuroempata": 50.0})
+        self.assertEqual(self.norms.count("neuroempata", cohort="firma_a"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
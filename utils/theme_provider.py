@@ -1,5 +1,14 @@
+import hashlib
+import os
+import re
+import threading
 import streamlit as st
 from enum import Enum
+from typing import Dict, NamedTuple, Tuple
+
+from config.app_config import STATIC_DIR
+from core.data.content_repository import ContentRepository
+from core.analytics.profiling import profiled
 
 class UITheme(Enum):
     MATERIAL3 = "material3"
@@ -7,109 +16,9 @@ class UITheme(Enum):
     DEFAULT = "default"
     NEURO = "neuro"
 
-class ThemeProvider:
-    @staticmethod
-    def initialize():
-        """Initialize theme settings if not already set"""
-        if "theme" not in st.session_state:
-            st.session_state.theme = "light"
-        if "layout" not in st.session_state:
-            st.session_state.layout = "material3"
-        if "theme_just_changed" not in st.session_state:
-            st.session_state.theme_just_changed = False
-        
-        # Add JavaScript to check localStorage
-        st.markdown(
-            """
-            <script>
-            function syncThemeWithStreamlit() {
-                // Get theme from localStorage
-                const storedTheme = localStorage.getItem('brainventure_theme');
-                const storedLayout = localStorage.getItem('brainventure_layout');
-                
-                // Log for debugging
-                console.log("Stored theme:", storedTheme);
-                console.log("Stored layout:", storedLayout);
-                
-                // We'll use a hidden element to communicate with Streamlit
-                const themeInput = document.createElement('input');
-                themeInput.type = 'hidden';
-                themeInput.id = 'theme-storage-sync';
-                themeInput.value = JSON.stringify({
-                    theme: storedTheme || 'light',
-                    layout: storedLayout || 'material3'
-                });
-                document.body.appendChild(themeInput);
-            }
-            
-            // Run on page load
-            document.addEventListener('DOMContentLoaded', syncThemeWithStreamlit);
-            </script>
-            """,
-            unsafe_allow_html=True
-        )
-    
-    @staticmethod
-    def set_layout(layout_name):
-        """Set the layout theme and persist it"""
-        st.session_state.layout = layout_name
-        st.session_state.theme_just_changed = True
-        
-        # Add JavaScript to store in localStorage
-        st.markdown(
-            f"""
-            <script>
-            localStorage.setItem('brainventure_layout', '{layout_name}');
-            console.log("Layout set to:", '{layout_name}');
-            </script>
-            """,
-            unsafe_allow_html=True
-        )
-    
-    @staticmethod
-    def set_theme(theme_name):
-        """Set the color theme and persist it"""
-        st.session_state.theme = theme_name
-        st.session_state.theme_just_changed = True
-        
-        # Add JavaScript to store in localStorage
-        st.markdown(
-            f"""
-            <script>
-            localStorage.setItem('brainventure_theme', '{theme_name}');
-            console.log("Theme set to:", '{theme_name}');
-            </script>
-            """,
-            unsafe_allow_html=True
-        )
-    
-    @staticmethod
-    def apply_theme():
-        """Apply the current theme settings"""
-        theme = st.session_state.get("theme", "light")
-        layout = st.session_state.get("layout", "material3")
-        
-        # Apply color theme (light/dark)
-        if theme == "light":
-            ThemeProvider._apply_light_theme()
-        else:
-            ThemeProvider._apply_dark_theme()
-        
-        # Apply layout theme
-        if layout == "material3":
-            ThemeProvider._apply_material3_layout()
-        elif layout == "fluent":
-            ThemeProvider._apply_fluent_layout()
-        elif layout == "neuro":
-            ThemeProvider._apply_neuro_layout()
-        else:
-            ThemeProvider._apply_default_layout()
-    
-    @staticmethod
-    def _apply_light_theme():
-        """Apply light color theme"""
-        st.markdown("""
-        <style>
+# Color theme styles (light/dark)
+COLOR_THEME_CSS = {
+    "light": """
         :root {
             --text-color: #333333;
             --background-color: #ffffff;
@@ -118,19 +27,13 @@ class ThemeProvider:
             --border-color: #e0e0e0;
             --shadow-color: rgba(0,0,0,0.1);
         }
-        
+
         body {
             color: var(--text-color);
             background-color: var(--background-color);
         }
-        </style>
-        """, unsafe_allow_html=True)
-    
-    @staticmethod
-    def _apply_dark_theme():
-        """Apply dark color theme"""
-        st.markdown("""
-        <style>
+    """,
+    "dark": """
         :root {
             --text-color: #e0e0e0;
             --background-color: #1e1e1e;
@@ -139,27 +42,25 @@ class ThemeProvider:
             --border-color: #444444;
             --shadow-color: rgba(0,0,0,0.3);
         }
-        
+
         body {
             color: var(--text-color);
             background-color: var(--background-color);
         }
-        
+
         .stTabs [data-baseweb="tab-list"] {
             background-color: var(--secondary-background);
         }
-        
+
         .stTabs [data-baseweb="tab"] {
             color: var(--text-color);
         }
-        </style>
-        """, unsafe_allow_html=True)
-    
-    @staticmethod
-    def _apply_material3_layout():
-        """Apply Material 3 layout style"""
-        st.markdown("""
-        <style>
+    """,
+}
+
+# Layout styles
+LAYOUT_CSS = {
+    "material3": """
         /* Material 3 Design System */
         .stButton > button {
             border-radius: 12px;
@@ -167,27 +68,27 @@ class ThemeProvider:
             transition: all 0.3s;
             box-shadow: 0 1px 3px var(--shadow-color);
         }
-        
+
         .stButton > button:hover {
             transform: translateY(-2px);
             box-shadow: 0 4px 6px var(--shadow-color);
         }
-        
+
         div.stTabs [data-baseweb="tab-list"] {
             gap: 10px;
         }
-        
+
         div.stTabs [data-baseweb="tab"] {
             border-radius: 10px 10px 0 0;
             padding: 10px 20px;
             font-weight: 500;
         }
-        
+
         .stExpander {
             border-radius: 12px;
             box-shadow: 0 1px 2px var(--shadow-color);
         }
-        
+
         /* Sidebar styling */
         [data-testid="stSidebar"] {
             background-color: var(--secondary-background);
@@ -195,26 +96,20 @@ class ThemeProvider:
             margin: 10px;
             padding: 20px;
         }
-        
+
         /* Sidebar navigation menu */
         [data-testid="stSidebar"] .nav-link {
             border-radius: 12px !important;
             margin: 4px 0 !important;
             transition: all 0.2s ease !important;
         }
-        
+
         [data-testid="stSidebar"] .nav-link.active {
             background-color: var(--highlight-color) !important;
             color: white !important;
         }
-        </style>
-        """, unsafe_allow_html=True)
-    
-    @staticmethod
-    def _apply_fluent_layout():
-        """Apply Fluent design layout style"""
-        st.markdown("""
-        <style>
+    """,
+    "fluent": """
         /* Fluent Design System */
         .stButton > button {
             border-radius: 4px;
@@ -222,56 +117,50 @@ class ThemeProvider:
             transition: background-color 0.2s;
             box-shadow: 0 0 0 1px var(--border-color);
         }
-        
+
         .stButton > button:hover {
             background-color: rgba(0,0,0,0.05);
         }
-        
+
         div.stTabs [data-baseweb="tab-list"] {
             border-bottom: 1px solid var(--border-color);
         }
-        
+
         div.stTabs [data-baseweb="tab"] {
             border-radius: 0;
             border-bottom: 2px solid transparent;
             padding: 8px 16px;
         }
-        
+
         div.stTabs [aria-selected="true"] {
             background-color: transparent;
             border-bottom: 2px solid var(--highlight-color);
         }
-        
+
         .stExpander {
             border: 1px solid var(--border-color);
             border-radius: 3px;
         }
-        
+
         /* Sidebar styling */
         [data-testid="stSidebar"] {
             background-color: var(--secondary-background);
             border-right: 1px solid var(--border-color);
             padding: 20px;
         }
-        
+
         /* Sidebar navigation menu */
         [data-testid="stSidebar"] .nav-link {
             border-radius: 2px !important;
             margin: 2px 0 !important;
         }
-        
+
         [data-testid="stSidebar"] .nav-link.active {
             background-color: var(--highlight-color) !important;
             color: white !important;
         }
-        </style>
-        """, unsafe_allow_html=True)
-    
-    @staticmethod
-    def _apply_neuro_layout():
-        """Apply Neuro layout style"""
-        st.markdown("""
-        <style>
+    """,
+    "neuro": """
         /* Neuro Design System */
         .stButton > button {
             border-radius: 30px;
@@ -282,34 +171,34 @@ class ThemeProvider:
             font-weight: bold;
             transition: all 0.2s ease;
         }
-        
+
         .stButton > button:hover {
             box-shadow: 3px 3px 6px #d1d1d1, -3px -3px 6px #ffffff;
             transform: translateY(-2px);
         }
-        
+
         .stButton > button:active {
             box-shadow: inset 5px 5px 10px #d1d1d1, inset -5px -5px 10px #ffffff;
         }
-        
+
         div.stTabs [data-baseweb="tab-list"] {
             background: var(--secondary-background);
             border-radius: 20px;
             padding: 5px;
         }
-        
+
         div.stTabs [data-baseweb="tab"] {
             border-radius: 15px;
             padding: 10px 20px;
             margin: 0 5px;
             transition: all 0.2s ease;
         }
-        
+
         div.stTabs [aria-selected="true"] {
             background: linear-gradient(145deg, #f0f0f0, #e6e6e6);
             box-shadow: 3px 3px 6px #d1d1d1, -3px -3px 6px #ffffff;
         }
-        
+
         .stExpander {
             border-radius: 20px;
             background: var(--background-color);
@@ -317,7 +206,7 @@ class ThemeProvider:
             border: none;
             overflow: hidden;
         }
-        
+
         /* Sidebar styling */
         [data-testid="stSidebar"] {
             background-color: var(--background-color);
@@ -326,7 +215,7 @@ class ThemeProvider:
             padding: 20px;
             box-shadow: inset 3px 3px 7px var(--shadow-color), inset -3px -3px 7px #ffffff;
         }
-        
+
         /* Sidebar navigation menu */
         [data-testid="stSidebar"] .nav-link {
             border-radius: 15px !important;
@@ -334,24 +223,157 @@ class ThemeProvider:
             transition: all 0.3s ease !important;
             box-shadow: 3px 3px 7px var(--shadow-color), -3px -3px 7px rgba(255,255,255,0.8);
         }
-        
+
         [data-testid="stSidebar"] .nav-link.active {
             background-color: var(--highlight-color) !important;
             color: white !important;
             box-shadow: inset 3px 3px 7px rgba(0,0,0,0.2), inset -3px -3px 7px rgba(255,255,255,0.2);
         }
-        </style>
-        """, unsafe_allow_html=True)
-    
-    @staticmethod
-    def _apply_default_layout():
-        """Apply default Streamlit layout style"""
-        st.markdown("""
-        <style>
+    """,
+    "default": """
         /* Reset to default Streamlit styles */
         /* This is intentionally minimal to let Streamlit's default styles take effect */
-        </style>
-        """, unsafe_allow_html=True)
+    """,
+}
+
+# Application stylesheet included in every theme bundle
+STYLE_FILE = "style.css"
+_css_repository = ContentRepository(os.path.join(STATIC_DIR, "css"))
+
+
+class ThemeBundle(NamedTuple):
+    """Minified stylesheet of a (color theme, layout) combination."""
+    digest: str
+    css: str
+    html: str
+
+
+def minify_css(css: str) -> str:
+    """Removes comments and unnecessary whitespace from a stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    # Spaces before ":" are kept, they are significant in selectors (e.g. "a :hover")
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+_bundles: Dict[Tuple[str, str], Tuple[str, ThemeBundle]] = {}
+_bundles_lock = threading.Lock()
+
+
+def get_theme_bundle(theme: str, layout: str) -> ThemeBundle:
+    """
+    Returns the stylesheet bundle of a color theme and layout: the theme and
+    layout styles followed by static/css/style.css, minified and identified
+    by a hash of its content. Bundles are built once per process and rebuilt
+    only after style.css changes.
+    """
+    theme = theme if theme in COLOR_THEME_CSS else "dark"
+    layout = layout if layout in LAYOUT_CSS else "default"
+    try:
+        style = _css_repository.get_text(STYLE_FILE)
+    except OSError:
+        style = ""
+
+    cached = _bundles.get((theme, layout))
+    if cached is not None and cached[0] is style:
+        return cached[1]
+
+    css = minify_css("\n".join((COLOR_THEME_CSS[theme], LAYOUT_CSS[layout], style)))
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:16]
+    bundle = ThemeBundle(digest, css, f'<style data-bundle="{digest}">{css}</style>')
+    with _bundles_lock:
+        _bundles[(theme, layout)] = (style, bundle)
+    return bundle
+
+
+class ThemeProvider:
+    @staticmethod
+    def initialize():
+        """Initialize theme settings if not already set"""
+        if "theme" not in st.session_state:
+            st.session_state.theme = "light"
+        if "layout" not in st.session_state:
+            st.session_state.layout = "material3"
+        if "theme_just_changed" not in st.session_state:
+            st.session_state.theme_just_changed = False
+        
+        # Add JavaScript to check localStorage
+        st.markdown(
+            """
+            <script>
+            function syncThemeWithStreamlit() {
+                // Get theme from localStorage
+                const storedTheme = localStorage.getItem('brainventure_theme');
+                const storedLayout = localStorage.getItem('brainventure_layout');
+                
+                // Log for debugging
+                console.log("Stored theme:", storedTheme);
+                console.log("Stored layout:", storedLayout);
+                
+                // We'll use a hidden element to communicate with Streamlit
+                const themeInput = document.createElement('input');
+                themeInput.type = 'hidden';
+                themeInput.id = 'theme-storage-sync';
+                themeInput.value = JSON.stringify({
+                    theme: storedTheme || 'light',
+                    layout: storedLayout || 'material3'
+                });
+                document.body.appendChild(themeInput);
+            }
+            
+            // Run on page load
+            document.addEventListener('DOMContentLoaded', syncThemeWithStreamlit);
+            </script>
+            """,
+            unsafe_allow_html=True
+        )
+    
+    @staticmethod
+    def set_layout(layout_name):
+        """Set the layout theme and persist it"""
+        st.session_state.layout = layout_name
+        st.session_state.theme_just_changed = True
+        
+        # Add JavaScript to store in localStorage
+        st.markdown(
+            f"""
+            <script>
+            localStorage.setItem('brainventure_layout', '{layout_name}');
+            console.log("Layout set to:", '{layout_name}');
+            </script>
+            """,
+            unsafe_allow_html=True
+        )
+    
+    @staticmethod
+    def set_theme(theme_name):
+        """Set the color theme and persist it"""
+        st.session_state.theme = theme_name
+        st.session_state.theme_just_changed = True
+        
+        # Add JavaScript to store in localStorage
+        st.markdown(
+            f"""
+            <script>
+            localStorage.setItem('brainventure_theme', '{theme_name}');
+            console.log("Theme set to:", '{theme_name}');
+            </script>
+            """,
+            unsafe_allow_html=True
+        )
+    
+    @staticmethod
+    @profiled()
+    def apply_theme():
+        """Apply the current theme settings"""
+        theme = st.session_state.get("theme", "light")
+        layout = st.session_state.get("layout", "material3")
+        
+        # Color theme, layout and style.css are sent as a single precompiled stylesheet
+        bundle = get_theme_bundle(theme, layout)
+        st.markdown(bundle.html, unsafe_allow_html=True)
     
     @staticmethod
     def get_current_theme():
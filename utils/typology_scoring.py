@@ -0,0 +1,283 @@
+"""
+Silnik punktacji testu typologii neuroliderów.
+
+Pytania testu są raz zamieniane na macierz wag (pytania × typy), a wynik
+odpowiedzi liczony jest jednym iloczynem macierzowym. Lista typów pochodzi
+z neuroleader_types.json, więc dodanie typu nie wymaga zmian w kodzie.
+
+Pytanie w neuroleader_type_test.json może mieć opcjonalne pola:
+    "weight": waga pytania (domyślnie 1),
+    "reverse": true dla pytań punktowanych odwrotnie (1 <-> 5).
+
+Arkusze odpowiedzi wielu osób (tablica, DataFrame, plik CSV lub Parquet)
+są punktowane w jednym przebiegu przez score_answer_sheet().
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.app_config import SCORE_HIGH_THRESHOLD, SCORE_MEDIUM_THRESHOLD
+
+# Skala odpowiedzi na pytania testu
+SCALE_MIN = 1
+SCALE_MAX = 5
+
+INTERPRETATION_LEVELS = ("low", "medium", "high")
+DEFAULT_INTERPRETATIONS = ("Niski wynik", "Średni wynik", "Wysoki wynik")
+
+# Pola wyniku z typami o najwyższych wynikach (w kolejności rankingu)
+RANKED_TYPES = ("dominant_type", "secondary_type", "tertiary_type")
+
+
+class TypologyScorer:
+    """Punktacja odpowiedzi na podstawie prekompilowanej macierzy wag."""
+
+    def __init__(self, questions: Sequence[Dict[str, Any]], type_ids: Sequence[str]):
+        """
+        Args:
+            questions: Pytania testu (pola id, type oraz opcjonalnie weight i reverse)
+            type_ids: Identyfikatory typów w kolejności kolumn wyniku
+
+        Raises:
+            ValueError: Jeśli pytanie wskazuje typ spoza listy typów
+        """
+        self.type_ids = tuple(type_ids)
+        self.question_ids = tuple(question["id"] for question in questions)
+        self._question_index = {q_id: row for row, q_id in enumerate(self.question_ids)}
+        type_index = {type_id: column for column, type_id in enumerate(self.type_ids)}
+
+        n_questions, n_types = len(self.question_ids), len(self.type_ids)
+        weights = np.zeros((n_questions, n_types))
+        reverse = np.zeros(n_questions, dtype=bool)
+        for row, question in enumerate(questions):
+            if question["type"] not in type_index:
+                raise ValueError(f"Pytanie {question['id']} wskazuje nieznany typ: {question['type']}")
+            weights[row, type_index[question["type"]]] = float(question.get("weight", 1))
+            reverse[row] = bool(question.get("reverse", False))
+
+        # Odpowiedź a na pytanie odwrotne daje (MIN + MAX - a) * w = -a * w + (MIN + MAX) * w.
+        # Wektor wejściowy [odpowiedzi * udzielone, udzielone] mnożony przez macierz
+        # [[wagi ze znakiem, 0], [przesunięcia, wagi]] daje od razu sumy punktów
+        # i sumy wag udzielonych odpowiedzi dla każdego typu.
+        signed = np.where(reverse[:, None], -weights, weights)
+        offsets = np.where(reverse[:, None], (SCALE_MIN + SCALE_MAX) * weights, 0.0)
+        self._matrix = np.block([
+            [signed, np.zeros_like(weights)],
+            [offsets, weights],
+        ])
+
+    @property
+    def max_score(self) -> int:
+        """Maksymalny wynik typu (średnia ważona odpowiedzi)."""
+        return SCALE_MAX
+
+    def answers_to_vector(self, answers: Dict[str, Any]) -> np.ndarray:
+        """Zamienia słownik odpowiedzi (id pytania -> odpowiedź) na wektor; brak odpowiedzi to NaN."""
+        vector = np.full(len(self.question_ids), np.nan)
+        for q_id, answer in answers.items():
+            row = self._question_index.get(q_id)
+            if row is not None and answer is not None:
+                vector[row] = answer
+        return vector
+
+    def score_vectors(self, answers: np.ndarray) -> np.ndarray:
+        """
+        Liczy wyniki typów dla wektora lub macierzy odpowiedzi.
+
+        Args:
+            answers: Tablica (pytania,) lub (osoby, pytania); NaN oznacza brak odpowiedzi
+
+        Returns:
+            np.ndarray: Średnie ważone wyniki typów (typy,) lub (osoby, typy);
+                0 dla typów bez udzielonych odpowiedzi
+        """
+        answers = np.asarray(answers, dtype=float)
+        answered = ~np.isnan(answers)
+        inputs = np.concatenate([np.where(answered, answers, 0.0), answered.astype(float)], axis=-1)
+        totals = inputs @ self._matrix
+
+        n_types = len(self.type_ids)
+        sums, weights = totals[..., :n_types], totals[..., n_types:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(weights > 0, sums / weights, 0.0)
+
+    def rank(self, scores: np.ndarray) -> List[str]:
+        """Zwraca typy od najwyższego wyniku; przy remisie zachowuje kolejność typów."""
+        return [self.type_ids[column] for column in np.argsort(-scores, kind="stable")]
+
+    def rank_columns(self, scores: np.ndarray) -> np.ndarray:
+        """Zwraca numery kolumn typów od najwyższego wyniku (dla każdego wiersza osobno)."""
+        return np.argsort(-scores, axis=-1, kind="stable")
+
+    def interpretation_levels(self, scores: np.ndarray) -> np.ndarray:
+        """Zwraca poziom wyniku (0 - niski, 1 - średni, 2 - wysoki) dla każdego wyniku typu."""
+        percentage = np.asarray(scores) / self.max_score
+        return (percentage >= SCORE_MEDIUM_THRESHOLD).astype(int) + (percentage >= SCORE_HIGH_THRESHOLD)
+
+    @staticmethod
+    def check_answers(answers: np.ndarray, invalid: Optional[np.ndarray] = None, index=None) -> None:
+        """
+        Sprawdza, czy macierz odpowiedzi (osoby, pytania) zawiera tylko odpowiedzi ze skali testu lub NaN.
+
+        Args:
+            answers: Macierz odpowiedzi
+            invalid: Dodatkowo odrzucane komórki (np. tekst, który nie jest liczbą)
+            index: Etykiety wierszy do komunikatu (domyślnie numery wierszy)
+
+        Raises:
+            ValueError: Jeśli odpowiedź nie jest liczbą ze skali testu
+        """
+        with np.errstate(invalid="ignore"):
+            out_of_scale = (answers < SCALE_MIN) | (answers > SCALE_MAX)
+        if invalid is not None:
+            out_of_scale |= invalid
+        if out_of_scale.any():
+            rows = np.flatnonzero(out_of_scale.any(axis=1))
+            label = index[rows[0]] if index is not None else rows[0]
+            raise ValueError(
+                f"Nieprawidłowe odpowiedzi (poza skalą {SCALE_MIN}-{SCALE_MAX}) w {len(rows)} wierszach, "
+                f"np. w wierszu {label}"
+            )
+
+    def answers_from_frame(self, frame) -> np.ndarray:
+        """
+        Zamienia tabelę odpowiedzi (kolumny = id pytań) na macierz (osoby, pytania).
+
+        Brakujące kolumny i puste komórki oznaczają brak odpowiedzi.
+
+        Raises:
+            ValueError: Jeśli tabela nie ma żadnej kolumny pytania testu lub
+                odpowiedź nie jest liczbą ze skali testu
+        """
+        import pandas as pd
+
+        if not frame.columns.isin(self.question_ids).any():
+            raise ValueError("Arkusz odpowiedzi nie zawiera żadnej kolumny z id pytania testu")
+        columns = frame.reindex(columns=list(self.question_ids))
+        answers = columns.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        self.check_answers(answers, columns.notna().to_numpy() & np.isnan(answers), frame.index)
+        return answers
+
+    def score(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Liczy wyniki testu dla odpowiedzi jednej osoby.
+
+        Returns:
+            dict: scores (typ -> wynik), dominant_type, secondary_type i tertiary_type
+        """
+        scores = self.score_vectors(self.answers_to_vector(answers))
+        ranking = self.rank(scores)
+        result = {"scores": {type_id: float(score) for type_id, score in zip(self.type_ids, scores)}}
+        for position, key in enumerate(RANKED_TYPES):
+            result[key] = ranking[position] if len(ranking) > position else None
+        return result
+
+
+def interpretation_table(test_data: Dict[str, Any], type_ids: Sequence[str]) -> np.ndarray:
+    """Zwraca teksty interpretacji jako tablicę (typy, poziomy) z score_interpretation testu."""
+    score_interpretation = test_data.get("score_interpretation", {})
+    if not isinstance(score_interpretation, dict):
+        score_interpretation = {}
+    table = np.empty((len(type_ids), len(INTERPRETATION_LEVELS)), dtype=object)
+    for row, type_id in enumerate(type_ids):
+        interpretations = score_interpretation.get(type_id, {})
+        for column, (level, default) in enumerate(zip(INTERPRETATION_LEVELS, DEFAULT_INTERPRETATIONS)):
+            table[row, column] = interpretations.get(level, default)
+    return table
+
+
+def read_answer_sheet(path: str):
+    """
+    Wczytuje arkusz odpowiedzi z pliku CSV lub Parquet (wiersz = osoba, kolumny = id pytań).
+
+    Raises:
+        ValueError: Jeśli format pliku nie jest obsługiwany
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(path)
+    if extension in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    raise ValueError(f"Nieobsługiwany format arkusza odpowiedzi: {extension}")
+
+
+def score_answer_sheet(scorer: TypologyScorer, answers, interpretations: Optional[np.ndarray] = None):
+    """
+    Punktuje odpowiedzi wielu osób w jednym przebiegu.
+
+    Args:
+        scorer: Silnik punktacji testu
+        answers: Macierz (osoby, pytania) w kolejności scorer.question_ids,
+            DataFrame z kolumnami = id pytań lub ścieżka do pliku CSV/Parquet
+        interpretations: Tablica tekstów z interpretation_table()
+            (None pomija kolumny interpretacji)
+
+    Returns:
+        pandas.DataFrame: Dla każdej osoby wyniki typów, dominant_type,
+            secondary_type, tertiary_type oraz kolumny interpretation_<typ>;
+            indeks jest zgodny z danymi wejściowymi
+
+    Raises:
+        ValueError: Jeśli odpowiedź jest spoza skali testu lub arkusz nie
+            zawiera kolumn pytań testu
+    """
+    import pandas as pd
+
+    if isinstance(answers, (str, os.PathLike)):
+        answers = read_answer_sheet(os.fspath(answers))
+    if isinstance(answers, pd.DataFrame):
+        index = answers.index
+        matrix = scorer.answers_from_frame(answers)
+    else:
+        matrix = np.atleast_2d(np.asarray(answers, dtype=float))
+        if matrix.shape[1] != len(scorer.question_ids):
+            raise ValueError(
+                f"Oczekiwano {len(scorer.question_ids)} kolumn odpowiedzi, otrzymano {matrix.shape[1]}"
+            )
+        scorer.check_answers(matrix)
+        index = pd.RangeIndex(len(matrix))
+
+    scores = scorer.score_vectors(matrix)
+    type_ids = np.array(scorer.type_ids, dtype=object)
+    ranking = scorer.rank_columns(scores)
+
+    columns = {type_id: scores[:, column] for column, type_id in enumerate(scorer.type_ids)}
+    for position, key in enumerate(RANKED_TYPES):
+        columns[key] = type_ids[ranking[:, position]] if len(type_ids) > position else None
+    if interpretations is not None:
+        texts = interpretations[np.arange(len(type_ids)), scorer.interpretation_levels(scores)]
+        for column, type_id in enumerate(scorer.type_ids):
+            columns[f"interpretation_{type_id}"] = texts[:, column]
+    return pd.DataFrame(columns, index=index)
+
+
+def _type_ids(test_data: Dict[str, Any], types_data: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """Typy z neuroleader_types.json lub, gdy nie są dostępne, z pytań testu (w kolejności wystąpienia)."""
+    if types_data:
+        return [type_info["id"] for type_info in types_data]
+    return list(dict.fromkeys(question["type"] for question in test_data.get("questions", [])))
+
+
+_scorer_cache = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer(test_data: Dict[str, Any], types_data: Optional[List[Dict[str, Any]]]) -> TypologyScorer:
+    """
+    Zwraca silnik punktacji dla danych testu i typów.
+
+    Repozytorium treści zwraca te same obiekty, dopóki pliki się nie zmienią,
+    więc macierz wag budowana jest ponownie tylko po zmianie treści.
+    """
+    global _scorer_cache
+    cached = _scorer_cache
+    if cached is not None and cached[0] is test_data and cached[1] is types_data:
+        return cached[2]
+    with _scorer_lock:
+        scorer = TypologyScorer(test_data.get("questions", []), _type_ids(test_data, types_data))
+        _scorer_cache = (test_data, types_data, scorer)
+    return scorer
@@ -2,6 +2,7 @@
 import streamlit as st
 import os
 from config.app_config import PRIMARY_COLOR, SECONDARY_COLOR, ACCENT_COLOR
+from utils.assets import show_image
 
 def set_page_config(page_title, page_icon, layout="wide"):
     """Configure the Streamlit page with custom settings."""
@@ -17,15 +18,22 @@ def set_page_config(page_title, page_icon, layout="wide"):
         }
     )
 
+def _show_item_image(image_path):
+    """Show an image from the asset registry, or any other image file that exists."""
+    if show_image(image_path, use_column_width=True):
+        return True
+    if os.path.exists(image_path):
+        st.image(image_path, use_column_width=True)
+        return True
+    return False
+
 def card(title, content, image_path=None, button_text=None, button_url=None, progress=None):
     """Create a custom card component for the grid layout."""
     with st.container():
         cols = st.columns([1, 3])
         
         with cols[0]:
-            if image_path and os.path.exists(image_path):
-                st.image(image_path, use_column_width=True)
-            else:
+            if not (image_path and _show_item_image(image_path)):
                 st.markdown("📄")
         
         with cols[1]:
@@ -49,8 +57,8 @@ def grid(items, num_columns=3):
                 <div style="border: 1px solid #eee; border-radius: 10px; padding: 15px; margin-bottom: 15px; height: 100%;">
                 """, unsafe_allow_html=True)
                 
-                if "image" in item and item["image"] and os.path.exists(item["image"]):
-                    st.image(item["image"], use_column_width=True)
+                if item.get("image"):
+                    _show_item_image(item["image"])
                 
                 st.markdown(f"### {item['title']}")
                 st.write(item["content"])